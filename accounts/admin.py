@@ -2,22 +2,30 @@
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User
+from .models import Organization, User
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
-    list_display = ('username', 'email', 'role', 'is_active', 'is_staff')
-    list_filter = ('role', 'is_active', 'is_staff', 'is_superuser')
+    list_display = ('username', 'email', 'organization', 'role', 'is_active', 'is_staff')
+    list_filter = ('organization', 'role', 'is_active', 'is_staff', 'is_superuser')
     fieldsets = (
-        (None, {'fields': ('username', 'email', 'password', 'role', 'avatar')}),
+        (None, {'fields': ('username', 'email', 'password', 'organization', 'role', 'avatar')}),
         ('Permissions', {'fields': ('is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions')}),
         ('Important dates', {'fields': ('last_login', 'date_joined')}),
     )
     add_fieldsets = (
         (None, {
             'classes': ('wide',),
-            'fields': ('username', 'email', 'role', 'avatar', 'password1', 'password2'),
+            'fields': ('username', 'email', 'organization', 'role', 'avatar', 'password1', 'password2'),
         }),
     )
     search_fields = ('username', 'email')
-    ordering = ('username',)
\ No newline at end of file
+    ordering = ('username',)
+    list_select_related = ('organization',)
+
+
+@admin.register(Organization)
+class OrganizationAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'created_at')
+    search_fields = ('name', 'slug')
+    prepopulated_fields = {'slug': ('name',)}
\ No newline at end of file
@@ -9,4 +9,6 @@ class AccountsConfig(AppConfig):
 
     def ready(self):
         # Import signals to activate post_save hooks
-        import accounts.signals
\ No newline at end of file
+        import accounts.signals
+        # Register background job handlers
+        import accounts.tasks
@@ -0,0 +1,129 @@
+"""
+Archival of former employees.
+
+Terminating an employee copies their user and profile rows into
+ArchivedEmployee and deletes the live rows, which keeps the hot tables
+(and every list, sync and org-chart query over them) limited to current
+staff. The deletion goes through the usual signals, so sync clients get a
+tombstone and the employee's reports move up to the next manager.
+
+Raw clock events are keyed by user id without a foreign key and stay in
+place; restoring reuses the original id, re-links the department and
+manager when they still exist and rebuilds the daily attendance summaries
+from those events. Restored accounts get an unusable password.
+"""
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+
+from .attendance import refresh_daily, touched_days
+from .changes import batch_user_changes
+from .models import ArchivedEmployee, ClockEvent, Department, EmployeeProfile, User
+from .signals import deleting_users
+
+# Recomputed or re-linked on restore rather than copied back
+PROFILE_SKIP = frozenset({
+    "id", "user_id", "organization_id", "org_path", "org_depth", "manager_id", "department_id", "updated_on",
+})
+
+
+class RestoreConflict(Exception):
+    """The archived username (or id) is in use by a live account."""
+
+
+def snapshot(instance, exclude=()):
+    data = {}
+    for field in instance._meta.concrete_fields:
+        if field.attname in exclude:
+            continue
+        value = field.value_from_object(instance)
+        if isinstance(value, FieldFile):
+            value = value.name or None
+        data[field.attname] = value
+    return data
+
+
+def _restore_values(model, data, skip=()):
+    values = {}
+    for attname, value in data.items():
+        if attname in skip:
+            continue
+        try:
+            field = next(f for f in model._meta.concrete_fields if f.attname == attname)
+        except StopIteration:
+            continue  # column dropped since archival
+        values[attname] = field.to_python(value) if value is not None else None
+    return values
+
+
+def archive_employee(user, termination_date=None, reason="", archived_by=None):
+    """Move ``user`` (and their profile) to the archive. Returns the ArchivedEmployee."""
+    with transaction.atomic(), batch_user_changes():
+        user = User.objects.select_for_update(of=("self",)).select_related("profile__department").get(pk=user.pk)
+        try:
+            profile = user.profile
+        except EmployeeProfile.DoesNotExist:
+            profile = None
+        record = ArchivedEmployee.objects.create(
+            id=user.pk,
+            organization_id=user.organization_id,
+            username=user.username,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            role=user.role,
+            department_name=profile.department.name if profile and profile.department else "",
+            position=(profile.position or "") if profile else "",
+            payroll_number=(profile.payroll_number or "") if profile else "",
+            hire_date=profile.hire_date if profile else None,
+            termination_date=termination_date or (profile and profile.end_date) or timezone.localdate(),
+            reason=reason,
+            archived_by=archived_by,
+            data={
+                "user": snapshot(user, exclude={"password"}),
+                "profile": snapshot(profile) if profile else None,
+            },
+        )
+        with deleting_users([user.pk]):
+            user.delete()
+    return record
+
+
+def restore_employee(record):
+    """Recreate the live user and profile from an archive record, which is removed."""
+    with transaction.atomic(), batch_user_changes():
+        # Usernames are unique across organizations
+        if User._base_manager.filter(Q(username=record.username) | Q(pk=record.pk)).exists():
+            raise RestoreConflict(record.username)
+
+        user = User(**_restore_values(User, record.data["user"], skip={"password"}))
+        user.pk = record.pk
+        user.organization_id = record.organization_id
+        user.set_unusable_password()
+        user.save(force_insert=True)
+
+        profile_data = record.data.get("profile")
+        if profile_data is not None:
+            # The post_save signal may already have created an empty profile
+            profile, _ = EmployeeProfile.objects.get_or_create(
+                user=user, defaults={"organization_id": user.organization_id}
+            )
+            for attname, value in _restore_values(EmployeeProfile, profile_data, skip=PROFILE_SKIP).items():
+                setattr(profile, attname, value)
+            profile.employment_status = EmployeeProfile.EmploymentStatus.ACTIVE
+            profile.end_date = None
+            same_organization = {"organization_id": user.organization_id}
+            department_id = profile_data.get("department_id")
+            if department_id and Department.objects.filter(pk=department_id, **same_organization).exists():
+                profile.department_id = department_id
+            manager_id = profile_data.get("manager_id")
+            if manager_id and EmployeeProfile.objects.filter(user_id=manager_id, **same_organization).exists():
+                profile.set_manager(manager_id)
+            profile.save()
+
+        events = ClockEvent.objects.filter(user_id=user.pk).values_list("user_id", "occurred_at", "direction", "device")
+        refresh_daily(touched_days(events))
+        record.delete()
+    return user
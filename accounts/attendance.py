@@ -0,0 +1,338 @@
+"""
+Attendance ingest: buffered, bulk-written badge clock events and the daily
+worked-time summaries derived from them.
+
+Badge readers POST batches to /api/attendance/clock/. The view only validates
+and appends to the per-process ``ClockBuffer`` (answering 202), so bursts at
+shift change never hold a request open on the database. A background thread
+drains the buffer every ``ATTENDANCE_FLUSH_INTERVAL`` seconds, or as soon as
+``ATTENDANCE_FLUSH_SIZE`` events are waiting, and ``write_events`` stores each
+drained batch in one transaction:
+
+* PostgreSQL: ``COPY`` into a temporary staging table, then one
+  ``INSERT ... SELECT ... ON CONFLICT DO NOTHING`` joined against users, so
+  re-sent batches and unknown badge ids are dropped in the database.
+* SQLite: chunked multi-row ``INSERT ... ON CONFLICT DO NOTHING`` after one
+  query that filters out unknown users.
+
+The DailyAttendance rows of the (user, day) pairs a batch touched are then
+recomputed from the raw events and upserted.
+
+Events are held in memory until flushed; a reader that gets no 2xx answer
+should resend, which is safe because writes are idempotent.
+"""
+
+import atexit
+import csv
+import io
+import logging
+import os
+import threading
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from backend.metrics import Counter
+
+from . import tenancy
+from .models import ClockEvent, DailyAttendance, User
+
+logger = logging.getLogger(__name__)
+
+DIRECTIONS = frozenset(ClockEvent.Direction.values)
+# A clock-in with no clock-out within this window is treated as a missed punch
+MAX_SHIFT = timedelta(hours=16)
+
+EVENTS = Counter(
+    "attendance_events_total",
+    "Badge clock events by ingest outcome (accepted, rejected, shed, written, failed).",
+    ("outcome",),
+)
+
+
+def parse_events(items):
+    """
+    Validate raw JSON events. Returns ``(events, errors)`` where events are
+    ``(user_id, occurred_at, direction, device)`` tuples.
+    """
+    events, errors = [], []
+    default_tz = timezone.get_current_timezone()
+    for index, item in enumerate(items):
+        try:
+            user_id = int(item["user"])
+            direction = str(item["direction"]).lower()
+            occurred_at = parse_datetime(str(item["at"]))
+        except (KeyError, TypeError, ValueError):
+            errors.append({"index": index, "detail": "Expected user, at and direction."})
+            continue
+        if direction not in DIRECTIONS or occurred_at is None or user_id < 1:
+            errors.append({"index": index, "detail": "Invalid user, timestamp or direction."})
+            continue
+        if timezone.is_naive(occurred_at):
+            occurred_at = timezone.make_aware(occurred_at, default_tz)
+        events.append((user_id, occurred_at, direction, str(item.get("device") or "")[:64]))
+    return events, errors
+
+
+def drop_other_tenants(events, errors, count):
+    """
+    Move events for users outside the current tenant into ``errors`` (an
+    organization admin's session). Buffered events are written by the
+    flusher thread, where nothing is scoped, so this has to happen in the
+    request. Devices and superusers are unscoped and keep every event.
+    ``count`` is the number of raw items ``parse_events`` was given.
+    """
+    if tenancy.current() is None or not events:
+        return events
+    known = set(User.objects.filter(pk__in={e[0] for e in events}).values_list("pk", flat=True))
+    failed = {error["index"] for error in errors}
+    positions = (index for index in range(count) if index not in failed)
+    kept = []
+    for event, index in zip(events, positions):
+        if event[0] in known:
+            kept.append(event)
+        else:
+            errors.append({"index": index, "detail": "Unknown user."})
+    errors.sort(key=lambda error: error["index"])
+    return kept
+
+
+def write_events(events):
+    """Store events and refresh the affected daily summaries in one transaction."""
+    received_at = timezone.now()
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            _copy_events(events, received_at)
+        else:
+            _insert_events(events, received_at)
+        refresh_daily(touched_days(events))
+    EVENTS.inc("written", amount=len(events))
+
+
+def _insert_events(events, received_at):
+    # Multi-row INSERT ... ON CONFLICT DO NOTHING (SQLite 3.24+); bulk_create
+    # spends most of its time preparing model instances at this volume.
+    known = set(User.objects.filter(pk__in={e[0] for e in events}).values_list("pk", flat=True))
+    adapt = connection.ops.adapt_datetimefield_value
+    received = adapt(received_at)
+    rows = [
+        (user_id, adapt(at), direction, device, received)
+        for user_id, at, direction, device in events
+        if user_id in known
+    ]
+    columns = ("user_id", "occurred_at", "direction", "device", "received_at")
+    size = connection.ops.bulk_batch_size(columns, rows)
+    table = connection.ops.quote_name(ClockEvent._meta.db_table)
+    with connection.cursor() as cursor:
+        for i in range(0, len(rows), size):
+            chunk = rows[i:i + size]
+            values = ", ".join(["(%s, %s, %s, %s, %s)"] * len(chunk))
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES {values} ON CONFLICT DO NOTHING",
+                [value for row in chunk for value in row],
+            )
+
+
+def _copy_events(events, received_at):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    received = received_at.isoformat()
+    for user_id, at, direction, device in events:
+        writer.writerow((user_id, at.isoformat(), direction, device, received))
+    buffer.seek(0)
+
+    copy_sql = "COPY clockevent_staging FROM STDIN WITH (FORMAT csv)"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE TEMPORARY TABLE clockevent_staging ("
+            " user_id bigint, occurred_at timestamptz, direction varchar(3),"
+            " device varchar(64), received_at timestamptz) ON COMMIT DROP"
+        )
+        raw = cursor.cursor
+        if hasattr(raw, "copy"):  # psycopg 3
+            with raw.copy(copy_sql) as copy:
+                copy.write(buffer.getvalue())
+        else:
+            raw.copy_expert(copy_sql, buffer)
+        cursor.execute(
+            f"INSERT INTO {ClockEvent._meta.db_table} (user_id, occurred_at, direction, device, received_at)"
+            f" SELECT s.user_id, s.occurred_at, s.direction, s.device, s.received_at"
+            f" FROM clockevent_staging s JOIN {User._meta.db_table} u ON u.id = s.user_id"
+            f" ON CONFLICT DO NOTHING"
+        )
+
+
+def touched_days(events):
+    """(user_id, local date) pairs whose summaries a batch can change."""
+    tz = timezone.get_current_timezone()
+    days = set()
+    for user_id, at, direction, _ in events:
+        day = at.astimezone(tz).date()
+        days.add((user_id, day))
+        if direction == ClockEvent.Direction.OUT:
+            # May close a shift that started the previous day
+            days.add((user_id, day - timedelta(days=1)))
+    return days
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def refresh_daily(days):
+    """Recompute and upsert DailyAttendance for the given (user_id, date) pairs."""
+    if not days:
+        return
+    users = {user_id for user_id, _ in days}
+    first = min(day for _, day in days)
+    last = max(day for _, day in days)
+    rows = (
+        ClockEvent.objects.filter(
+            user_id__in=users,
+            occurred_at__gte=_day_start(first),
+            occurred_at__lt=_day_start(last + timedelta(days=1)) + MAX_SHIFT,
+        )
+        .order_by("user_id", "occurred_at")
+        .values_list("user_id", "occurred_at", "direction")
+    )
+
+    summaries = {}
+
+    def summary(user_id, day):
+        key = (user_id, day)
+        if key not in summaries:
+            summaries[key] = DailyAttendance(user_id=user_id, date=day)
+        return summaries[key]
+
+    tz = timezone.get_current_timezone()
+    open_in = {}
+    for user_id, at, direction in rows.iterator(chunk_size=5000):
+        day = at.astimezone(tz).date()
+        summary(user_id, day).events += 1
+        started = open_in.get(user_id)
+        if started is not None and at - started > MAX_SHIFT:
+            del open_in[user_id]
+            started = None
+        if direction == ClockEvent.Direction.IN:
+            if started is None:
+                open_in[user_id] = at
+                row = summary(user_id, day)
+                row.first_in = row.first_in or at
+            continue
+        if started is not None:
+            # Worked time belongs to the day the shift started
+            row = summary(user_id, started.astimezone(tz).date())
+            row.worked_seconds += int((at - started).total_seconds())
+            row.last_out = at
+            del open_in[user_id]
+    for user_id, started in open_in.items():
+        summary(user_id, started.astimezone(tz).date()).open_since = started
+
+    DailyAttendance.objects.bulk_create(
+        [summaries[key] for key in days if key in summaries],
+        update_conflicts=True,
+        unique_fields=["user", "date"],
+        update_fields=["worked_seconds", "first_in", "last_out", "open_since", "events", "updated_at"],
+        batch_size=1000,
+    )
+
+
+def ensure_partitions(conn=None, months_ahead=2):
+    """
+    Create monthly partitions of the clock event table from the current
+    month through ``months_ahead`` months ahead (PostgreSQL only). A month
+    whose rows already landed in the default partition is skipped with a
+    warning. Returns the names of the partitions that now exist.
+    """
+    conn = conn or connection
+    if conn.vendor != "postgresql":
+        return []
+    table = ClockEvent._meta.db_table
+    start = timezone.now().date().replace(day=1)
+    names = []
+    for _ in range(months_ahead + 1):
+        end = (start + timedelta(days=32)).replace(day=1)
+        name = f"{table}_{start:%Y%m}"
+        try:
+            with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table}"
+                    f" FOR VALUES FROM ('{start.isoformat()} 00:00+00') TO ('{end.isoformat()} 00:00+00')"
+                )
+            names.append(name)
+        except DatabaseError:
+            logger.warning("Could not create partition %s; move its rows out of the default partition", name)
+        start = end
+    return names
+
+
+class ClockBuffer:
+    """Per-process queue of validated events, drained by a background thread."""
+
+    def __init__(self):
+        self._events = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker_pid = None
+
+    def add(self, events):
+        """Queue events; False (nothing queued) when the buffer is full."""
+        with self._lock:
+            if len(self._events) + len(events) > settings.ATTENDANCE_MAX_BUFFER:
+                return False
+            self._events.extend(events)
+            pending = len(self._events)
+        self._ensure_worker()
+        if pending >= settings.ATTENDANCE_FLUSH_SIZE:
+            self._wakeup.set()
+        return True
+
+    def pending(self):
+        return len(self._events)
+
+    def flush(self):
+        """Write everything queued so far; on failure the events are re-queued."""
+        with self._lock:
+            events, self._events = self._events, []
+        if not events:
+            return 0
+        try:
+            write_events(events)
+        except Exception:
+            EVENTS.inc("failed", amount=len(events))
+            with self._lock:
+                # Writes are idempotent, so retrying the whole batch is safe.
+                room = max(settings.ATTENDANCE_MAX_BUFFER - len(self._events), 0)
+                self._events[:0] = events[-room:] if room else []
+            raise
+        return len(events)
+
+    def _ensure_worker(self):
+        pid = os.getpid()
+        if self._worker_pid == pid:
+            return
+        with self._lock:
+            if self._worker_pid == pid:
+                return
+            self._worker_pid = pid
+        threading.Thread(target=self._run, name="attendance-flush", daemon=True).start()
+        atexit.register(self._flush_quietly)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(settings.ATTENDANCE_FLUSH_INTERVAL)
+            self._wakeup.clear()
+            self._flush_quietly()
+            connection.close_if_unusable_or_obsolete()
+
+    def _flush_quietly(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Attendance flush failed; events re-queued")
+
+
+buffer = ClockBuffer()
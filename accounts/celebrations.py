@@ -0,0 +1,94 @@
+"""
+Upcoming birthdays and work anniversaries.
+
+A window of days is turned into one or two ranges over the indexed
+``birth_mmdd`` / ``hire_mmdd`` columns (two when it crosses New Year), so
+a week is an index range scan however many profiles there are. Because the
+columns are month * 100 + day, a range running from 28 February to
+1 March already takes in 29 February; a window that ends on 28 February
+of a common year is widened to include it, so leap-day people are
+celebrated on the 28th.
+"""
+
+import calendar
+from datetime import date, timedelta
+
+from django.db.models import Q
+
+from .models import EmployeeProfile, mmdd
+
+MAX_DAYS = 31
+
+
+def mmdd_ranges(start, days):
+    """[(year, low, high)] month-day ranges covering ``days`` days from ``start``."""
+    end = start + timedelta(days=days - 1)
+    ranges = []
+    for year in range(start.year, end.year + 1):
+        first = max(start, date(year, 1, 1))
+        last = min(end, date(year, 12, 31))
+        high = mmdd(last)
+        if high == 228 and not calendar.isleap(year):
+            high = 229
+        ranges.append((year, mmdd(first), high))
+    return ranges
+
+
+def occurrence(value, ranges):
+    """The date inside the window on which ``value``'s month and day fall."""
+    key = mmdd(value)
+    for year, low, high in ranges:
+        if low <= key <= high:
+            if key == 229 and not calendar.isleap(year):
+                return date(year, 2, 28)
+            return date(year, value.month, value.day)
+    return None
+
+
+def upcoming(start, days=7, department_id=None):
+    """
+    Birthdays and work anniversaries of active users between ``start`` and
+    ``start + days - 1``, each list sorted by date. Birthdays carry no year
+    (ages stay private); anniversaries carry the years of service.
+    """
+    ranges = mmdd_ranges(start, days)
+    profiles = (
+        EmployeeProfile.objects.filter(user__is_active=True)
+        .select_related("user", "department")
+        .only(
+            "date_of_birth", "hire_date", "department__name",
+            "user__username", "user__first_name", "user__last_name",
+        )
+    )
+    if department_id is not None:
+        profiles = profiles.filter(department_id=department_id)
+
+    def matching(column):
+        window = Q()
+        for _, low, high in ranges:
+            window |= Q(**{f"{column}__range": (low, high)})
+        return profiles.filter(window)
+
+    def entry(profile, on):
+        user = profile.user
+        return {
+            "user_id": user.pk,
+            "name": user.get_full_name() or user.username,
+            "department": profile.department.name if profile.department else "",
+            "date": on,
+        }
+
+    birthdays = []
+    for profile in matching("birth_mmdd"):
+        birthdays.append(entry(profile, occurrence(profile.date_of_birth, ranges)))
+
+    anniversaries = []
+    for profile in matching("hire_mmdd"):
+        on = occurrence(profile.hire_date, ranges)
+        years = on.year - profile.hire_date.year
+        if years > 0:
+            anniversaries.append({**entry(profile, on), "years": years})
+
+    birthdays.sort(key=lambda item: (item["date"], item["name"]))
+    anniversaries.sort(key=lambda item: (item["date"], -item["years"], item["name"]))
+    return {"birthdays": birthdays, "anniversaries": anniversaries}
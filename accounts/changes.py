@@ -0,0 +1,64 @@
+"""
+Change recording shared by signals and direct ``.update()`` writers.
+
+Every user/profile/department write goes through here so that the delta-sync
+log (UserChange) and the live event stream (accounts.events) stay in step.
+Both carry the organization of the changed row, so each tenant's clients
+only page through, and are only woken by, their own organization's changes.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.db import transaction
+
+from . import dashboard, events
+from .models import UserChange
+
+_batch = ContextVar('user_change_batch', default=None)
+
+
+@contextmanager
+def batch_user_changes():
+    """
+    Collect change-log rows and events produced inside the block (e.g. one
+    post_delete per user in a bulk delete, or a user and profile saved
+    together) into a single bulk insert and a single publish, dropping
+    duplicates; dashboard counter changes are applied together as well.
+    Use inside a transaction; nested blocks join the outer one.
+    """
+    if _batch.get() is not None:
+        yield
+        return
+    changes, pending = {}, {}
+    token = _batch.set((changes, pending))
+    try:
+        with dashboard.batch_counts():
+            yield
+    finally:
+        _batch.reset(token)
+    if changes:
+        UserChange.objects.bulk_create(changes.values())
+    if pending:
+        transaction.on_commit(partial(events.broadcaster.publish, *pending.values()))
+
+
+def record_user_change(user_id, organization_id, kind='updated'):
+    """Log a change to a user of ``organization_id`` for delta sync and announce it once committed."""
+    change = UserChange(user_id=user_id, organization_id=organization_id, deleted=kind == 'deleted')
+    batch = _batch.get()
+    if batch is not None:
+        batch[0].setdefault((user_id, change.deleted), change)
+    else:
+        change.save()
+    publish_on_commit('user.' + kind, user_id, organization_id)
+
+
+def publish_on_commit(event_type, object_id, organization_id, **extra):
+    event = {'type': event_type, 'id': object_id, 'organization': organization_id, **extra}
+    batch = _batch.get()
+    if batch is not None:
+        batch[1].setdefault((event_type, object_id), event)
+    else:
+        transaction.on_commit(partial(events.broadcaster.publish, event))
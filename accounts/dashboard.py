@@ -0,0 +1,473 @@
+"""
+Admin dashboard figures from incrementally maintained summary rows.
+
+Every active user adds 1 to a few DashboardCounter rows: headcount per
+(department, role), the same for users who have a profile and for those
+whose profile is complete (COMPLETE_FIELDS all filled in), and hires per
+month of ``hire_date``. The user, profile and department signals
+(accounts/signals.py) work out how a write moves a user's contribution,
+comparing the values the instance was loaded with (ChangeTrackingMixin)
+with the values saved, and apply the difference in the writer's
+transaction with one ``UPDATE ... SET value = value + CASE ... END``.
+Inside ``batch_user_changes()`` the differences of the whole block are
+applied together. The dashboard then reads a few dozen rows instead of
+counting the user and profile tables.
+
+Counters belong to the user's organization and are read, reconciled and
+scheduled per tenant, so a large organization's write volume and recounts
+never touch a small one's rows.
+
+Writes that bypass signals (queryset ``.update()``, ``bulk_create`` as in
+``generate_workforce``) leave drift behind, as can two writers racing to
+insert the same new row. ``reconcile()`` recounts everything from the live
+tables and corrects it; it runs as the ``dashboard.reconcile`` job, queued
+by the dashboard endpoint once the last run is older than
+DASHBOARD_RECONCILE_INTERVAL, and from cron by
+``manage.py reconcile_dashboard``.
+"""
+
+import time
+from collections import Counter as Tally
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.functions import TruncMonth
+
+from backend.metrics import Counter
+
+from . import jobs, tenancy
+from .models import DashboardCounter, Department, EmployeeProfile, Job, Organization, User
+
+Metric = DashboardCounter.Metric
+TASK = "dashboard.reconcile"
+# Seconds between a process's "is a reconciliation queued?" checks
+RECONCILE_CHECK_INTERVAL = 60
+# Months of hires returned by figures()
+HIRE_MONTHS = 12
+
+# A profile counts as complete once all of these are filled in
+COMPLETE_FIELDS = (
+    "department", "position", "hire_date", "id_number", "date_of_birth",
+    "gender", "phone", "physical_address", "payroll_number",
+)
+USER_FIELDS = ("is_active", "role", "organization_id")
+PROFILE_FIELDS = tuple(EmployeeProfile._meta.get_field(name).attname for name in COMPLETE_FIELDS)
+GROUPED = (Metric.HEADCOUNT, Metric.PROFILES, Metric.COMPLETE)
+
+DRIFT = Counter(
+    "dashboard_counter_drift_total",
+    "Dashboard counter rows corrected by reconciliation, by metric.",
+    ("metric",),
+)
+
+_pending = ContextVar("dashboard_pending", default=None)
+# Last "is a reconciliation queued?" check per tenant
+_reconcile_checked = {}
+
+
+def month_key(value):
+    return str(value)[:7]
+
+
+def group_key(department_id, role):
+    return f"{department_id or 0}:{role}"
+
+
+def contribution(user, profile):
+    """
+    The (organization, metric, key) rows a user adds 1 to, given their stored
+    USER_FIELDS and their profile's PROFILE_FIELDS (None without a profile).
+    """
+    if user is None or not user["is_active"]:
+        return []
+    organization_id = user["organization_id"]
+    if profile is None:
+        return [(organization_id, Metric.HEADCOUNT, group_key(None, user["role"]))]
+    group = group_key(profile["department_id"], user["role"])
+    rows = [(organization_id, Metric.HEADCOUNT, group), (organization_id, Metric.PROFILES, group)]
+    if all(value not in (None, "") for value in profile.values()):
+        rows.append((organization_id, Metric.COMPLETE, group))
+    if profile["hire_date"]:
+        rows.append((organization_id, Metric.HIRES, month_key(profile["hire_date"])))
+    return rows
+
+
+def _loaded(instance, attnames):
+    """``attnames`` as last read from or written to the database, or None if not known."""
+    loaded = getattr(instance, "_loaded_values", None)
+    if instance is None or loaded is None or instance._state.adding or not all(a in loaded for a in attnames):
+        return None
+    return {attname: loaded[attname] for attname in attnames}
+
+
+def _saved(instance, attnames, stored, update_fields):
+    """The values of ``attnames`` after saving ``instance`` with ``update_fields``."""
+    values = {attname: getattr(instance, attname) for attname in attnames}
+    if update_fields is None or stored is None:
+        return values
+    written = set(update_fields)
+    return {
+        attname: value if attname in written or attname.removesuffix("_id") in written else stored[attname]
+        for attname, value in values.items()
+    }
+
+
+def stored_user(user_id, instance=None):
+    return _loaded(instance, USER_FIELDS) or User._base_manager.filter(pk=user_id).values(*USER_FIELDS).first()
+
+
+def stored_profile(user_id, instance=None):
+    if instance is not None:
+        return _loaded(instance, PROFILE_FIELDS) or stored_profile(user_id)
+    return EmployeeProfile._base_manager.filter(user_id=user_id).values(*PROFILE_FIELDS).first()
+
+
+def _cached_profile(user):
+    """The user's stored profile values, reusing a profile loaded alongside them."""
+    if User.profile.is_cached(user):
+        profile = User.profile.related.get_cached_value(user)
+        return None if profile is None else stored_profile(user.pk, profile)
+    return stored_profile(user.pk)
+
+
+def _cached_user(profile):
+    """The profile's user's stored values, reusing a user loaded alongside it."""
+    if not EmployeeProfile.user.is_cached(profile):
+        return stored_user(profile.user_id)
+    user = profile.user
+    if getattr(user, "_loaded_values", None) is None and getattr(user, "_dashboard_stored", False) is None:
+        # Inserted by the save whose post_save is creating this profile
+        return {attname: getattr(user, attname) for attname in USER_FIELDS}
+    return stored_user(user.pk, user)
+
+
+@contextmanager
+def batch_counts():
+    """
+    Apply the counter changes made inside the block with one UPDATE when it
+    exits. Use inside a transaction; nested blocks join the outer one.
+    """
+    if _pending.get() is not None:
+        yield
+        return
+    deltas = Tally()
+    token = _pending.set(deltas)
+    try:
+        yield
+    finally:
+        _pending.reset(token)
+    apply(deltas)
+
+
+def move(before, after):
+    """Move a user's contribution from the ``before`` rows to the ``after`` rows."""
+    deltas = Tally(after)
+    deltas.subtract(before)
+    pending = _pending.get()
+    if pending is not None:
+        pending.update(deltas)
+    else:
+        apply(deltas)
+
+
+def _row(organization_id, metric, key):
+    return Q(organization_id=organization_id, metric=metric, key=key)
+
+
+def apply(deltas):
+    """Add ``{(organization, metric, key): amount}`` to the counters; one query unless a row is new."""
+    deltas = {row: amount for row, amount in deltas.items() if amount}
+    if not deltas:
+        return
+    # Rows are named with their organization; no tenant filter needed
+    counters = DashboardCounter._base_manager
+    matches = Q()
+    for row in deltas:
+        matches |= _row(*row)
+    if len(deltas) == 1:
+        increment = Value(next(iter(deltas.values())))
+    else:
+        increment = Case(*(When(_row(*row), then=Value(amount)) for row, amount in deltas.items()), default=Value(0))
+    updated = counters.filter(matches).update(value=F("value") + increment)
+    if updated == len(deltas):
+        return
+    existing = set(counters.filter(matches).values_list("organization_id", "metric", "key"))
+    for (organization_id, metric, key), amount in deltas.items():
+        if (organization_id, metric, key) in existing:
+            continue
+        try:
+            with transaction.atomic():
+                counters.create(organization_id=organization_id, metric=metric, key=key, value=amount)
+        except IntegrityError:
+            # Inserted by a concurrent writer since we looked
+            counters.filter(_row(organization_id, metric, key)).update(value=F("value") + amount)
+
+
+# Signal hooks (accounts/signals.py)
+
+def user_saving(user, update_fields=None):
+    """pre_save: remember what the stored row counts as."""
+    if update_fields is not None and not set(update_fields) & set(USER_FIELDS):
+        user._dashboard_stored = False
+    else:
+        user._dashboard_stored = None if user._state.adding else stored_user(user.pk, user)
+
+
+def user_saved(user, created, update_fields=None):
+    stored = getattr(user, "_dashboard_stored", None)
+    if stored is False:
+        return
+    if created:
+        # The profile, if any, is created afterwards and moves the row itself
+        move([], contribution(_saved(user, USER_FIELDS, None, None), None))
+        return
+    saved = _saved(user, USER_FIELDS, stored, update_fields)
+    if saved != stored:
+        profile = _cached_profile(user)
+        move(contribution(stored, profile), contribution(saved, profile))
+
+
+def profile_saving(profile):
+    profile._dashboard_stored = None if profile._state.adding else stored_profile(profile.user_id, profile)
+
+
+def profile_saved(profile, update_fields=None):
+    stored = getattr(profile, "_dashboard_stored", None)
+    profile_changed(profile, stored, _saved(profile, PROFILE_FIELDS, stored, update_fields))
+
+
+def profile_changed(profile, stored, saved):
+    """A profile went from ``stored`` to ``saved`` values (None: no profile)."""
+    if saved != stored:
+        user = _cached_user(profile)
+        move(contribution(user, stored), contribution(user, saved))
+
+
+def users_deleting(user_ids):
+    """Before ``user_ids`` are deleted: take them out of the counters with one read."""
+    rows = (
+        User._base_manager.filter(pk__in=user_ids, is_active=True)
+        .values("role", "organization_id", "profile__user_id", *(f"profile__{attname}" for attname in PROFILE_FIELDS))
+    )
+    before = []
+    for row in rows:
+        profile = None
+        if row["profile__user_id"] is not None:
+            profile = {attname: row[f"profile__{attname}"] for attname in PROFILE_FIELDS}
+        user = {"is_active": True, "role": row["role"], "organization_id": row["organization_id"]}
+        before += contribution(user, profile)
+    move(before, [])
+
+
+def department_deleted(department_id):
+    """
+    Deleting a department set its profiles' department to NULL behind the
+    signals' back: their rows move to "no department", and they are no
+    longer complete.
+    """
+    rows = DashboardCounter._base_manager.filter(metric__in=GROUPED, key__startswith=f"{department_id}:")
+    deltas = Tally()
+    for organization_id, metric, key, value in rows.values_list("organization_id", "metric", "key", "value"):
+        if metric != Metric.COMPLETE:
+            deltas[(organization_id, metric, group_key(None, key.partition(":")[2]))] += value
+    rows.delete()
+    apply(deltas)
+
+
+# Reconciliation
+
+def expected_counts():
+    """Every counter recounted from the live tables: {(organization, metric, key): value}."""
+    complete = Q()
+    for name in COMPLETE_FIELDS:
+        complete &= Q(**{f"profile__{name}__isnull": False})
+        if EmployeeProfile._meta.get_field(name).get_internal_type() in ("CharField", "TextField"):
+            complete &= ~Q(**{f"profile__{name}": ""})
+    groups = (
+        User.objects.filter(is_active=True)
+        .values("organization_id", "role", "profile__department_id")
+        .annotate(
+            headcount=Count("pk"),
+            profiles=Count("profile__pk"),
+            complete=Count("profile__pk", filter=complete),
+        )
+        .order_by()
+    )
+    counts = {}
+    for row in groups:
+        key = group_key(row["profile__department_id"], row["role"])
+        for metric in GROUPED:
+            if row[metric]:
+                counter = (row["organization_id"], metric, key)
+                counts[counter] = counts.get(counter, 0) + row[metric]
+    hires = (
+        EmployeeProfile.objects.filter(user__is_active=True, hire_date__isnull=False)
+        .annotate(month=TruncMonth("hire_date"))
+        .values("organization_id", "month")
+        .annotate(n=Count("pk"))
+        .order_by()
+    )
+    for row in hires:
+        counts[(row["organization_id"], Metric.HIRES, month_key(row["month"]))] = row["n"]
+    return counts
+
+
+def reconcile():
+    """
+    Recount the current tenant's counters and correct the stored rows;
+    returns what was corrected. Unscoped, every organization is reconciled
+    in turn, each in its own transaction.
+    """
+    organization_id = tenancy.current()
+    if organization_id is None:
+        totals = {"rows": 0, "corrected": 0, "drift": Tally()}
+        for organization_id in Organization.objects.order_by("pk").values_list("pk", flat=True):
+            with tenancy.tenant(organization_id):
+                result = reconcile()
+            totals["rows"] += result["rows"]
+            totals["corrected"] += result["corrected"]
+            totals["drift"].update(result["drift"])
+        return {**totals, "drift": dict(totals["drift"])}
+    with transaction.atomic():
+        # Locking the rows first makes concurrent writers wait, so their
+        # changes land either in our count or on top of our corrections.
+        stored = {
+            (organization_id, metric, key): (pk, value)
+            for pk, metric, key, value in DashboardCounter.objects.select_for_update()
+            .exclude(metric=Metric.RECONCILED)
+            .values_list("pk", "metric", "key", "value")
+        }
+        expected = expected_counts()
+        drift, changed, created, obsolete = Tally(), [], [], []
+        for row in stored.keys() | expected.keys():
+            pk, value = stored.get(row, (None, 0))
+            target = expected.get(row, 0)
+            if value != target:
+                drift[row[1]] += 1
+            if pk is None:
+                created.append(DashboardCounter(organization_id=row[0], metric=row[1], key=row[2], value=target))
+            elif not target:
+                obsolete.append(pk)
+            elif value != target:
+                changed.append(DashboardCounter(pk=pk, value=target))
+        DashboardCounter.objects.bulk_update(changed, ["value"], batch_size=500)
+        DashboardCounter.objects.bulk_create(created, batch_size=500)
+        DashboardCounter.objects.filter(pk__in=obsolete).delete()
+        DashboardCounter.objects.update_or_create(
+            organization_id=organization_id, metric=Metric.RECONCILED, key="",
+            defaults={"value": int(time.time())},
+        )
+    for metric, rows in drift.items():
+        DRIFT.inc(metric, amount=rows)
+    return {"rows": len(expected), "corrected": sum(drift.values()), "drift": dict(drift)}
+
+
+def schedule_reconcile(user=None, force=False):
+    """
+    Queue a reconciliation of the current tenant unless one is already
+    queued or running; returns that job. Without ``force`` a process asks at
+    most once per RECONCILE_CHECK_INTERVAL per tenant and returns None in
+    between.
+    """
+    organization_id = tenancy.current()
+    now = time.monotonic()
+    if not force and now - _reconcile_checked.get(organization_id, 0.0) < RECONCILE_CHECK_INTERVAL:
+        return None
+    _reconcile_checked[organization_id] = now
+    pending = Job.objects.filter(
+        kind=TASK, organization_id=organization_id, status__in=[Job.Status.QUEUED, Job.Status.RUNNING]
+    ).first()
+    return pending or jobs.enqueue(TASK, user=user)
+
+
+# Reading
+
+def load():
+    """
+    The current tenant's stored counters as {metric: {key: value}} (one
+    query). Unscoped, the organizations' rows are added up and the oldest
+    reconciliation is reported.
+    """
+    counters = {metric: {} for metric in Metric.values}
+    for metric, key, value in DashboardCounter.objects.values_list("metric", "key", "value"):
+        if metric == Metric.RECONCILED:
+            counters[metric][key] = min(value, counters[metric].get(key, value))
+        else:
+            counters[metric][key] = counters[metric].get(key, 0) + value
+    return counters
+
+
+def reconciled_at(counters):
+    stamp = counters[Metric.RECONCILED].get("")
+    return datetime.fromtimestamp(stamp, dt_timezone.utc) if stamp is not None else None
+
+
+def role_headcount(counters):
+    roles = dict.fromkeys(User.Roles.values, 0)
+    for key, value in counters[Metric.HEADCOUNT].items():
+        role = key.partition(":")[2]
+        roles[role] = roles.get(role, 0) + value
+    return roles
+
+
+def _months_back(today, count):
+    year, month = today.year, today.month
+    for _ in range(count):
+        yield f"{year:04d}-{month:02d}"
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+
+
+def figures(counters, today):
+    """
+    Headcount by department and role, hires of the last HIRE_MONTHS months
+    and profile completeness, from ``load()``'s counters plus one query for
+    department names.
+    """
+    departments = {}
+    for metric in GROUPED:
+        for key, value in counters[metric].items():
+            department_id, _, role = key.partition(":")
+            entry = departments.setdefault(int(department_id), {"roles": {}, **dict.fromkeys(GROUPED, 0)})
+            entry[metric] += value
+            if metric == Metric.HEADCOUNT:
+                entry["roles"][role] = entry["roles"].get(role, 0) + value
+
+    names = dict(Department.objects.filter(pk__in=[pk for pk in departments if pk]).values_list("pk", "name"))
+    by_department = []
+    for department_id, entry in departments.items():
+        if not entry[Metric.HEADCOUNT]:
+            continue
+        by_department.append({
+            "id": department_id or None,
+            "name": names.get(department_id, ""),
+            "headcount": entry[Metric.HEADCOUNT],
+            "roles": {role: n for role, n in entry["roles"].items() if n},
+            "profiles": entry[Metric.PROFILES],
+            "complete_profiles": entry[Metric.COMPLETE],
+        })
+    by_department.sort(key=lambda entry: (entry["id"] is None, entry["name"]))
+
+    hires = counters[Metric.HIRES]
+    months = list(_months_back(today, HIRE_MONTHS))
+    profiles = sum(counters[Metric.PROFILES].values())
+    complete = sum(counters[Metric.COMPLETE].values())
+    return {
+        "headcount": sum(counters[Metric.HEADCOUNT].values()),
+        "roles": role_headcount(counters),
+        "departments": by_department,
+        "new_hires": {
+            "this_month": hires.get(months[0], 0),
+            "previous_month": hires.get(months[1], 0),
+            "by_month": [{"month": month, "count": hires.get(month, 0)} for month in reversed(months)],
+        },
+        "profile_completeness": {
+            "profiles": profiles,
+            "complete": complete,
+            "percent": round(100 * complete / profiles, 1) if profiles else None,
+            "fields": list(COMPLETE_FIELDS),
+        },
+        "reconciled_at": reconciled_at(counters),
+    }
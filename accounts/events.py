@@ -0,0 +1,172 @@
+"""
+Live directory change events, pushed to admin consoles over server-sent events.
+
+Each worker process has one ``Broadcaster``. Writers publish compact events
+(``{"type": "user.updated", "id": 42, "organization": 3}``) from
+``transaction.on_commit`` hooks (see accounts.changes); the broadcaster fans
+them out through per-connection asyncio queues, so an idle connection is just
+a suspended coroutine. Connections are grouped by tenant and an event only
+visits its own organization's connections (plus unscoped ones), so a busy
+organization's writes cost nothing to the consoles of the others.
+
+With ``EVENTS_PG_NOTIFY`` enabled (PostgreSQL), published events are also sent
+with ``pg_notify`` and every worker that has subscribers runs a single
+``LISTEN`` thread, so events reach connections held by other processes.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import select
+import threading
+import uuid
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "hr_directory_events"
+RESYNC = {"type": "resync"}
+
+
+class Broadcaster:
+    def __init__(self, queue_size=256):
+        self.queue_size = queue_size
+        self.origin = uuid.uuid4().hex
+        # organization id (None: unscoped) -> {(loop, queue)}
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._listener_pid = None
+
+    def subscribe(self, organization_id=None):
+        """
+        Register a queue on the running event loop for ``organization_id``'s
+        events (None: every organization's); pass it to unsubscribe().
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        entry = (asyncio.get_running_loop(), queue, organization_id)
+        with self._lock:
+            self._subscribers.setdefault(organization_id, set()).add(entry[:2])
+        if getattr(settings, "EVENTS_PG_NOTIFY", False):
+            self._ensure_listener()
+        return entry
+
+    def unsubscribe(self, entry):
+        loop, queue, organization_id = entry
+        with self._lock:
+            subscribers = self._subscribers.get(organization_id)
+            if subscribers is not None:
+                subscribers.discard((loop, queue))
+                if not subscribers:
+                    del self._subscribers[organization_id]
+
+    @property
+    def subscriber_count(self):
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, *events):
+        """Deliver to local subscribers and, if enabled, to other workers."""
+        for event in events:
+            self._fan_out(event)
+        if events and getattr(settings, "EVENTS_PG_NOTIFY", False):
+            self._notify(events)
+
+    def _notify(self, events, max_payload=7000):
+        # NOTIFY payloads are capped at 8000 bytes; send events in chunks.
+        chunks, chunk, size = [], [], 0
+        for event in events:
+            encoded = json.dumps(event, separators=(",", ":"))
+            if chunk and size + len(encoded) > max_payload:
+                chunks.append(chunk)
+                chunk, size = [], 0
+            chunk.append(encoded)
+            size += len(encoded) + 1
+        chunks.append(chunk)
+        try:
+            with connection.cursor() as cursor:
+                for chunk in chunks:
+                    payload = f'{{"origin":"{self.origin}","events":[{",".join(chunk)}]}}'
+                    cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, payload])
+        except Exception:
+            logger.exception("Could not NOTIFY directory events")
+
+    def _fan_out(self, event):
+        with self._lock:
+            if "organization" in event:
+                groups = {event["organization"], None} & self._subscribers.keys()
+            else:  # resync markers go to everyone
+                groups = set(self._subscribers)
+            subscribers = [(*entry, group) for group in groups for entry in self._subscribers[group]]
+        for loop, queue, group in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:  # loop closed; connection is going away
+                self.unsubscribe((loop, queue, group))
+
+    def _ensure_listener(self):
+        pid = os.getpid()
+        with self._lock:
+            if self._listener_pid == pid:
+                return
+            self._listener_pid = pid
+        threading.Thread(target=self._listen, name="directory-events-listen", daemon=True).start()
+
+    def _listen(self):
+        """Relay NOTIFY payloads from other processes to local subscribers."""
+        params = connection.get_connection_params()
+        while True:
+            try:
+                conn = connection.Database.connect(**params)
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                while True:
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        message = json.loads(conn.notifies.pop(0).payload)
+                        if message.get("origin") != self.origin:
+                            for event in message["events"]:
+                                self._fan_out(event)
+            except Exception:
+                logger.exception("Directory event listener failed; reconnecting")
+                # Subscribers may have missed events while disconnected.
+                self._fan_out(RESYNC)
+                threading.Event().wait(5)
+
+
+def _offer(queue, event):
+    # A consumer that fell behind gets a resync marker instead of unbounded
+    # buffering; it should then catch up through /api/admin/users/changes/.
+    if queue.full():
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESYNC)
+        return
+    queue.put_nowait(event)
+
+
+broadcaster = Broadcaster()
+
+
+def format_event(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+async def event_stream(heartbeat, organization_id=None):
+    entry = broadcaster.subscribe(organization_id)
+    _, queue, _ = entry
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_event(event)
+    finally:
+        broadcaster.unsubscribe(entry)
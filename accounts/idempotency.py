@@ -0,0 +1,106 @@
+"""
+Safe client retries for non-idempotent endpoints.
+
+A view method wrapped in ``@idempotent`` and called with an
+``Idempotency-Key`` header runs in one transaction with the insert of an
+IdempotencyRecord for (endpoint, caller, key), where the caller is the
+signed-in user or, for anonymous requests such as signup, the client
+address, so clients never share a key space. A successful response is
+stored on that record before commit, so either both the write and the
+stored response exist or neither does. A retry with the same key gets the
+stored response back with ``Idempotent-Replayed: true``. On PostgreSQL a
+concurrent duplicate waits on the unique index until the first request
+commits and is then answered the same way. Error responses roll the
+transaction back, so the key can be retried.
+
+The same key with a different request body is rejected with 422. Keys
+expire after ``IDEMPOTENCY_TTL_HOURS``; ``manage.py prune_idempotency_keys``
+deletes old records.
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyRecord
+from .throttling import client_ip
+
+HEADER = "Idempotency-Key"
+# Never part of the stored fingerprint
+SECRET_FIELDS = frozenset({"password", "confirm_password"})
+
+
+def request_fingerprint(request):
+    data = request.data
+    items = data.lists() if hasattr(data, "lists") else data.items()
+    fields = sorted((k, v) for k, v in items if k not in SECRET_FIELDS and k not in request.FILES)
+    files = sorted((name, f.name, f.size) for name, f in request.FILES.items())
+    payload = json.dumps([fields, files], default=str, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def caller(request):
+    user = request.user
+    if user and user.is_authenticated:
+        return f"user:{user.pk}"
+    return f"ip:{client_ip(request)}"
+
+
+def replay(record):
+    if record.response_status is None:
+        return Response(
+            {"detail": "A request with this Idempotency-Key is still being processed"},
+            status=status.HTTP_409_CONFLICT,
+        )
+    response = Response(record.response_body, status=record.response_status)
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def idempotent(method):
+    """Decorator for APIView handler methods (post/put/patch)."""
+
+    @wraps(method)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get(HEADER, "").strip()
+        if not key:
+            return method(view, request, *args, **kwargs)
+        if len(key) > 255:
+            return Response({"detail": f"{HEADER} is too long"}, status=status.HTTP_400_BAD_REQUEST)
+
+        scope = f"{request.method} {request.path} {caller(request)}"[:200]
+        fingerprint = request_fingerprint(request)
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    record = IdempotencyRecord.objects.create(scope=scope, key=key, fingerprint=fingerprint)
+            except IntegrityError:
+                record = IdempotencyRecord.objects.select_for_update().get(scope=scope, key=key)
+                expired = record.created_at < timezone.now() - timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)
+                if not expired:
+                    if record.fingerprint != fingerprint:
+                        return Response(
+                            {"detail": f"This {HEADER} was used with a different request"},
+                            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        )
+                    return replay(record)
+                record.fingerprint, record.created_at = fingerprint, timezone.now()
+                record.response_status = record.response_body = None
+                record.save()
+
+            response = method(view, request, *args, **kwargs)
+            if not 200 <= response.status_code < 300:
+                transaction.set_rollback(True)
+                return response
+            record.response_status, record.response_body = response.status_code, response.data
+            record.save(update_fields=["response_status", "response_body"])
+        return response
+
+    return wrapper
@@ -0,0 +1,193 @@
+"""
+Database-backed background jobs; no broker needed.
+
+Handlers are registered with ``@task("name")`` (see accounts/tasks.py) and
+called as ``handler(job, **job.args)``. They report progress through
+``job.report_progress(done, total, message)`` and return a JSON-able
+result; a ``url`` in the result is exposed as the job's result link by
+/api/jobs/<id>/.
+
+``enqueue`` inserts a row in the caller's transaction, so a job is only
+visible to workers once the work that created it has committed. The job
+records the caller's tenant and its handler runs scoped to it
+(accounts/tenancy.py). Workers
+(``manage.py run_jobs``) claim jobs with a conditional UPDATE: whichever
+worker's UPDATE matches the still-queued row owns it, on SQLite and
+PostgreSQL alike. A failed attempt is retried with exponential backoff
+until ``max_attempts``.
+
+With ``JOBS_EAGER`` (tests, single-process setups) a job runs in the
+enqueuing process right after commit, retrying immediately.
+"""
+
+import logging
+import os
+import random
+import socket
+import traceback
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from backend.metrics import Counter
+
+from . import tenancy
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+RUNS = Counter(
+    "jobs_total",
+    "Background job attempts by kind and outcome (succeeded, retried, failed, lost).",
+    ("kind", "outcome"),
+)
+
+
+def task(name):
+    """Register a job handler under ``name``."""
+    def register(fn):
+        TASKS[name] = fn
+        return fn
+    return register
+
+
+def enqueue(kind, args=None, user=None, delay=0, max_attempts=None):
+    if kind not in TASKS:
+        raise KeyError(f"No job handler registered as {kind!r}")
+    job = Job.objects.create(
+        kind=kind,
+        args=args or {},
+        created_by=user if user is not None and user.is_authenticated else None,
+        organization_id=tenancy.current(),
+        run_after=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+    if settings.JOBS_EAGER:
+        transaction.on_commit(partial(run_eagerly, job.pk))
+    return job
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"[:64]
+
+
+def _claimable(now):
+    expired = Q(status=Job.Status.RUNNING, locked_until__lt=now, attempts__lt=F("max_attempts"))
+    return Q(status=Job.Status.QUEUED, run_after__lte=now) | expired
+
+
+def claim(worker, job_id=None, candidates=10):
+    """
+    Take the next due job (or ``job_id``, whenever it is due) for ``worker``.
+    Returns the claimed Job or None.
+    """
+    now = timezone.now()
+    # Jobs whose worker died on their last attempt will never be claimed again
+    Job.objects.filter(
+        status=Job.Status.RUNNING, locked_until__lt=now, attempts__gte=F("max_attempts")
+    ).update(status=Job.Status.FAILED, error="Worker stopped responding", finished_at=now)
+
+    if job_id is not None:
+        ids = [job_id]
+        due = Q(status=Job.Status.QUEUED) | _claimable(now)
+    else:
+        due = _claimable(now)
+        ids = list(Job.objects.filter(due).order_by("run_after", "id").values_list("id", flat=True)[:candidates])
+    for pk in ids:
+        claimed = Job.objects.filter(due, pk=pk).update(
+            status=Job.Status.RUNNING,
+            locked_by=worker,
+            locked_until=now + timedelta(seconds=settings.JOBS_LEASE_SECONDS),
+            attempts=F("attempts") + 1,
+            started_at=now,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def backoff(attempts):
+    delay = min(settings.JOBS_RETRY_BACKOFF * 2 ** (attempts - 1), 3600)
+    return delay * random.uniform(1.0, 1.1)
+
+
+def run(job):
+    """Run a claimed job and record the outcome. Returns the new status, or None if the lease was lost."""
+    handler = TASKS.get(job.kind)
+    mine = Job.objects.filter(pk=job.pk, status=Job.Status.RUNNING, locked_by=job.locked_by)
+    try:
+        if handler is None:
+            raise LookupError(f"No job handler registered as {job.kind!r}")
+        with tenancy.tenant(job.organization_id):
+            result = handler(job, **job.args)
+    except Job.LeaseLost:
+        return _lost(job)
+    except Exception:
+        logger.exception("Job %s (%s) failed on attempt %s", job.pk, job.kind, job.attempts)
+        error = traceback.format_exc()[-4000:]
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            outcome, fields = Job.Status.QUEUED, {"run_after": now + timedelta(seconds=backoff(job.attempts))}
+        else:
+            outcome, fields = Job.Status.FAILED, {"finished_at": now}
+        if not mine.update(status=outcome, error=error, locked_by="", locked_until=None, **fields):
+            return _lost(job)
+        RUNS.inc(job.kind, "retried" if outcome == Job.Status.QUEUED else "failed")
+        return outcome
+
+    done = job.progress_total if job.progress_total is not None else job.progress_done
+    updated = mine.update(
+        status=Job.Status.SUCCEEDED,
+        result=result,
+        error="",
+        progress_done=done,
+        finished_at=timezone.now(),
+        locked_by="",
+        locked_until=None,
+    )
+    if not updated:
+        return _lost(job)
+    RUNS.inc(job.kind, "succeeded")
+    return Job.Status.SUCCEEDED
+
+
+def _lost(job):
+    RUNS.inc(job.kind, "lost")
+    logger.warning("Lost the lease on job %s; another worker took it over", job.pk)
+    return None
+
+
+def run_eagerly(job_id):
+    worker = worker_name()
+    while True:
+        job = claim(worker, job_id=job_id)
+        if job is None or run(job) != Job.Status.QUEUED:
+            return
+
+
+def work(stop, worker=None, once=False, poll=None):
+    """
+    Claim and run jobs until ``stop`` (a threading.Event) is set; with
+    ``once``, return as soon as nothing is due. Returns the number of jobs run.
+    """
+    worker = worker or worker_name()
+    poll = settings.JOBS_POLL_INTERVAL if poll is None else poll
+    count = 0
+    while not stop.is_set():
+        close_old_connections()
+        job = claim(worker)
+        if job is None:
+            if once:
+                break
+            stop.wait(poll)
+            continue
+        run(job)
+        count += 1
+    close_old_connections()
+    return count
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from accounts.attendance import ensure_partitions
+
+
+class Command(BaseCommand):
+    help = "Create upcoming monthly partitions of the clock event table (PostgreSQL). Run monthly."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months-ahead", type=int, default=2)
+
+    def handle(self, *args, **options):
+        names = ensure_partitions(months_ahead=options["months_ahead"])
+        if not names:
+            self.stdout.write("Nothing to do (clock events are only partitioned on PostgreSQL)")
+            return
+        self.stdout.write(self.style.SUCCESS(f"Partitions present: {', '.join(names)}"))
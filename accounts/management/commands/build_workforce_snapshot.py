@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from accounts import snapshot, tenancy
+from accounts.models import Organization
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild every organization's workforce analytics snapshot, and the deployment-wide one, "
+        "now (or queue it with --queue). Suitable for cron."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queue", action="store_true", help="Queue the rebuild jobs instead of building here")
+
+    def handle(self, *args, **options):
+        for organization_id in [*Organization.objects.order_by("pk").values_list("pk", flat=True), None]:
+            with tenancy.tenant(organization_id):
+                if options["queue"]:
+                    job = snapshot.schedule_rebuild(force=True)
+                    self.stdout.write(self.style.SUCCESS(
+                        f"Queued {tenancy.label()} snapshot rebuild as job {job.pk}"
+                    ))
+                    continue
+                result = snapshot.build()
+                self.stdout.write(self.style.SUCCESS(
+                    f"Built {tenancy.label()}/{result['snapshot']} with {result['rows']} rows"
+                ))
@@ -0,0 +1,23 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.static import brotli, compress_tree
+
+
+class Command(BaseCommand):
+    help = "Write .gz (and .br with brotli installed) variants of the built frontend. Run after vite build."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("roots", nargs="*", help="Directories to compress (default: FRONTEND_DIST)")
+
+    def handle(self, *args, **options):
+        for root in options["roots"] or [settings.FRONTEND_DIST]:
+            if not os.path.isdir(root):
+                raise CommandError(f"{root} is not a directory; build the frontend first")
+            files, variants = compress_tree(root)
+            self.stdout.write(self.style.SUCCESS(f"{root}: wrote {variants} variants for {files} files"))
+        if brotli is None:
+            self.stdout.write("brotli is not installed; only gzip variants were written")
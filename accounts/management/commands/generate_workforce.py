@@ -0,0 +1,181 @@
+import io
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from accounts import dashboard, tenancy
+from accounts.models import Department, EmployeeProfile, Organization, UserChange, mmdd
+
+User = get_user_model()
+
+FIRST_NAMES = [
+    "Amina", "Brian", "Cynthia", "David", "Esther", "Felix", "Grace", "Hassan", "Irene", "James",
+    "Kevin", "Lucy", "Moses", "Njeri", "Otieno", "Purity", "Quincy", "Ruth", "Samuel", "Tabitha",
+]
+LAST_NAMES = [
+    "Achieng", "Barasa", "Chebet", "Dida", "Easton", "Farah", "Gitau", "Hussein", "Ibrahim", "Juma",
+    "Kamau", "Langat", "Mwangi", "Njoroge", "Ochieng", "Wanjiru", "Kiprop", "Mutua", "Omondi", "Wafula",
+]
+POSITIONS = ["Analyst", "Engineer", "Accountant", "Officer", "Coordinator", "Manager", "Associate", "Technician"]
+GENDERS = ["Male", "Female"]
+AVATAR_COLORS = [(52, 152, 219), (46, 204, 113), (155, 89, 182), (241, 196, 15), (231, 76, 60), (26, 188, 156)]
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic workforce (users, profiles, departments, avatars) with bulk inserts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--departments", type=int, default=20)
+        parser.add_argument("--avatars", type=int, default=6, help="Distinct avatar images to share (0 for none).")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--password", default="password")
+        parser.add_argument("--prefix", default="synthetic")
+        parser.add_argument("--span", type=int, default=8,
+                            help="Direct reports per manager in the generated hierarchy (0 for none).")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--clear", action="store_true", help="Delete previously generated users first.")
+        parser.add_argument("--organization", default="",
+                            help="Slug of the organization to fill (created if missing; default DEFAULT_ORGANIZATION).")
+
+    def handle(self, *args, **options):
+        if options["users"] < 0 or options["departments"] < 1:
+            raise CommandError("--users must be >= 0 and --departments >= 1")
+
+        if options["organization"]:
+            slug = options["organization"]
+            organization, _ = Organization.objects.get_or_create(
+                slug=slug, defaults={"name": slug.replace("-", " ").title()}
+            )
+            self.organization_id = organization.pk
+        else:
+            self.organization_id = tenancy.default_organization_id()
+        with tenancy.tenant(self.organization_id):
+            self.generate(options)
+
+    def generate(self, options):
+        rng = random.Random(options["seed"])
+        prefix = options["prefix"]
+        if options["clear"]:
+            deleted, _ = User.objects.filter(username__startswith=prefix).delete()
+            self.stdout.write(f"Deleted {deleted} existing synthetic rows")
+
+        departments = self.ensure_departments(options["departments"])
+        avatars = self.ensure_avatars(options["avatars"])
+        # Hash once: PBKDF2 per user would dominate generation time.
+        password = make_password(options["password"])
+        # Usernames are unique across organizations
+        start = User._base_manager.filter(username__startswith=prefix).count()
+        # (user_id, org_path) of every profile generated so far, in order;
+        # profile k reports to profile (k - 1) // span.
+        self.org_nodes = []
+        self.span = options["span"]
+
+        created = 0
+        batch_size = options["batch_size"]
+        while created < options["users"]:
+            count = min(batch_size, options["users"] - created)
+            with transaction.atomic():
+                self.create_batch(rng, prefix, start + created, count, password, departments, avatars)
+            created += count
+            self.stdout.write(f"  {created}/{options['users']} users")
+        # The bulk inserts bypass the signals that maintain the dashboard counters
+        if created:
+            dashboard.reconcile()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {created} users across {len(departments)} departments"
+        ))
+
+    def ensure_departments(self, count):
+        names = [f"Department {i:02d}" for i in range(1, count + 1)]
+        Department.objects.bulk_create(
+            [
+                Department(organization_id=self.organization_id, name=name, description=f"Synthetic {name.lower()}")
+                for name in names
+            ],
+            ignore_conflicts=True,
+        )
+        return list(Department.objects.filter(name__in=names))
+
+    def ensure_avatars(self, count):
+        if count <= 0:
+            return []
+        from PIL import Image
+
+        directory = Path(settings.MEDIA_ROOT) / "avatars" / "synthetic"
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for i in range(count):
+            path = directory / f"avatar-{i:02d}.png"
+            if not path.exists():
+                buffer = io.BytesIO()
+                Image.new("RGB", (64, 64), AVATAR_COLORS[i % len(AVATAR_COLORS)]).save(buffer, "PNG")
+                path.write_bytes(buffer.getvalue())
+            paths.append(f"avatars/synthetic/{path.name}")
+        return paths
+
+    def create_batch(self, rng, prefix, offset, count, password, departments, avatars):
+        today = date.today()
+        users = []
+        for i in range(offset, offset + count):
+            roll = rng.random()
+            role = User.Roles.ADMIN if roll < 0.02 else User.Roles.CLIENT if roll > 0.92 else User.Roles.EMPLOYEE
+            users.append(User(
+                organization_id=self.organization_id,
+                username=f"{prefix}{i:07d}",
+                email=f"{prefix}{i:07d}@example.com",
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                password=password,
+                role=role,
+                is_staff=role == User.Roles.ADMIN,
+                avatar=avatars[i % len(avatars)] if avatars else None,
+            ))
+        users = User.objects.bulk_create(users)
+        if not connection.features.can_return_rows_from_bulk_insert:
+            ids = dict(User.objects.filter(username__in=[u.username for u in users]).values_list("username", "id"))
+            for user in users:
+                user.pk = ids[user.username]
+
+        # Mirrors accounts.signals: only Admin and Employee users get a profile.
+        profiles = []
+        for user in users:
+            if user.role == User.Roles.CLIENT:
+                continue
+            manager_id, path = None, f"{user.pk}/"
+            if self.span > 0 and self.org_nodes:
+                manager_id, manager_path = self.org_nodes[(len(self.org_nodes) - 1) // self.span]
+                path = f"{manager_path}{user.pk}/"
+            self.org_nodes.append((user.pk, path))
+            hire_date = today - timedelta(days=rng.randint(0, 20 * 365))
+            date_of_birth = today - timedelta(days=rng.randint(20 * 365, 62 * 365))
+            profiles.append(EmployeeProfile(
+                user=user,
+                organization_id=self.organization_id,
+                manager_id=manager_id,
+                org_path=path,
+                org_depth=path.count("/") - 1,
+                department=rng.choice(departments),
+                position=rng.choice(POSITIONS),
+                hire_date=hire_date,
+                hire_mmdd=mmdd(hire_date),
+                date_of_birth=date_of_birth,
+                birth_mmdd=mmdd(date_of_birth),
+                gender=rng.choice(GENDERS),
+                phone=f"+2547{rng.randint(0, 99999999):08d}",
+                id_number=f"{rng.randint(10000000, 39999999)}",
+                payroll_number=f"PR{user.pk:07d}",
+                physical_address=f"P.O. Box {rng.randint(100, 99999)}",
+            ))
+        EmployeeProfile.objects.bulk_create(profiles)
+        # bulk_create skips post_save, so feed the delta-sync log directly
+        UserChange.objects.bulk_create(
+            [UserChange(user_id=user.pk, organization_id=self.organization_id) for user in users]
+        )
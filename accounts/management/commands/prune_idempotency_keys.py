@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.models import IdempotencyRecord
+
+
+class Command(BaseCommand):
+    help = "Delete Idempotency-Key records older than IDEMPOTENCY_TTL_HOURS (or --hours)."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=None)
+
+    def handle(self, *args, **options):
+        hours = options["hours"] if options["hours"] is not None else settings.IDEMPOTENCY_TTL_HOURS
+        cutoff = timezone.now() - timedelta(hours=hours)
+        deleted, _ = IdempotencyRecord.objects.filter(created_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} idempotency records"))
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.models import UserChange
+
+
+class Command(BaseCommand):
+    help = "Delete delta-sync change log rows older than --days. Clients with older cursors get a full reset."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        # Keep the newest row so stale cursors are still detected (and reset)
+        # after an idle period in which everything else aged out.
+        newest = UserChange.objects.order_by("-id").values_list("id", flat=True).first()
+        deleted, _ = UserChange.objects.filter(created_at__lt=cutoff).exclude(id=newest).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} change log rows"))
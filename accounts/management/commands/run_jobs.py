@@ -0,0 +1,53 @@
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from accounts import jobs
+
+
+def _serve(once, poll):
+    stop = threading.Event()
+    # Finish the job in hand, then exit
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    return jobs.work(stop, once=once, poll=poll)
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the database queue. SIGTERM lets the current job finish first."
+    # System checks import every view, serializer and Pillow (via ImageField)
+    # only to validate them; migrate runs them at deploy, so workers skip them
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=1, help="Worker processes to fork")
+        parser.add_argument("--once", action="store_true", help="Exit once no job is due")
+        parser.add_argument("--poll", type=float, default=None, help="Seconds between polls when idle")
+
+    def handle(self, *args, **options):
+        once, poll = options["once"], options["poll"]
+        if options["processes"] <= 1:
+            count = _serve(once, poll)
+            self.stdout.write(self.style.SUCCESS(f"Ran {count} jobs"))
+            return
+
+        # Children must not share the parent's database connections
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=_serve, args=(once, poll)) for _ in range(options["processes"])]
+        for worker in workers:
+            worker.start()
+
+        def forward(signum, frame):
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()  # SIGTERM: children stop after their current job
+
+        signal.signal(signal.SIGTERM, forward)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # the terminal already signals the whole group
+        for worker in workers:
+            worker.join()
+        self.stdout.write(self.style.SUCCESS(f"{len(workers)} worker processes exited"))
@@ -0,0 +1,34 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts import notifications
+from accounts.models import Notification
+
+
+class Command(BaseCommand):
+    help = "Send due notification emails now (or queue the dispatch job with --queue). Suitable for cron."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queue", action="store_true", help="Queue the dispatch job instead of sending here")
+        parser.add_argument("--prune-days", type=int, default=None,
+                            help="Also delete sent and failed notifications older than this many days")
+
+    def handle(self, *args, **options):
+        if options["prune_days"] is not None:
+            cutoff = timezone.now() - timedelta(days=options["prune_days"])
+            deleted, _ = Notification.objects.filter(
+                status__in=[Notification.Status.SENT, Notification.Status.FAILED], created_at__lt=cutoff
+            ).delete()
+            self.stdout.write(f"Deleted {deleted} old notifications")
+        if options["queue"]:
+            job = notifications.schedule_dispatch()
+            self.stdout.write(self.style.SUCCESS(f"Queued notification dispatch as job {job.pk}"))
+            return
+        totals = notifications.dispatch()
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {totals['messages']} messages for {totals['sent']} notifications "
+            f"({totals['retried']} to retry, {totals['failed']} failed)"
+        ))
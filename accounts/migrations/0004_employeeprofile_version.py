@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_employeeprofile_position_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employeeprofile',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
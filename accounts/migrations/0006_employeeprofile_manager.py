@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, Concat
+
+
+def set_root_paths(apps, schema_editor):
+    # Nobody has a manager yet, so every existing profile is a root.
+    EmployeeProfile = apps.get_model('accounts', 'EmployeeProfile')
+    EmployeeProfile.objects.update(
+        org_path=Concat(Cast('user_id', CharField()), Value('/'), output_field=CharField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_userchange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employeeprofile',
+            name='manager',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='direct_reports', to=settings.AUTH_USER_MODEL, verbose_name='Manager'),
+        ),
+        migrations.AddField(
+            model_name='employeeprofile',
+            name='org_depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='employeeprofile',
+            name='org_path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=1024),
+        ),
+        migrations.RunPython(set_root_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:33
+
+from datetime import date, timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# PostgreSQL: replace the plain table with one range-partitioned by month.
+# The primary key and unique constraint must include the partition key.
+# The current month and the next two get partitions here; afterwards
+# accounts.attendance.ensure_partitions() adds months ahead of time. Rows
+# outside every month land in the default partition.
+PARTITIONED_TABLE = """
+DROP TABLE accounts_clockevent;
+CREATE TABLE accounts_clockevent (
+    id bigint GENERATED BY DEFAULT AS IDENTITY,
+    user_id bigint NOT NULL,
+    occurred_at timestamp with time zone NOT NULL,
+    direction varchar(3) NOT NULL,
+    device varchar(64) NOT NULL,
+    received_at timestamp with time zone NOT NULL,
+    PRIMARY KEY (id, occurred_at),
+    CONSTRAINT clockevent_unique_punch UNIQUE (user_id, occurred_at, direction)
+) PARTITION BY RANGE (occurred_at);
+CREATE TABLE accounts_clockevent_default PARTITION OF accounts_clockevent DEFAULT;
+"""
+
+
+def partition_clock_events(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(PARTITIONED_TABLE)
+    # Self-contained on purpose: the application's partition helper may change
+    start = date.today().replace(day=1)
+    for _ in range(3):
+        end = (start + timedelta(days=32)).replace(day=1)
+        schema_editor.execute(
+            f"CREATE TABLE accounts_clockevent_{start:%Y%m} PARTITION OF accounts_clockevent"
+            f" FOR VALUES FROM ('{start.isoformat()} 00:00+00') TO ('{end.isoformat()} 00:00+00')"
+        )
+        start = end
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_employeeprofile_manager'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClockEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('occurred_at', models.DateTimeField()),
+                ('direction', models.CharField(choices=[('in', 'In'), ('out', 'Out')], max_length=3)),
+                ('device', models.CharField(blank=True, default='', max_length=64)),
+                ('received_at', models.DateTimeField()),
+                ('user', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Clock Event',
+                'verbose_name_plural': 'Clock Events',
+                'constraints': [models.UniqueConstraint(fields=('user', 'occurred_at', 'direction'), name='clockevent_unique_punch')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('worked_seconds', models.PositiveIntegerField(default=0)),
+                ('first_in', models.DateTimeField(blank=True, null=True)),
+                ('last_out', models.DateTimeField(blank=True, null=True)),
+                ('open_since', models.DateTimeField(blank=True, null=True)),
+                ('events', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_days', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Daily Attendance',
+                'verbose_name_plural': 'Daily Attendance',
+                'indexes': [models.Index(fields=['date', 'user'], name='accounts_da_date_2c4d18_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'date'), name='dailyattendance_unique_day')],
+            },
+        ),
+        migrations.RunPython(partition_clock_events, migrations.RunPython.noop),
+    ]
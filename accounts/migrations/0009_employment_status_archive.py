@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:46
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employeeprofile',
+            name='employment_status',
+            field=models.CharField(choices=[('active', 'Active'), ('on_leave', 'On leave'), ('notice', 'Serving notice')], default='active', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='employeeprofile',
+            name='end_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ArchivedEmployee',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('username', models.CharField(max_length=150)),
+                ('email', models.EmailField(blank=True, max_length=254)),
+                ('first_name', models.CharField(blank=True, max_length=150)),
+                ('last_name', models.CharField(blank=True, max_length=150)),
+                ('role', models.CharField(max_length=20)),
+                ('department_name', models.CharField(blank=True, max_length=100)),
+                ('position', models.CharField(blank=True, max_length=100)),
+                ('payroll_number', models.CharField(blank=True, max_length=64)),
+                ('hire_date', models.DateField(blank=True, null=True)),
+                ('termination_date', models.DateField()),
+                ('reason', models.TextField(blank=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('archived_by', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Archived by')),
+            ],
+            options={
+                'verbose_name': 'Archived Employee',
+                'verbose_name_plural': 'Archived Employees',
+                'indexes': [models.Index(fields=['termination_date'], name='accounts_ar_termina_ed4b7c_idx'), models.Index(fields=['last_name', 'first_name'], name='accounts_ar_last_na_38b09a_idx')],
+            },
+        ),
+    ]
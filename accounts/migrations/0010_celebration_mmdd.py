@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:47
+
+from django.db import migrations, models
+from django.db.models.functions import ExtractDay, ExtractMonth
+
+
+def fill_mmdd(apps, schema_editor):
+    EmployeeProfile = apps.get_model('accounts', 'EmployeeProfile')
+    for source, target in (('date_of_birth', 'birth_mmdd'), ('hire_date', 'hire_mmdd')):
+        EmployeeProfile.objects.filter(**{f'{source}__isnull': False}).update(
+            **{target: ExtractMonth(source) * 100 + ExtractDay(source)}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_employment_status_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employeeprofile',
+            name='birth_mmdd',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='employeeprofile',
+            name='hire_mmdd',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_mmdd, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='employeeprofile',
+            index=models.Index(fields=['birth_mmdd'], name='accounts_em_birth_m_93ee7a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeeprofile',
+            index=models.Index(fields=['hire_mmdd'], name='accounts_em_hire_mm_23cab1_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_idempotencyrecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('headcount', 'Active users'), ('profiles', 'Active users with a profile'), ('complete', 'Complete profiles'), ('hires', 'Hires by month'), ('reconciled', 'Last reconciliation (epoch seconds)')], max_length=16)),
+                ('key', models.CharField(blank=True, default='', max_length=64)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Dashboard Counter',
+                'verbose_name_plural': 'Dashboard Counters',
+                'constraints': [models.UniqueConstraint(fields=('metric', 'key'), name='dashboardcounter_unique_key')],
+            },
+        ),
+    ]
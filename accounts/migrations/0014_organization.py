@@ -0,0 +1,75 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def assign_default_organization(apps, schema_editor):
+    # Everything that exists so far belongs to the one organization served until now
+    Organization = apps.get_model('accounts', 'Organization')
+    slug = settings.DEFAULT_ORGANIZATION
+    organization, _ = Organization.objects.get_or_create(
+        slug=slug, defaults={'name': slug.replace('-', ' ').title()}
+    )
+    for model in ('User', 'Department', 'EmployeeProfile', 'ArchivedEmployee', 'DashboardCounter', 'UserChange'):
+        apps.get_model('accounts', model).objects.update(organization_id=organization.pk)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_notification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Organization',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('slug', models.SlugField(max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Organization',
+                'verbose_name_plural': 'Organizations',
+            },
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='organization',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='users', to='accounts.organization', verbose_name='Organization'),
+        ),
+        migrations.AddField(
+            model_name='department',
+            name='organization',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='departments', to='accounts.organization', verbose_name='Organization'),
+        ),
+        migrations.AddField(
+            model_name='employeeprofile',
+            name='organization',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.organization', verbose_name='Organization'),
+        ),
+        migrations.AddField(
+            model_name='archivedemployee',
+            name='organization',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.organization', verbose_name='Organization'),
+        ),
+        migrations.AddField(
+            model_name='dashboardcounter',
+            name='organization',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.organization', verbose_name='Organization'),
+        ),
+        migrations.AddField(
+            model_name='userchange',
+            name='organization_id',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.organization', verbose_name='Organization'),
+        ),
+        migrations.RunPython(assign_default_organization, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,119 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:41
+
+import accounts.tenancy
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Separate from 0014: on PostgreSQL the tables cannot be altered in the
+# transaction that filled in their organization (pending FK trigger events).
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_organization'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', accounts.tenancy.TenantUserManager()),
+            ],
+        ),
+        migrations.RemoveConstraint(
+            model_name='dashboardcounter',
+            name='dashboardcounter_unique_key',
+        ),
+        migrations.RemoveIndex(
+            model_name='archivedemployee',
+            name='accounts_ar_termina_ed4b7c_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='archivedemployee',
+            name='accounts_ar_last_na_38b09a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='employeeprofile',
+            name='accounts_em_birth_m_93ee7a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='employeeprofile',
+            name='accounts_em_hire_mm_23cab1_idx',
+        ),
+        migrations.AlterField(
+            model_name='archivedemployee',
+            name='organization',
+            field=models.ForeignKey(blank=True, db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.organization', verbose_name='Organization'),
+        ),
+        migrations.AlterField(
+            model_name='dashboardcounter',
+            name='organization',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.organization', verbose_name='Organization'),
+        ),
+        migrations.AlterField(
+            model_name='department',
+            name='name',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='department',
+            name='organization',
+            field=models.ForeignKey(blank=True, db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='departments', to='accounts.organization', verbose_name='Organization'),
+        ),
+        migrations.AlterField(
+            model_name='employeeprofile',
+            name='organization',
+            field=models.ForeignKey(blank=True, db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.organization', verbose_name='Organization'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='organization',
+            field=models.ForeignKey(blank=True, db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='users', to='accounts.organization', verbose_name='Organization'),
+        ),
+        migrations.AlterField(
+            model_name='userchange',
+            name='organization_id',
+            field=models.BigIntegerField(),
+        ),
+        migrations.AddIndex(
+            model_name='archivedemployee',
+            index=models.Index(fields=['organization', 'termination_date'], name='accounts_ar_organiz_6adccc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedemployee',
+            index=models.Index(fields=['organization', 'last_name', 'first_name'], name='accounts_ar_organiz_09fa8e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeeprofile',
+            index=models.Index(fields=['organization', 'birth_mmdd'], name='accounts_em_organiz_135214_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeeprofile',
+            index=models.Index(fields=['organization', 'hire_mmdd'], name='accounts_em_organiz_a19923_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeeprofile',
+            index=models.Index(fields=['organization', 'department'], name='accounts_em_organiz_0bbb3a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['organization', 'date_joined'], name='accounts_us_organiz_6a72ee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['organization', 'role'], name='accounts_us_organiz_f36d76_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userchange',
+            index=models.Index(fields=['organization_id', 'id'], name='accounts_us_organiz_c7e2bc_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dashboardcounter',
+            constraint=models.UniqueConstraint(fields=('organization', 'metric', 'key'), name='dashboardcounter_unique_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='department',
+            constraint=models.UniqueConstraint(fields=('organization', 'name'), name='department_unique_name'),
+        ),
+    ]
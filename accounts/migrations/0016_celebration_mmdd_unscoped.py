@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0015_organization_required'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employeeprofile',
+            index=models.Index(fields=['birth_mmdd'], name='accounts_em_birth_m_93ee7a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employeeprofile',
+            index=models.Index(fields=['hire_mmdd'], name='accounts_em_hire_mm_23cab1_idx'),
+        ),
+    ]
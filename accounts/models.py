@@ -1,10 +1,117 @@
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
+from datetime import timedelta
 
+from .tenancy import TenantManager, TenantUserManager, default_organization_id
 
-class User(AbstractUser):
+
+class ChangeTrackingMixin(models.Model):
+    """
+    Remembers the column values an instance was loaded with so callers can
+    tell which fields were actually modified and write only those columns.
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def _tracked_value(self, field):
+        value = getattr(self, field.attname)
+        if isinstance(field, models.FileField):
+            return getattr(value, 'name', value) or None
+        return value
+
+    def get_dirty_fields(self):
+        """
+        Names of concrete fields whose value differs from what was loaded.
+        Returns None for instances that were not loaded from the database.
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None or self._state.adding:
+            return None
+        dirty = []
+        for field in self._meta.concrete_fields:
+            if field.attname not in loaded:
+                continue
+            original = loaded[field.attname]
+            if isinstance(field, models.FileField):
+                original = original or None
+            if self._tracked_value(field) != original:
+                dirty.append(field.name)
+        return dirty
+
+    def save_changed(self, **kwargs):
+        """
+        Save only the modified columns, skipping the query entirely when
+        nothing changed. ``auto_now`` fields are refreshed alongside any
+        real change. Returns the list of saved field names (None means a
+        full save was performed).
+        """
+        dirty = self.get_dirty_fields()
+        if dirty is None:
+            self.save(**kwargs)
+            return None
+        if not dirty:
+            return []
+        for field in self._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) and field.name not in dirty:
+                dirty.append(field.name)
+        self.save(update_fields=dirty, **kwargs)
+        return dirty
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        fields = self._meta.concrete_fields
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            fields = [f for f in fields if f.name in update_fields or f.attname in update_fields]
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            loaded = self._loaded_values = {}
+        for field in fields:
+            loaded[field.attname] = self._tracked_value(field)
+
+
+class OrganizationDefaultMixin:
+    """Rows saved without an organization join the current tenant (or the default one)."""
+
+    def save(self, *args, **kwargs):
+        if self.organization_id is None:
+            self.organization_id = default_organization_id()
+        super().save(*args, **kwargs)
+
+
+class Organization(models.Model):
+    """
+    A client company hosted in this deployment: the tenant that its users,
+    departments and profiles belong to (accounts/tenancy.py).
+    """
+    name = models.CharField(max_length=200)
+    slug = models.SlugField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = _("Organization")
+        verbose_name_plural = _("Organizations")
+
+
+class User(OrganizationDefaultMixin, AbstractUser, ChangeTrackingMixin):
     class Roles(models.TextChoices):
         ADMIN = 'Admin', _('Admin')
         EMPLOYEE = 'Employee', _('Employee')
@@ -17,30 +124,81 @@ class User(AbstractUser):
         help_text=_("User role type"),
     )
     avatar = models.ImageField(upload_to='avatars/', null=True, blank=True)
+    # Indexed through the composite indexes below, which lead with it
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.PROTECT,
+        blank=True,
+        db_index=False,
+        related_name='users',
+        verbose_name=_("Organization")
+    )
+
+    objects = TenantUserManager()
 
     def __str__(self):
         return f"{self.username} ({self.role})"
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['organization', 'date_joined']),
+            models.Index(fields=['organization', 'role']),
+        ]
+
 
-class Department(models.Model):
-    name = models.CharField(max_length=100, unique=True)
+class Department(OrganizationDefaultMixin, models.Model):
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.PROTECT,
+        blank=True,
+        db_index=False,
+        related_name='departments',
+        verbose_name=_("Organization")
+    )
+    name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
 
+    objects = TenantManager()
+
     def __str__(self):
         return self.name
 
     class Meta:
         verbose_name = _("Department")
         verbose_name_plural = _("Departments")
+        constraints = [
+            # Names are unique per organization; also serves the name-ordered lists
+            models.UniqueConstraint(fields=['organization', 'name'], name='department_unique_name'),
+        ]
+
+
+def mmdd(value):
+    """A date's month and day as one sortable integer: 14 March -> 314."""
+    return value.month * 100 + value.day
+
 
+class EmployeeProfile(ChangeTrackingMixin):
+    class EmploymentStatus(models.TextChoices):
+        # Terminated employees are moved to ArchivedEmployee (accounts/archive.py)
+        ACTIVE = 'active', _('Active')
+        ON_LEAVE = 'on_leave', _('On leave')
+        NOTICE = 'notice', _('Serving notice')
 
-class EmployeeProfile(models.Model):
     user = models.OneToOneField(
         User,
         on_delete=models.CASCADE,
         related_name='profile',
         verbose_name=_("User")
     )
+    # Always the user's organization; taken from the user when not given
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.PROTECT,
+        blank=True,
+        db_index=False,
+        related_name='+',
+        verbose_name=_("Organization")
+    )
     department = models.ForeignKey(
         Department,
         on_delete=models.SET_NULL,
@@ -51,6 +209,13 @@ class EmployeeProfile(models.Model):
     # Allow position to be nullable to avoid IntegrityError on partial updates
     position = models.CharField(max_length=100, null=True, blank=True)
     hire_date = models.DateField(null=True, blank=True)
+    employment_status = models.CharField(
+        max_length=16,
+        choices=EmploymentStatus.choices,
+        default=EmploymentStatus.ACTIVE,
+    )
+    # Last working day, once known (notice period)
+    end_date = models.DateField(null=True, blank=True)
 
     # Extended fields
     id_number = models.CharField(max_length=64, blank=True, null=True)
@@ -61,10 +226,520 @@ class EmployeeProfile(models.Model):
     payroll_number = models.CharField(max_length=64, blank=True, null=True)
     # Use auto-update for updated_on so it reflects latest save
     updated_on = models.DateTimeField(auto_now=True)
+    # Optimistic concurrency token, incremented on every edit
+    version = models.PositiveIntegerField(default=1)
+
+    # Reporting line. ``org_path`` is the materialized path of user ids from
+    # the top of the chain down to this employee ("3/17/42/"), so a subtree
+    # is one indexed prefix query. Maintained by set_manager().
+    manager = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='direct_reports',
+        verbose_name=_("Manager")
+    )
+    org_path = models.CharField(max_length=1024, db_index=True, editable=False, default='')
+    org_depth = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    # month * 100 + day of date_of_birth and hire_date, so "who celebrates in
+    # the next N days" is an indexed range scan (accounts/celebrations.py).
+    # Kept in step by save() and save_if_version().
+    birth_mmdd = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    hire_mmdd = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    MMDD_FIELDS = {'date_of_birth': 'birth_mmdd', 'hire_date': 'hire_mmdd'}
+
+    objects = TenantManager()
 
     def __str__(self):
         return f"{self.user.username} - {self.position or 'Unassigned'}"
 
+    def clean(self):
+        super().clean()
+        if self.department_id is not None and self.department.organization_id != self.organization_id:
+            raise ValidationError({'department': _("The department belongs to another organization.")})
+
+    def sync_mmdd(self, fields=None):
+        """Recompute the month-day columns; returns the ones derived from ``fields``."""
+        derived = []
+        for source, target in self.MMDD_FIELDS.items():
+            value = getattr(self, source)
+            setattr(self, target, mmdd(value) if value else None)
+            if fields is not None and source in fields:
+                derived.append(target)
+        return derived
+
+    def save(self, *args, **kwargs):
+        derived = self.sync_mmdd(kwargs.get('update_fields'))
+        if derived:
+            kwargs['update_fields'] = list(kwargs['update_fields']) + derived
+        if self.organization_id is None and self.user_id is not None:
+            self.organization_id = self.user.organization_id
+        if not self.org_path:
+            parent = ''
+            if self.manager_id:
+                parent = type(self)._base_manager.filter(user_id=self.manager_id).values_list(
+                    'org_path', flat=True
+                ).first() or ''
+            self.org_path = f'{parent}{self.user_id}/'
+            self.org_depth = self.org_path.count('/') - 1
+        super().save(*args, **kwargs)
+
+    def subtree(self, include_self=True):
+        """Everyone reporting into this employee, at any depth."""
+        qs = type(self).objects.filter(org_path__startswith=self.org_path)
+        return qs if include_self else qs.exclude(pk=self.pk)
+
+    @property
+    def ancestor_ids(self):
+        """User ids of the management chain, top first."""
+        return [int(part) for part in self.org_path.split('/')[:-2]]
+
+    def ancestors(self):
+        return type(self).objects.filter(user_id__in=self.ancestor_ids).order_by('org_depth')
+
+    def set_manager(self, manager_id):
+        """
+        Move this employee (and everyone under them) to report to the user
+        ``manager_id`` (None makes them a root). The subtree's paths are
+        rewritten with a single UPDATE; ``manager`` itself is left dirty for
+        the caller's save. Run inside a transaction.
+        """
+        manager = type(self)._base_manager
+        # Re-read under lock: an ancestor may have moved since we were loaded.
+        self.org_path, self.org_depth = (
+            manager.select_for_update().filter(pk=self.pk).values_list('org_path', 'org_depth').get()
+        )
+        parent = ''
+        if manager_id is not None:
+            parent = manager.select_for_update().filter(
+                user_id=manager_id, organization_id=self.organization_id
+            ).values_list('org_path', flat=True).first()
+            if parent is None:
+                raise ValidationError(
+                    {'manager': _("The manager must have an employee profile in the same organization.")}
+                )
+            if parent.startswith(self.org_path):
+                raise ValidationError(
+                    {'manager': _("An employee cannot report to themselves or to someone below them.")}
+                )
+        self.manager_id = manager_id
+        old_path, new_path = self.org_path, f'{parent}{self.user_id}/'
+        if new_path == old_path:
+            return
+        depth_change = new_path.count('/') - old_path.count('/')
+        manager.filter(org_path__startswith=old_path).update(
+            org_path=Concat(Value(new_path), Substr('org_path', len(old_path) + 1), output_field=models.CharField()),
+            org_depth=F('org_depth') + depth_change,
+        )
+        self.org_path, self.org_depth = new_path, self.org_depth + depth_change
+        self._loaded_values.update(org_path=self.org_path, org_depth=self.org_depth)
+
+    @classmethod
+    def detach_reports(cls, user_ids):
+        """
+        Before users are deleted: hand their reports to the next manager up
+        and drop the deleted users from every path below them. One query
+        when none of them manage anyone, plus one UPDATE per manager.
+        """
+        managers = list(
+            cls._base_manager.filter(user_id__in=user_ids, user__direct_reports__isnull=False)
+            .distinct()
+            .values_list('user_id', 'org_path', 'manager_id')
+        )
+        # Deepest first, so a deleted manager under another deleted manager
+        # is folded into the chain before the outer one is removed.
+        managers.sort(key=lambda row: row[1].count('/'), reverse=True)
+        for user_id, path, parent_id in managers:
+            parent_path = path[: -len(f'{user_id}/')]
+            cls._base_manager.filter(org_path__startswith=path).exclude(user_id=user_id).update(
+                org_path=Concat(Value(parent_path), Substr('org_path', len(path) + 1), output_field=models.CharField()),
+                org_depth=F('org_depth') - 1,
+                manager_id=models.Case(
+                    models.When(manager_id=user_id, then=Value(parent_id)),
+                    default=F('manager_id'),
+                    output_field=models.BigIntegerField(),
+                ),
+            )
+
+    def save_if_version(self, expected_version, update_fields=()):
+        """
+        Write ``update_fields`` with a single conditional
+        ``UPDATE ... WHERE version = expected_version``, bumping the version.
+        Returns False, without writing, when another edit got there first.
+        """
+        from . import dashboard
+        from .changes import record_user_change
+
+        self.updated_on = timezone.now()
+        values = {}
+        derived = self.sync_mmdd(update_fields)
+        for name in set(update_fields) | {'updated_on', *derived}:
+            field = self._meta.get_field(name)
+            values[field.attname] = getattr(self, field.attname)
+        # What the row counts as on the admin dashboard before this write
+        counted = dashboard.stored_profile(self.user_id, self)
+        rows = type(self)._base_manager.filter(pk=self.pk, version=expected_version).update(
+            version=F('version') + 1, **values
+        )
+        if not rows:
+            return False
+        # .update() bypasses the signals, so record the change and move the
+        # dashboard counters here
+        record_user_change(self.user_id, self.organization_id)
+        dashboard.profile_changed(self, counted, {
+            attname: values.get(attname, value) for attname, value in counted.items()
+        })
+        self.version = expected_version + 1
+        self._loaded_values.update(values, version=self.version)
+        return True
+
     class Meta:
         verbose_name = _("Employee Profile")
-        verbose_name_plural = _("Employee Profiles")
\ No newline at end of file
+        verbose_name_plural = _("Employee Profiles")
+        indexes = [
+            models.Index(fields=['organization', 'birth_mmdd']),
+            models.Index(fields=['organization', 'hire_mmdd']),
+            # Unscoped celebrations (superusers, commands) range-scan these
+            models.Index(fields=['birth_mmdd']),
+            models.Index(fields=['hire_mmdd']),
+            models.Index(fields=['organization', 'department']),
+        ]
+
+class ArchivedEmployee(OrganizationDefaultMixin, models.Model):
+    """
+    A former employee, moved out of the user and profile tables on
+    termination. ``id`` is the original user id, so rows keyed by it
+    (clock events, payroll exports) still resolve and a restore reuses it.
+    ``data`` holds every user and profile column except the password.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.PROTECT,
+        blank=True,
+        db_index=False,
+        related_name='+',
+        verbose_name=_("Organization")
+    )
+    username = models.CharField(max_length=150)
+    email = models.EmailField(blank=True)
+    first_name = models.CharField(max_length=150, blank=True)
+    last_name = models.CharField(max_length=150, blank=True)
+    role = models.CharField(max_length=20)
+    department_name = models.CharField(max_length=100, blank=True)
+    position = models.CharField(max_length=100, blank=True)
+    payroll_number = models.CharField(max_length=64, blank=True)
+    hire_date = models.DateField(null=True, blank=True)
+    termination_date = models.DateField()
+    reason = models.TextField(blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    # Kept as a plain id: the archive outlives the admin accounts it names
+    archived_by = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_("Archived by")
+    )
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+
+    objects = TenantManager()
+
+    def __str__(self):
+        return f"{self.username} (left {self.termination_date})"
+
+    class Meta:
+        verbose_name = _("Archived Employee")
+        verbose_name_plural = _("Archived Employees")
+        indexes = [
+            models.Index(fields=['organization', 'termination_date']),
+            models.Index(fields=['organization', 'last_name', 'first_name']),
+        ]
+
+
+class IdempotencyRecord(models.Model):
+    """
+    The stored outcome of a request sent with an ``Idempotency-Key`` header,
+    so a client retry gets the original response instead of repeating the
+    write (accounts/idempotency.py). ``response_status`` is null while the
+    first request is still running.
+    """
+    scope = models.CharField(max_length=200)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.scope} {self.key}"
+
+    class Meta:
+        verbose_name = _("Idempotency Record")
+        verbose_name_plural = _("Idempotency Records")
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key'], name='idempotencyrecord_unique_key'),
+        ]
+
+
+class UserChange(models.Model):
+    """
+    Append-only log of user/profile writes. The auto-incrementing primary key
+    is the change sequence that delta-sync cursors point into; ``deleted``
+    rows are tombstones.
+    """
+    user_id = models.BigIntegerField()
+    # The user's organization; each tenant's clients page through their own rows
+    organization_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = TenantManager()
+
+    def __str__(self):
+        return f"#{self.pk} user={self.user_id}{' (deleted)' if self.deleted else ''}"
+
+    class Meta:
+        verbose_name = _("User Change")
+        verbose_name_plural = _("User Changes")
+        indexes = [models.Index(fields=['organization_id', 'id'])]
+
+
+class ClockEvent(models.Model):
+    """
+    Append-only badge clock event. On PostgreSQL the table is partitioned by
+    month of ``occurred_at`` (see migration 0007 and accounts.attendance).
+    There is deliberately no foreign-key constraint: ingest checks users in
+    bulk when a buffered batch is written.
+    """
+    class Direction(models.TextChoices):
+        IN = 'in', _('In')
+        OUT = 'out', _('Out')
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,  # the unique constraint below leads with user
+        related_name='+',
+        verbose_name=_("User")
+    )
+    occurred_at = models.DateTimeField()
+    direction = models.CharField(max_length=3, choices=Direction.choices)
+    device = models.CharField(max_length=64, blank=True, default='')
+    received_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.user_id} {self.direction} {self.occurred_at:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        verbose_name = _("Clock Event")
+        verbose_name_plural = _("Clock Events")
+        constraints = [
+            # Also makes re-sent batches idempotent
+            models.UniqueConstraint(fields=['user', 'occurred_at', 'direction'], name='clockevent_unique_punch'),
+        ]
+
+
+class DailyAttendance(models.Model):
+    """Worked time per employee per local day, recomputed as events arrive."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='attendance_days',
+        verbose_name=_("User")
+    )
+    date = models.DateField()
+    worked_seconds = models.PositiveIntegerField(default=0)
+    first_in = models.DateTimeField(null=True, blank=True)
+    last_out = models.DateTimeField(null=True, blank=True)
+    # Set while the employee is clocked in with no matching clock-out yet
+    open_since = models.DateTimeField(null=True, blank=True)
+    events = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id} {self.date}: {self.worked_seconds / 3600:.2f}h"
+
+    class Meta:
+        verbose_name = _("Daily Attendance")
+        verbose_name_plural = _("Daily Attendance")
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='dailyattendance_unique_day'),
+        ]
+        indexes = [models.Index(fields=['date', 'user'])]
+
+
+class Job(models.Model):
+    """
+    A unit of background work, queued by ``accounts.jobs.enqueue`` and run
+    by ``manage.py run_jobs``. A worker owns a running job until
+    ``locked_until``; progress reports renew that lease, and a job whose
+    lease expired (its worker died) is picked up again.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', _('Queued')
+        RUNNING = 'running', _('Running')
+        SUCCEEDED = 'succeeded', _('Succeeded')
+        FAILED = 'failed', _('Failed')
+
+    class LeaseLost(Exception):
+        """Another worker took the job over; stop without recording anything."""
+
+    kind = models.CharField(max_length=100)
+    args = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    run_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    locked_by = models.CharField(max_length=64, blank=True, default='')
+    locked_until = models.DateTimeField(null=True, blank=True)
+    progress_done = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(null=True, blank=True)
+    progress_message = models.CharField(max_length=255, blank=True, default='')
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    # Tenant the job was queued in and runs in (None: every organization)
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_("Organization")
+    )
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_("Created by")
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    @property
+    def finished(self):
+        return self.status in (self.Status.SUCCEEDED, self.Status.FAILED)
+
+    def report_progress(self, done, total=None, message=''):
+        """
+        Record progress and renew the lease. Writes are throttled to one per
+        ``JOBS_PROGRESS_INTERVAL`` seconds except for the final step. Raises
+        ``Job.LeaseLost`` if this worker no longer owns the job.
+        """
+        self.progress_done = done
+        if total is not None:
+            self.progress_total = total
+        if message:
+            self.progress_message = message[:255]
+        now = timezone.now()
+        last = getattr(self, '_progress_written', None)
+        final = self.progress_total is not None and done >= self.progress_total
+        if not final and last and (now - last).total_seconds() < settings.JOBS_PROGRESS_INTERVAL:
+            return
+        self.locked_until = now + timedelta(seconds=settings.JOBS_LEASE_SECONDS)
+        updated = Job.objects.filter(pk=self.pk, status=self.Status.RUNNING, locked_by=self.locked_by).update(
+            progress_done=self.progress_done,
+            progress_total=self.progress_total,
+            progress_message=self.progress_message,
+            locked_until=self.locked_until,
+        )
+        if not updated:
+            raise Job.LeaseLost(self.pk)
+        self._progress_written = now
+
+    class Meta:
+        verbose_name = _("Job")
+        verbose_name_plural = _("Jobs")
+        indexes = [models.Index(fields=['status', 'run_after'])]
+
+
+class DashboardCounter(models.Model):
+    """
+    One number behind an organization's admin dashboard, kept current by the
+    user, profile and department signals and periodically reconciled against
+    the live tables (accounts/dashboard.py). ``key`` is
+    "<department id>:<role>" (0 for no department) for the per-department
+    metrics and "YYYY-MM" for hires.
+    """
+
+    class Metric(models.TextChoices):
+        HEADCOUNT = 'headcount', _('Active users')
+        PROFILES = 'profiles', _('Active users with a profile')
+        COMPLETE = 'complete', _('Complete profiles')
+        HIRES = 'hires', _('Hires by month')
+        RECONCILED = 'reconciled', _('Last reconciliation (epoch seconds)')
+
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='+',
+        verbose_name=_("Organization")
+    )
+    metric = models.CharField(max_length=16, choices=Metric.choices)
+    key = models.CharField(max_length=64, blank=True, default='')
+    value = models.BigIntegerField(default=0)
+
+    objects = TenantManager()
+
+    def __str__(self):
+        return f"{self.metric}[{self.key}] = {self.value}"
+
+    class Meta:
+        verbose_name = _("Dashboard Counter")
+        verbose_name_plural = _("Dashboard Counters")
+        constraints = [
+            models.UniqueConstraint(fields=['organization', 'metric', 'key'], name='dashboardcounter_unique_key'),
+        ]
+
+
+class Notification(models.Model):
+    """
+    An email to one user, queued in the caller's transaction and sent in
+    batches by the ``notifications.dispatch`` job (accounts/notifications.py).
+    ``digest`` notifications may be coalesced with the user's other pending
+    digest notifications into a single message.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        SENDING = 'sending', _('Sending')
+        SENT = 'sent', _('Sent')
+        FAILED = 'failed', _('Failed')
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=64)
+    context = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    digest = models.BooleanField(default=False)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    send_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Dispatcher batch holding the row while it is sent
+    locked_by = models.CharField(max_length=64, blank=True, default='')
+    locked_until = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} to user {self.user_id} [{self.status}]"
+
+    class Meta:
+        verbose_name = _("Notification")
+        verbose_name_plural = _("Notifications")
+        indexes = [
+            models.Index(fields=['status', 'send_after']),
+            models.Index(fields=['user', 'status']),
+        ]
@@ -0,0 +1,286 @@
+"""
+Outbound email notifications, queued in the database and sent in batches.
+
+``notify(user, kind, context)`` (``notify_many`` for a broadcast such as
+month-end payslips) inserts Notification rows in the caller's transaction
+and makes sure a ``notifications.dispatch`` job is queued, so no request
+waits on a mail server. Messages are rendered from the templates
+``notifications/<kind>.subject.txt`` and ``notifications/<kind>.txt``, plus
+``notifications/<kind>.html`` when it exists.
+
+The dispatcher claims up to NOTIFICATIONS_BATCH_SIZE due rows with a
+conditional UPDATE, so concurrent dispatchers never send a row twice, and
+sends them over one connection that is reopened every
+NOTIFICATIONS_PER_CONNECTION messages, at most NOTIFICATIONS_RATE messages
+per second. A failed message is retried with the job backoff until
+NOTIFICATIONS_MAX_ATTEMPTS. Rows of a dispatcher that died are claimed
+again once their lease expires. When the mail server cannot be reached the
+batch is put back and the job retries.
+
+Digest notifications wait NOTIFICATIONS_DIGEST_DELAY seconds. Once the
+first of a user's pending digest notifications is due, all of them go out
+as one message rendered with ``notifications/digest.*``.
+
+Mail goes through Django's EMAIL_BACKEND. With DEBUG it defaults to the
+file backend (one file per connection under EMAIL_FILE_PATH), and the
+console backend prints messages instead, so no mail server is needed
+locally.
+"""
+
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import F, Min, Q
+from django.template import TemplateDoesNotExist
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from backend.metrics import Counter
+
+from . import jobs, tenancy
+from .models import Job, Notification
+
+TASK = "notifications.dispatch"
+DIGEST = "digest"
+
+SENT = Counter(
+    "notifications_total",
+    "Notifications by kind and outcome (sent, retried, failed).",
+    ("kind", "outcome"),
+)
+
+
+class MailUnavailable(Exception):
+    """The mail server could not be reached; the batch is put back."""
+
+
+def notify(user, kind, context=None, digest=False):
+    """Queue ``kind`` for ``user`` (a User or an id); returns the Notification."""
+    return notify_many([(user, context)], kind, digest)[0]
+
+
+def notify_many(recipients, kind, digest=False):
+    """Queue ``kind`` for every (user, context) in ``recipients`` with one insert."""
+    delay = settings.NOTIFICATIONS_DIGEST_DELAY if digest else 0
+    send_after = timezone.now() + timedelta(seconds=delay)
+    rows = Notification.objects.bulk_create(
+        [
+            Notification(user_id=getattr(user, "pk", user), kind=kind, context=context or {},
+                         digest=digest, send_after=send_after)
+            for user, context in recipients
+        ],
+        batch_size=1000,
+    )
+    if rows:
+        schedule_dispatch(send_after)
+    return rows
+
+
+def schedule_dispatch(at=None):
+    """Make sure a dispatch job is queued to run by ``at`` (default: now); returns it."""
+    now = timezone.now()
+    at = at or now
+    queued = Job.objects.filter(kind=TASK, status=Job.Status.QUEUED, run_after__lte=at).first()
+    if queued is not None:
+        return queued
+    # One dispatcher sends every organization's mail
+    with tenancy.tenant(None):
+        return jobs.enqueue(TASK, delay=max(0.0, (at - now).total_seconds()))
+
+
+def claim(limit):
+    """Lease up to ``limit`` due notifications, plus the same users' pending digests."""
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    due = Q(status=Notification.Status.PENDING, send_after__lte=now) | Q(
+        status=Notification.Status.SENDING, locked_until__lt=now
+    )
+    ids = list(Notification.objects.filter(due).order_by("send_after", "id").values_list("id", flat=True)[:limit])
+    if not ids:
+        return []
+    lease = {
+        "status": Notification.Status.SENDING,
+        "locked_by": token,
+        "locked_until": now + timedelta(seconds=settings.NOTIFICATIONS_LEASE_SECONDS),
+        "attempts": F("attempts") + 1,
+    }
+    if not Notification.objects.filter(due, pk__in=ids).update(**lease):
+        return []
+    # Coalesce: the rest of these users' digest notifications go out now too
+    digest_users = list(
+        Notification.objects.filter(locked_by=token, digest=True).values_list("user_id", flat=True).distinct()
+    )
+    if digest_users:
+        Notification.objects.filter(
+            status=Notification.Status.PENDING, digest=True, user_id__in=digest_users
+        ).update(**lease)
+    return list(Notification.objects.filter(locked_by=token).select_related("user").order_by("user_id", "id"))
+
+
+def render(kind, context):
+    """(subject, text, html or None) of ``kind`` rendered with ``context``."""
+    subject = " ".join(render_to_string(f"notifications/{kind}.subject.txt", context).split())
+    text = render_to_string(f"notifications/{kind}.txt", context)
+    try:
+        html = render_to_string(f"notifications/{kind}.html", context)
+    except TemplateDoesNotExist:
+        html = None
+    return subject, text, html
+
+
+def compose(user, notifications):
+    """One message to ``user`` for ``notifications`` (a digest when there are several)."""
+    if len(notifications) == 1:
+        notification = notifications[0]
+        subject, text, html = render(notification.kind, {**notification.context, "user": user})
+    else:
+        items = []
+        for notification in notifications:
+            subject, text, _ = render(notification.kind, {**notification.context, "user": user})
+            items.append({"kind": notification.kind, "subject": subject, "body": text.strip()})
+        subject, text, html = render(DIGEST, {"user": user, "items": items})
+    message = EmailMultiAlternatives(subject, text, to=[user.email])
+    if html is not None:
+        message.attach_alternative(html, "text/html")
+    return message
+
+
+class Sender:
+    """
+    Sends messages one by one over a reused connection, reopened every
+    ``per_connection`` messages and after a failure, no faster than
+    ``rate`` messages per second (0: unlimited).
+    """
+
+    def __init__(self, per_connection, rate):
+        self.per_connection = per_connection
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self.next_at = 0.0
+        self.connection = None
+        self.used = 0
+
+    def ensure_open(self):
+        if self.connection is not None and self.used < self.per_connection:
+            return
+        self.close()
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as exc:
+            raise MailUnavailable(str(exc)) from exc
+        self.connection, self.used = connection, 0
+
+    def send(self, message):
+        if self.interval:
+            now = time.monotonic()
+            if self.next_at > now:
+                time.sleep(self.next_at - now)
+            self.next_at = max(now, self.next_at) + self.interval
+        self.ensure_open()
+        try:
+            self.connection.send_messages([message])
+        except Exception:
+            # The session may be unusable after an error; start a fresh one
+            self.close()
+            raise
+        self.used += 1
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+        self.connection, self.used = None, 0
+
+
+def _groups(rows):
+    """Each message to send: one per plain notification, one per user's digests."""
+    digests = {}
+    for notification in rows:
+        if notification.digest:
+            digests.setdefault(notification.user_id, []).append(notification)
+        else:
+            yield [notification]
+    yield from digests.values()
+
+
+def _settle(group, totals, error=None):
+    """Record the outcome of one message: sent, or (with ``error``) retried or failed."""
+    now = timezone.now()
+    token = group[0].locked_by
+    release = {"locked_by": "", "locked_until": None}
+    if error is None:
+        Notification.objects.filter(pk__in=[n.pk for n in group], locked_by=token).update(
+            status=Notification.Status.SENT, sent_at=now, error="", **release
+        )
+        outcomes = ["sent"] * len(group)
+    else:
+        outcomes = []
+        for notification in group:
+            fields = {"status": Notification.Status.FAILED, "error": error[-2000:], **release}
+            if notification.attempts < settings.NOTIFICATIONS_MAX_ATTEMPTS:
+                fields.update(
+                    status=Notification.Status.PENDING,
+                    send_after=now + timedelta(seconds=jobs.backoff(notification.attempts)),
+                )
+            Notification.objects.filter(pk=notification.pk, locked_by=token).update(**fields)
+            outcomes.append("retried" if fields["status"] == Notification.Status.PENDING else "failed")
+    for notification, outcome in zip(group, outcomes):
+        SENT.inc(notification.kind, outcome)
+        totals[outcome] += 1
+
+
+def send_batch(sender, rows):
+    """
+    Send one claimed batch, recording each message's outcome as soon as it
+    is known so a crash re-sends as little as possible. Returns the totals.
+    """
+    totals = dict.fromkeys(("messages", "sent", "retried", "failed"), 0)
+    groups = list(_groups(rows))
+    for index, group in enumerate(groups):
+        user = group[0].user
+        if not (user.email and user.is_active):
+            for notification in group:
+                notification.attempts = settings.NOTIFICATIONS_MAX_ATTEMPTS
+            _settle(group, totals, "No active user with an email address")
+            continue
+        try:
+            sender.ensure_open()
+        except MailUnavailable:
+            # Put the rest back without spending an attempt, then let the job retry
+            for rest in groups[index:]:
+                Notification.objects.filter(pk__in=[n.pk for n in rest], locked_by=rest[0].locked_by).update(
+                    status=Notification.Status.PENDING, locked_by="", locked_until=None, attempts=F("attempts") - 1
+                )
+            raise
+        try:
+            sender.send(compose(user, group))
+        except Exception as exc:
+            _settle(group, totals, f"{type(exc).__name__}: {exc}")
+            continue
+        _settle(group, totals)
+        totals["messages"] += 1
+    return totals
+
+
+def dispatch(job=None):
+    """Send due notifications batch by batch until none are due; returns the totals."""
+    sender = Sender(settings.NOTIFICATIONS_PER_CONNECTION, settings.NOTIFICATIONS_RATE)
+    totals = dict.fromkeys(("messages", "sent", "retried", "failed"), 0)
+    try:
+        while rows := claim(settings.NOTIFICATIONS_BATCH_SIZE):
+            for key, value in send_batch(sender, rows).items():
+                totals[key] += value
+            if job is not None:
+                job.report_progress(totals["sent"] + totals["retried"] + totals["failed"],
+                                    message=f"Sent {totals['messages']} messages")
+    finally:
+        sender.close()
+    upcoming = Notification.objects.filter(status=Notification.Status.PENDING).aggregate(at=Min("send_after"))["at"]
+    if upcoming is not None:
+        schedule_dispatch(upcoming)
+    return totals
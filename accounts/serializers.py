@@ -1,12 +1,97 @@
+from functools import partial
+
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from rest_framework import serializers
-from django.utils import timezone
+from rest_framework.validators import UniqueValidator
 from django.core.exceptions import ValidationError as DjangoValidationError
 
-from .models import EmployeeProfile, Department
+from .models import ArchivedEmployee, EmployeeProfile, Department
+from .changes import batch_user_changes
+from .notifications import notify
+from .tasks import defer_avatar_processing
 
 User = get_user_model()
 
+PROFILE_FIELDS = {
+    'id_number', 'date_of_birth', 'gender', 'phone', 'physical_address',
+    'payroll_number', 'department', 'position', 'hire_date', 'updated_on',
+    'employment_status', 'end_date',
+}
+
+
+class VersionConflict(Exception):
+    """Raised when an edit was based on a stale profile version."""
+
+
+def get_profile_for_update(user):
+    """
+    Return the user's EmployeeProfile, reusing an instance already loaded via
+    select_related. A missing profile is returned unsaved so that it is
+    inserted once, with its field values, instead of created and then updated.
+    """
+    try:
+        return user.profile
+    except EmployeeProfile.DoesNotExist:
+        profile = EmployeeProfile(user=user, organization_id=user.organization_id)
+        user.profile = profile
+        return profile
+
+
+def save_profile_changes(profile, expected_version=None, touch=False):
+    """
+    Validate and persist only the profile columns that changed. Existing
+    profiles are written with a conditional update on ``version``; ``touch``
+    bumps the version even when no profile column changed (user-only edits).
+    """
+    dirty = profile.get_dirty_fields()
+    if dirty == [] and not touch:
+        return []
+    if dirty is not None:
+        if expected_version is None:
+            expected_version = profile.version
+        elif expected_version != profile.version:
+            raise VersionConflict()
+    # Unchanged fields (notably the unique ``user`` link) are excluded so
+    # validation does not issue uniqueness queries for values already stored.
+    checked = set(dirty) if dirty is not None else {
+        f.name for f in profile._meta.concrete_fields if f.name != 'user'
+    }
+    exclude = [f.name for f in profile._meta.fields if f.name not in checked]
+    try:
+        profile.full_clean(exclude=exclude)
+    except DjangoValidationError as e:
+        raise serializers.ValidationError({'profile': e.message_dict})
+    if dirty is None:
+        profile.save()
+        return None
+    if not profile.save_if_version(expected_version, dirty):
+        raise VersionConflict()
+    return dirty
+
+
+def save_user_and_profile(user, profile=None, expected_version=None):
+    """
+    Persist a user edit and its profile edit as one versioned change. The
+    profile version is checked and bumped first so a conflict leaves the user
+    row untouched.
+    """
+    user_dirty = user.get_dirty_fields()
+    if profile is None and user_dirty:
+        try:
+            profile = user.profile
+        except EmployeeProfile.DoesNotExist:
+            profile = None
+    if profile is None or not user_dirty:
+        # A single row is written at most; no transaction needed.
+        if profile is not None:
+            save_profile_changes(profile, expected_version)
+        user.save_changed()
+        return
+    with transaction.atomic(savepoint=False), batch_user_changes():
+        save_profile_changes(profile, expected_version, touch=True)
+        user.save_changed()
+
 
 class UserSignupSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True)
@@ -19,12 +104,16 @@ class UserSignupSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             'email': {'required': True},
             'role': {'required': True},
-            'username': {'required': True},
+            # Usernames and emails sign in across organizations: unique deployment-wide
+            'username': {
+                'required': True,
+                'validators': [User.username_validator, UniqueValidator(User._base_manager.all())],
+            },
         }
 
     def validate_email(self, value):
         value = value.lower().strip()
-        if User.objects.filter(email__iexact=value).exists():
+        if User._base_manager.filter(email__iexact=value).exists():
             raise serializers.ValidationError('A user with that email already exists.')
         return value
 
@@ -37,20 +126,30 @@ class UserSignupSerializer(serializers.ModelSerializer):
         validated_data.pop('confirm_password', None)
         avatar = validated_data.pop('avatar', None)
 
-        user = User.objects.create_user(
-            username=validated_data.get('username'),
-            email=validated_data.get('email'),
-            password=validated_data.get('password'),
-            role=validated_data.get('role'),
-        )
+        # The user insert and the profile insert (post_save) commit together
+        # and share one change-log row; the welcome email is queued with them.
+        with transaction.atomic(), batch_user_changes():
+            user = User.objects.create_user(
+                username=validated_data.get('username'),
+                email=validated_data.get('email'),
+                password=validated_data.get('password'),
+                role=validated_data.get('role'),
+            )
+            notify(user, 'account.welcome')
 
         if avatar:
-            setattr(user, 'avatar', avatar)
-            user.save()
+            # Stored and resized by a background job once the signup commits
+            transaction.on_commit(partial(defer_avatar_processing, user.pk, avatar))
 
         return user
 
 
+class DepartmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Department
+        fields = ['id', 'name', 'description']
+
+
 class EmployeeProfileSerializer(serializers.ModelSerializer):
     department_name = serializers.SerializerMethodField()
 
@@ -67,9 +166,13 @@ class EmployeeProfileSerializer(serializers.ModelSerializer):
             'department_name',
             'position',
             'hire_date',
+            'employment_status',
+            'end_date',
             'updated_on',
+            'version',
+            'manager',
         ]
-        read_only_fields = ['updated_on']
+        read_only_fields = ['updated_on', 'version', 'manager']
 
     def get_department_name(self, obj):
         return obj.department.name if obj.department else ''
@@ -95,7 +198,11 @@ class UserSerializer(serializers.ModelSerializer):
     department_name = serializers.SerializerMethodField()
     position = serializers.SerializerMethodField()
     hire_date = serializers.SerializerMethodField()
+    employment_status = serializers.SerializerMethodField()
+    end_date = serializers.SerializerMethodField()
     updated_on = serializers.SerializerMethodField()
+    version = serializers.SerializerMethodField()
+    manager = serializers.SerializerMethodField()
 
     class Meta:
         model = User
@@ -119,7 +226,11 @@ class UserSerializer(serializers.ModelSerializer):
             'department_name',
             'position',
             'hire_date',
+            'employment_status',
+            'end_date',
             'updated_on',
+            'version',
+            'manager',
             # Nested profile data for new consumers
             'profile',
         )
@@ -199,9 +310,21 @@ class UserSerializer(serializers.ModelSerializer):
     def get_hire_date(self, obj):
         return self._get_profile_attr(obj, 'hire_date')
 
+    def get_employment_status(self, obj):
+        return self._get_profile_attr(obj, 'employment_status')
+
+    def get_end_date(self, obj):
+        return self._get_profile_attr(obj, 'end_date')
+
     def get_updated_on(self, obj):
         return self._get_profile_attr(obj, 'updated_on')
 
+    def get_version(self, obj):
+        return self._get_profile_attr(obj, 'version')
+
+    def get_manager(self, obj):
+        return self._get_profile_attr(obj, 'manager_id')
+
 
 class AdminUserUpdateSerializer(serializers.ModelSerializer):
     # Flattened employee profile fields accepted at top level
@@ -211,10 +334,17 @@ class AdminUserUpdateSerializer(serializers.ModelSerializer):
     phone = serializers.CharField(required=False, allow_blank=True, allow_null=True)
     physical_address = serializers.CharField(required=False, allow_blank=True, allow_null=True)
     payroll_number = serializers.CharField(required=False, allow_blank=True, allow_null=True)
-    department = serializers.PrimaryKeyRelatedField(queryset=Department.objects.all(), required=False, allow_null=True)
+    # The manager, not a queryset, so the choices are scoped to the request's tenant
+    department = serializers.PrimaryKeyRelatedField(queryset=Department.objects, required=False, allow_null=True)
     position = serializers.CharField(required=False, allow_blank=True, allow_null=True)
     hire_date = serializers.DateField(required=False, allow_null=True)
+    # Termination is not a status here: it goes through the archive endpoint
+    employment_status = serializers.ChoiceField(choices=EmployeeProfile.EmploymentStatus.choices, required=False)
+    end_date = serializers.DateField(required=False, allow_null=True)
     updated_on = serializers.DateTimeField(required=False, allow_null=True)
+    version = serializers.IntegerField(required=False, min_value=1, write_only=True)
+    # User id of the new manager; null makes the employee top-level
+    manager = serializers.IntegerField(required=False, allow_null=True, min_value=1)
 
     class Meta:
         model = User
@@ -234,11 +364,19 @@ class AdminUserUpdateSerializer(serializers.ModelSerializer):
             'department',
             'position',
             'hire_date',
+            'employment_status',
+            'end_date',
             'updated_on',
+            'version',
+            'manager',
         ]
         extra_kwargs = {
             'email': {'required': False},
-            'username': {'required': True},
+            'username': {
+                'required': True,
+                # Usernames are unique across organizations, not just this tenant
+                'validators': [User.username_validator, UniqueValidator(User._base_manager.all())],
+            },
         }
 
     def _pop_profile_fields(self, validated_data):
@@ -246,57 +384,89 @@ class AdminUserUpdateSerializer(serializers.ModelSerializer):
         Extract only profile fields present in validated_data.
         This ensures we don't overwrite DB fields with None on partial updates.
         """
-        profile_keys = {
-            'id_number', 'date_of_birth', 'gender', 'phone', 'physical_address',
-            'payroll_number', 'department', 'position', 'hire_date', 'updated_on'
-        }
         profile_data = {}
         for k in list(validated_data.keys()):
-            if k in profile_keys:
+            if k in PROFILE_FIELDS:
                 profile_data[k] = validated_data.pop(k)
+        # updated_on is server-managed (auto_now); echoing it back must not
+        # count as a modification.
+        profile_data.pop('updated_on', None)
         return profile_data
 
     def update(self, instance, validated_data):
-        # Update User fields only when provided
+        expected_version = validated_data.pop('version', self.context.get('expected_version'))
+
+        # Update User fields only when provided; unchanged users are not written
         user_fields = ['username', 'first_name', 'last_name', 'email', 'role']
         for field in user_fields:
             if field in validated_data:
                 setattr(instance, field, validated_data[field])
-        instance.save()
 
         # Extract only explicitly provided profile fields and update/create profile
         profile_data = self._pop_profile_fields(validated_data)
+        profile = None
 
         if profile_data:
-            profile, _ = EmployeeProfile.objects.get_or_create(user=instance)
+            profile = get_profile_for_update(instance)
 
-            # Handle department assignment if department provided as PK or instance
+            # dept_val is already a Department instance (or None) thanks to PrimaryKeyRelatedField
             if 'department' in profile_data:
-                dept_val = profile_data.pop('department')
-                if dept_val is None:
-                    profile.department = None
-                else:
-                    # dept_val is already a Department instance thanks to PrimaryKeyRelatedField
-                    profile.department = dept_val
+                profile.department = profile_data.pop('department')
 
             # Only set attributes that were explicitly present in the request
             for key, val in profile_data.items():
-                # Avoid overwriting with None unless explicitly sent as null
                 setattr(profile, key, val)
 
-            # Ensure updated_on is present; if not provided, keep auto-managed timestamp
-            if not getattr(profile, 'updated_on', None):
-                profile.updated_on = timezone.now()
-
-            # Validate model (convert Django ValidationError to serializer ValidationError)
+        if 'manager' not in validated_data:
+            save_user_and_profile(instance, profile, expected_version)
+            return instance
+
+        # Reassignment rewrites the whole subtree's paths; keep it in the
+        # same transaction as the versioned profile write.
+        manager_id = validated_data.pop('manager')
+        profile = profile or get_profile_for_update(instance)
+        with transaction.atomic(), batch_user_changes():
+            if profile._state.adding:
+                profile.save()
             try:
-                profile.full_clean()
+                profile.set_manager(manager_id)
             except DjangoValidationError as e:
-                raise serializers.ValidationError({'profile': e.message_dict})
+                raise serializers.ValidationError(e.message_dict)
+            save_user_and_profile(instance, profile, expected_version)
+        return instance
 
-            profile.save()
 
-        return instance
+class ArchivedEmployeeSerializer(serializers.ModelSerializer):
+    archived_by = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ArchivedEmployee
+        fields = [
+            'id',
+            'username',
+            'email',
+            'first_name',
+            'last_name',
+            'role',
+            'department_name',
+            'position',
+            'payroll_number',
+            'hire_date',
+            'termination_date',
+            'reason',
+            'archived_at',
+            'archived_by',
+        ]
+        read_only_fields = fields
+
+    def get_archived_by(self, obj):
+        return obj.archived_by_id
+
+
+class ArchivedEmployeeDetailSerializer(ArchivedEmployeeSerializer):
+    class Meta(ArchivedEmployeeSerializer.Meta):
+        fields = ArchivedEmployeeSerializer.Meta.fields + ['data']
+        read_only_fields = fields
 
 
 class EmployeeSelfProfileSerializer(serializers.ModelSerializer):
@@ -310,10 +480,11 @@ class EmployeeSelfProfileSerializer(serializers.ModelSerializer):
     phone = serializers.CharField(required=False, allow_blank=True, allow_null=True)
     physical_address = serializers.CharField(required=False, allow_blank=True, allow_null=True)
     payroll_number = serializers.CharField(required=False, allow_blank=True, allow_null=True)
-    department = serializers.PrimaryKeyRelatedField(queryset=Department.objects.all(), required=False, allow_null=True)
+    department = serializers.PrimaryKeyRelatedField(queryset=Department.objects, required=False, allow_null=True)
     position = serializers.CharField(required=False, allow_blank=True, allow_null=True)
     hire_date = serializers.DateField(required=False, allow_null=True)
     updated_on = serializers.DateTimeField(required=False, allow_null=True)
+    version = serializers.IntegerField(required=False, min_value=1, write_only=True)
 
     class Meta:
         model = User
@@ -334,6 +505,7 @@ class EmployeeSelfProfileSerializer(serializers.ModelSerializer):
             'position',
             'hire_date',
             'updated_on',
+            'version',
         ]
         extra_kwargs = {
             'email': {'required': False},
@@ -342,19 +514,17 @@ class EmployeeSelfProfileSerializer(serializers.ModelSerializer):
         }
 
     def _pop_profile_fields(self, validated_data):
-        profile_keys = {
-            'id_number', 'date_of_birth', 'gender', 'phone', 'physical_address',
-            'payroll_number', 'department', 'position', 'hire_date', 'updated_on'
-        }
         profile_data = {}
         for key in list(validated_data.keys()):
-            if key in profile_keys:
+            if key in PROFILE_FIELDS:
                 profile_data[key] = validated_data.pop(key)
+        profile_data.pop('updated_on', None)
         return profile_data
 
     def update(self, instance, validated_data):
         remove_avatar = validated_data.pop('remove_avatar', False)
         remove_department = validated_data.pop('remove_department', False)
+        expected_version = validated_data.pop('version', self.context.get('expected_version'))
         avatar = validated_data.pop('avatar', None) if 'avatar' in validated_data else None
 
         for field in ['first_name', 'last_name', 'email']:
@@ -368,21 +538,18 @@ class EmployeeSelfProfileSerializer(serializers.ModelSerializer):
                 instance.avatar.delete(save=False)
             instance.avatar = None
 
-        instance.save()
-
         profile_data = self._pop_profile_fields(validated_data)
+        profile = None
 
-        if profile_data:
-            profile, _ = EmployeeProfile.objects.get_or_create(user=instance)
+        if profile_data or remove_department:
+            profile = get_profile_for_update(instance)
 
             if remove_department:
                 profile.department = None
+                profile_data.pop('department', None)
             elif 'department' in profile_data:
                 dept_val = profile_data.pop('department')
-                if not dept_val:
-                    profile.department = None
-                else:
-                    profile.department = dept_val
+                profile.department = dept_val or None
 
             for date_field in ['date_of_birth', 'hire_date']:
                 if date_field in profile_data and not profile_data[date_field]:
@@ -391,14 +558,5 @@ class EmployeeSelfProfileSerializer(serializers.ModelSerializer):
             for key, val in profile_data.items():
                 setattr(profile, key, val)
 
-            if not getattr(profile, 'updated_on', None):
-                profile.updated_on = timezone.now()
-
-            try:
-                profile.full_clean()
-            except DjangoValidationError as e:
-                raise serializers.ValidationError({'profile': e.message_dict})
-
-            profile.save()
-
-        return instance
\ No newline at end of file
+        save_user_and_profile(instance, profile, expected_version)
+        return instance
@@ -1,10 +1,117 @@
 # accounts/signals.py
 
-from django.db.models.signals import post_save
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
 from django.dispatch import receiver
-from .models import User, EmployeeProfile
+from . import dashboard
+from .changes import publish_on_commit, record_user_change
+from .models import Department, EmployeeProfile, User
+
+@receiver(post_save, sender=User)
+def create_employee_profile(sender, instance, created, raw=False, **kwargs):
+    # A new user cannot have a profile yet, so insert without looking first
+    if created and not raw and instance.role in ['Admin', 'Employee']:
+        EmployeeProfile.objects.create(user=instance, organization_id=instance.organization_id)
+
 
+# Feed the delta-sync change log and the live event stream
 @receiver(post_save, sender=User)
-def create_employee_profile(sender, instance, created, **kwargs):
-    if created and instance.role in ['Admin', 'Employee']:
-        EmployeeProfile.objects.get_or_create(user=instance)
\ No newline at end of file
+def log_user_change(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    # last_login bumps on every login and is not part of the synced data
+    if raw or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    record_user_change(instance.pk, instance.organization_id, 'created' if created else 'updated')
+
+
+@receiver(post_save, sender=EmployeeProfile)
+def log_profile_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_user_change(instance.user_id, instance.organization_id)
+
+
+@receiver(post_delete, sender=User)
+def log_user_delete(sender, instance, **kwargs):
+    record_user_change(instance.pk, instance.organization_id, 'deleted')
+
+
+@receiver(post_save, sender=Department)
+def announce_department_change(sender, instance, created=False, raw=False, **kwargs):
+    if not raw:
+        publish_on_commit(
+            'department.created' if created else 'department.updated',
+            instance.pk,
+            instance.organization_id,
+            name=instance.name,
+        )
+
+
+@receiver(post_delete, sender=Department)
+def announce_department_delete(sender, instance, **kwargs):
+    publish_on_commit('department.deleted', instance.pk, instance.organization_id)
+
+
+# Keep the admin dashboard counters in step (accounts/dashboard.py)
+@receiver(pre_save, sender=User)
+def remember_user_counts(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        dashboard.user_saving(instance, update_fields)
+
+
+@receiver(post_save, sender=User)
+def count_user(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        dashboard.user_saved(instance, created, update_fields)
+
+
+@receiver(pre_save, sender=EmployeeProfile)
+def remember_profile_counts(sender, instance, raw=False, **kwargs):
+    if not raw:
+        dashboard.profile_saving(instance)
+
+
+@receiver(post_save, sender=EmployeeProfile)
+def count_profile(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        dashboard.profile_saved(instance, update_fields)
+
+
+@receiver(pre_delete, sender=EmployeeProfile)
+def uncount_profile(sender, instance, origin=None, **kwargs):
+    # Profiles deleted along with their user are handled per user
+    if isinstance(origin, User) or (isinstance(origin, QuerySet) and origin.model is User):
+        return
+    dashboard.profile_changed(instance, dashboard.stored_profile(instance.user_id, instance), None)
+
+
+@receiver(post_delete, sender=Department)
+def uncount_department(sender, instance, **kwargs):
+    dashboard.department_deleted(instance.pk)
+
+
+# Keep the reporting hierarchy intact when managers are deleted
+_reports_detached = ContextVar('reports_detached', default=frozenset())
+
+
+@contextmanager
+def deleting_users(user_ids):
+    """
+    Detach the reports of all ``user_ids`` and take them out of the
+    dashboard counters up front for a bulk delete.
+    """
+    EmployeeProfile.detach_reports(user_ids)
+    dashboard.users_deleting(user_ids)
+    token = _reports_detached.set(frozenset(user_ids))
+    try:
+        yield
+    finally:
+        _reports_detached.reset(token)
+
+
+@receiver(pre_delete, sender=User)
+def detach_user_reports(sender, instance, **kwargs):
+    if instance.pk not in _reports_detached.get():
+        EmployeeProfile.detach_reports([instance.pk])
+        dashboard.users_deleting([instance.pk])
@@ -0,0 +1,226 @@
+"""
+Columnar workforce snapshot for the analytics dashboard.
+
+``build()`` reads every active user's profile once and writes one NumPy
+array per column (department, role, gender, employment status, hire date,
+date of birth) as ``.npy`` files in a fresh directory under
+WORKFORCE_SNAPSHOT_DIR, then repoints the ``current`` symlink at it. Readers
+open the arrays with ``mmap_mode="r"``: every worker process shares one copy
+in the page cache, and a dashboard is a few vectorised passes over the
+arrays instead of a set of aggregate queries. Categorical columns hold small
+integer codes (-1 for unknown) whose labels are kept in ``meta.json``.
+
+``current()`` reopens the arrays only when the symlink has moved. A reader
+that finds the snapshot older than WORKFORCE_SNAPSHOT_MAX_AGE queues the
+``analytics.workforce_snapshot`` job; ``manage.py build_workforce_snapshot``
+does the same from cron.
+
+Each organization has its own snapshot in WORKFORCE_SNAPSHOT_DIR/org-<id>
+(``all`` holds the unscoped one), built and refreshed on its own schedule,
+so a large organization's rebuilds do not delay a small one's. NumPy is imported on first use, so processes that
+never touch analytics do not load it.
+
+There is no salary data in the schema, so the snapshot has no pay columns.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+from backend.db_router import replica_reads
+
+from . import jobs, tenancy
+from .models import Department, EmployeeProfile, Job, User
+
+COLUMNS = ("department", "role", "gender", "status", "hire_date", "birth_date")
+TASK = "analytics.workforce_snapshot"
+# Snapshots kept besides the current one; a worker may still map the last
+KEEP = 1
+# Seconds between a process's "is a rebuild queued?" checks
+REBUILD_CHECK_INTERVAL = 60
+
+TENURE_BANDS = ((1, "<1"), (3, "1-3"), (5, "3-5"), (10, "5-10"), (None, "10+"))
+AGE_BANDS = ((25, "<25"), (35, "25-34"), (45, "35-44"), (55, "45-54"), (None, "55+"))
+
+_lock = threading.Lock()
+# Per snapshot root: (symlink target, Snapshot)
+_loaded = {}
+# Last "is a rebuild queued?" check per tenant
+_rebuild_checked = {}
+
+
+def _codes(np, values, labels):
+    index = {label: code for code, label in enumerate(labels)}
+    return np.fromiter((index.get(value, -1) for value in values), np.int32, len(values))
+
+
+def tenant_root():
+    """The snapshot directory of the current tenant."""
+    return os.path.join(str(settings.WORKFORCE_SNAPSHOT_DIR), tenancy.label())
+
+
+def build(root=None):
+    """Write a new snapshot of the current tenant and make it current; returns a summary of what was written."""
+    import numpy as np
+
+    root = str(root or tenant_root())
+    with replica_reads():
+        departments = list(Department.objects.order_by("pk").values_list("pk", "name"))
+        rows = list(
+            EmployeeProfile.objects.filter(user__is_active=True)
+            .order_by("user_id")
+            .values_list("department_id", "user__role", "gender", "employment_status", "hire_date", "date_of_birth")
+            .iterator(chunk_size=5000)
+        )
+
+    department, role, gender, status, hired, born = zip(*rows) if rows else ((),) * 6
+    gender = [(value or "").strip().lower() for value in gender]
+    labels = {
+        "department": [pk for pk, _ in departments],
+        "role": [value for value, _ in User.Roles.choices],
+        "gender": sorted(set(gender) - {""}),
+        "status": [value for value, _ in EmployeeProfile.EmploymentStatus.choices],
+    }
+    columns = {
+        "department": _codes(np, department, labels["department"]),
+        "role": _codes(np, role, labels["role"]).astype(np.int8),
+        "gender": _codes(np, gender, labels["gender"]).astype(np.int8),
+        "status": _codes(np, status, labels["status"]).astype(np.int8),
+        "hire_date": np.array(hired, dtype="datetime64[D]"),
+        "birth_date": np.array(born, dtype="datetime64[D]"),
+    }
+
+    built_at = timezone.now()
+    name = f"snapshot-{built_at:%Y%m%dT%H%M%S%f}-{os.getpid()}"
+    path = os.path.join(root, name)
+    os.makedirs(path)
+    for column, values in columns.items():
+        np.save(os.path.join(path, f"{column}.npy"), values)
+    labels["department"] = [[pk, label] for pk, label in departments]
+    with open(os.path.join(path, "meta.json"), "w") as fh:
+        json.dump({"built_at": built_at.isoformat(), "rows": len(rows), "labels": labels}, fh)
+
+    link = os.path.join(root, f".current-{os.getpid()}")
+    os.symlink(name, link)
+    os.replace(link, os.path.join(root, "current"))
+
+    # Unlinking does not disturb processes that still map an older snapshot
+    older = sorted(entry for entry in os.listdir(root) if entry.startswith("snapshot-") and entry != name)
+    for entry in older[:-KEEP]:
+        shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+    return {"rows": len(rows), "snapshot": name, "built_at": built_at.isoformat()}
+
+
+class Snapshot:
+    def __init__(self, path):
+        import numpy as np
+
+        with open(os.path.join(path, "meta.json")) as fh:
+            meta = json.load(fh)
+        self.path = path
+        self.rows = meta["rows"]
+        self.labels = meta["labels"]
+        self.built_at = datetime.fromisoformat(meta["built_at"])
+        self.columns = {
+            column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode="r") for column in COLUMNS
+        }
+
+    def age_seconds(self):
+        return (timezone.now() - self.built_at).total_seconds()
+
+
+def current():
+    """The current tenant's snapshot (arrays memory-mapped), or None before the first build."""
+    root = tenant_root()
+    try:
+        target = os.readlink(os.path.join(root, "current"))
+    except OSError:
+        return None
+    with _lock:
+        loaded_target, loaded = _loaded.get(root, (None, None))
+        if loaded_target != target:
+            loaded = Snapshot(os.path.join(root, target))
+            _loaded[root] = (target, loaded)
+        return loaded
+
+
+def schedule_rebuild(user=None, force=False):
+    """
+    Queue a rebuild of the current tenant's snapshot unless one is already
+    queued or running; returns that job. Without ``force`` a process asks at
+    most once per REBUILD_CHECK_INTERVAL per tenant and returns None in
+    between.
+    """
+    organization_id = tenancy.current()
+    now = time.monotonic()
+    if not force and now - _rebuild_checked.get(organization_id, 0.0) < REBUILD_CHECK_INTERVAL:
+        return None
+    _rebuild_checked[organization_id] = now
+    pending = Job.objects.filter(
+        kind=TASK, organization_id=organization_id, status__in=[Job.Status.QUEUED, Job.Status.RUNNING]
+    ).first()
+    return pending or jobs.enqueue(TASK, user=user)
+
+
+def _tally(np, codes, labels):
+    counts = np.bincount(np.asarray(codes, dtype=np.int64) + 1, minlength=len(labels) + 1)
+    tally = {label: int(count) for label, count in zip(labels, counts[1:])}
+    if counts[0]:
+        tally["unknown"] = int(counts[0])
+    return tally
+
+
+def _bands(np, dates, today, bands):
+    known = ~np.isnat(dates)
+    years = (today - dates[known]).astype(np.int64) / 365.25
+    edges = [edge for edge, _ in bands[:-1]]
+    counts = np.bincount(np.digitize(years, edges), minlength=len(bands))
+    tally = {label: int(count) for (_, label), count in zip(bands, counts)}
+    if not known.all():
+        tally["unknown"] = int((~known).sum())
+    return tally, (float(years.mean()) if years.size else None)
+
+
+def summary(snapshot, today, department_id=None):
+    """Headcount, department/role/gender/status mix and tenure/age bands."""
+    import numpy as np
+
+    columns = snapshot.columns
+    department_ids = [pk for pk, _ in snapshot.labels["department"]]
+    if department_id is not None:
+        code = department_ids.index(department_id) if department_id in department_ids else -2
+        mask = np.asarray(columns["department"]) == code
+        columns = {column: values[mask] for column, values in columns.items()}
+
+    today = np.datetime64(today, "D")
+    tenure, average_tenure = _bands(np, columns["hire_date"], today, TENURE_BANDS)
+    ages, _ = _bands(np, columns["birth_date"], today, AGE_BANDS)
+    by_department = _tally(np, columns["department"], department_ids)
+    departments = [
+        {"id": pk, "name": name, "count": by_department[pk]}
+        for pk, name in snapshot.labels["department"]
+        if by_department[pk]
+    ]
+    if "unknown" in by_department:
+        departments.append({"id": None, "name": "", "count": by_department["unknown"]})
+    return {
+        "headcount": int(len(columns["role"])),
+        "departments": departments,
+        "roles": _tally(np, columns["role"], snapshot.labels["role"]),
+        "genders": _tally(np, columns["gender"], snapshot.labels["gender"]),
+        "employment_status": _tally(np, columns["status"], snapshot.labels["status"]),
+        "tenure_years": tenure,
+        "average_tenure_years": round(average_tenure, 1) if average_tenure is not None else None,
+        "age_bands": ages,
+        "snapshot": {
+            "built_at": snapshot.built_at,
+            "age_seconds": round(snapshot.age_seconds(), 1),
+            "rows": snapshot.rows,
+        },
+    }
@@ -0,0 +1,149 @@
+"""Background job handlers (see accounts/jobs.py)."""
+
+import csv
+import io
+import os
+import secrets
+import time
+import uuid
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+
+from backend.db_router import replica_reads
+
+from . import dashboard, notifications, snapshot
+from .changes import batch_user_changes, record_user_change
+from .jobs import enqueue, task
+from .models import User
+from .signals import deleting_users
+
+DELETE_CHUNK = 500
+
+
+@task("users.bulk_delete")
+def bulk_delete_users(job, ids):
+    """Delete users in chunks, one transaction each; safe to re-run after a failure."""
+    deleted = 0
+    job.report_progress(0, len(ids), "Deleting users")
+    for start in range(0, len(ids), DELETE_CHUNK):
+        chunk = ids[start:start + DELETE_CHUNK]
+        users = User.objects.filter(id__in=chunk)
+        with transaction.atomic(), batch_user_changes():
+            pks = list(users.values_list("pk", flat=True))
+            with deleting_users(pks):
+                users.delete()
+        deleted += len(pks)
+        job.report_progress(start + len(chunk))
+    return {"deleted": deleted}
+
+
+def prune_exports(max_age=None):
+    """Delete export files older than EXPORTS_MAX_AGE; returns how many."""
+    max_age = settings.EXPORTS_MAX_AGE if max_age is None else max_age
+    directory = str(settings.EXPORTS_DIR)
+    if not os.path.isdir(directory):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for entry in os.scandir(directory):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+@task("users.export")
+def export_users(job):
+    """
+    Write the user directory to a CSV file in EXPORTS_DIR, served by the job
+    download endpoint. Expired exports are deleted first.
+    """
+    prune_exports()
+    name = f"users-{job.pk}-{secrets.token_hex(8)}.csv"
+    path = os.path.join(str(settings.EXPORTS_DIR), name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with replica_reads():
+        total = User.objects.count()
+        rows = User.objects.order_by("pk").values_list(
+            "pk", "username", "email", "first_name", "last_name", "role",
+            "profile__department__name", "profile__manager_id", "is_active", "date_joined",
+        )
+        job.report_progress(0, total, "Exporting users")
+        written = 0
+        with open(path, "w", newline="", encoding="utf-8") as fh:
+            writer = csv.writer(fh)
+            writer.writerow([
+                "id", "username", "email", "first_name", "last_name", "role",
+                "department", "manager_id", "is_active", "date_joined",
+            ])
+            for row in rows.iterator(chunk_size=2000):
+                writer.writerow(row)
+                written += 1
+                if written % 2000 == 0:
+                    job.report_progress(min(written, total))
+    return {"rows": written, "file": name}
+
+
+def defer_avatar_processing(user_id, upload):
+    """Stash a raw avatar upload and queue its processing (run after commit)."""
+    extension = os.path.splitext(upload.name)[1].lower()[:10]
+    path = default_storage.save(f"avatars/incoming/{uuid.uuid4().hex}{extension}", upload)
+    return enqueue("users.process_avatar", {"user_id": user_id, "path": path})
+
+
+@task("users.process_avatar")
+def process_avatar(job, user_id, path):
+    """Normalise orientation, shrink to AVATAR_MAX_PIXELS and store as the user's avatar."""
+    from PIL import Image, ImageOps
+
+    row = User.objects.filter(pk=user_id).values_list("avatar", "organization_id").first()
+    if row is None or row[0]:
+        # Deleted, or a newer avatar was uploaded meanwhile
+        default_storage.delete(path)
+        return {"skipped": True}
+
+    with default_storage.open(path, "rb") as fh:
+        image = ImageOps.exif_transpose(Image.open(fh))
+        image.thumbnail((settings.AVATAR_MAX_PIXELS, settings.AVATAR_MAX_PIXELS))
+        buffer = io.BytesIO()
+        if image.mode in ("RGBA", "LA", "P"):
+            image.save(buffer, "PNG", optimize=True)
+            extension = "png"
+        else:
+            image.convert("RGB").save(buffer, "JPEG", quality=85, optimize=True)
+            extension = "jpg"
+
+    name = default_storage.save(f"avatars/{user_id}-{uuid.uuid4().hex[:8]}.{extension}", ContentFile(buffer.getvalue()))
+    unset = Q(avatar="") | Q(avatar__isnull=True)
+    if User.objects.filter(unset, pk=user_id).update(avatar=name):
+        record_user_change(user_id, row[1])
+    else:
+        default_storage.delete(name)
+    default_storage.delete(path)
+    return {"avatar": name, "url": default_storage.url(name)}
+
+
+@task(snapshot.TASK)
+def build_workforce_snapshot(job):
+    """Rebuild the analytics snapshot (see accounts/snapshot.py)."""
+    return snapshot.build()
+
+
+@task(dashboard.TASK)
+def reconcile_dashboard(job):
+    """Recount the admin dashboard counters (see accounts/dashboard.py)."""
+    return dashboard.reconcile()
+
+
+@task(notifications.TASK)
+def dispatch_notifications(job):
+    """Send the due notification emails in batches (see accounts/notifications.py)."""
+    return notifications.dispatch(job)
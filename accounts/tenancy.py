@@ -0,0 +1,148 @@
+"""
+Tenant scoping: one deployment hosts several client organizations.
+
+Every User, Department and EmployeeProfile belongs to an Organization.
+``TenantMiddleware`` makes the signed-in user's organization the current
+tenant for the rest of the request; users that DRF authenticates in the view
+(HTTP Basic) are only known after the middleware, so their authentication
+class calls ``activate``. Superusers operate the whole deployment and are
+not scoped. The default managers of tenant-owned models (``TenantManager``)
+add ``organization_id = <tenant>`` to every queryset, so a view, serializer
+field or job cannot reach another organization's rows by forgetting a
+filter. Related-object access goes through the unscoped base managers, which
+is safe because relations never cross organizations.
+
+Outside a request nothing is scoped: management commands, the job runner
+and the attendance flusher see every organization unless they enter
+``tenant(organization_id)``. Jobs remember the tenant they were queued in
+and run inside it (accounts/jobs.py).
+
+What is derived from the tenant tables is kept per tenant as well: dashboard
+counters, the analytics snapshot, the delta-sync change log and the live
+event fan-out, so one organization's write volume does not invalidate or
+slow down another's.
+
+New users and departments created without an organization join the current
+tenant, or DEFAULT_ORGANIZATION (created on first use) outside one.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import UserManager
+from django.db import connection, models
+
+_current = ContextVar("tenant", default=None)
+# Default organization id per database, so test databases get their own
+_default_ids = {}
+
+
+def current():
+    """The current tenant's organization id, or None when nothing is scoped."""
+    return _current.get()
+
+
+@contextmanager
+def tenant(organization_id):
+    """Scope the block to ``organization_id`` (None: every organization)."""
+    token = _current.set(organization_id)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def scoped(queryset, field="organization"):
+    """``queryset`` limited to the current tenant through ``field``, if one is active."""
+    organization_id = _current.get()
+    if organization_id is None:
+        return queryset
+    return queryset.filter(**{f"{field}_id": organization_id})
+
+
+def label(organization_id=None):
+    """A file-system and cache friendly name for a tenant ("org-3", or "all" unscoped)."""
+    organization_id = _current.get() if organization_id is None else organization_id
+    return "all" if organization_id is None else f"org-{organization_id}"
+
+
+def default_organization_id():
+    """Organization of rows created without one: the current tenant, else DEFAULT_ORGANIZATION."""
+    organization_id = _current.get()
+    if organization_id is not None:
+        return organization_id
+    database = connection.settings_dict["NAME"]
+    if database not in _default_ids:
+        from .models import Organization
+
+        organization, _ = Organization.objects.get_or_create(
+            slug=settings.DEFAULT_ORGANIZATION,
+            defaults={"name": settings.DEFAULT_ORGANIZATION.replace("-", " ").title()},
+        )
+        _default_ids[database] = organization.pk
+    return _default_ids[database]
+
+
+class TenantManagerMixin:
+    def get_queryset(self):
+        return scoped(super().get_queryset())
+
+
+class TenantManager(TenantManagerMixin, models.Manager):
+    """Default manager of tenant-owned models: only the current tenant's rows."""
+
+
+class TenantUserManager(TenantManagerMixin, UserManager):
+    pass
+
+
+def request_tenant(user):
+    if user is None or not user.is_authenticated or user.is_superuser:
+        return None
+    return user.organization_id
+
+
+def activate(user):
+    """
+    Make ``user``'s organization the current tenant for the rest of the
+    request. For authentication that runs in the view, after
+    TenantMiddleware.process_view; the middleware still resets it.
+    """
+    _current.set(request_tenant(user))
+
+
+class TenantMiddleware:
+    """Place after AuthenticationMiddleware."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = _current.set(None)
+        try:
+            return self.get_response(request)
+        finally:
+            _current.reset(token)
+
+    async def __acall__(self, request):
+        token = _current.set(None)
+        try:
+            return await self.get_response(request)
+        finally:
+            _current.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # The session user is loaded here instead of by the view; it is the
+        # same query, cached on the request.
+        _current.set(request_tenant(getattr(request, "user", None)))
+        return None
@@ -0,0 +1,201 @@
+"""
+CPU protection for password logins (LoginView and HTTP Basic auth).
+
+Every password check is a deliberately slow hash, so unthrottled logins let
+a credential-stuffing burst or a misconfigured integration saturate the
+server. Before hashing, each attempt is checked against two sliding
+windows kept in the shared cache:
+
+* failed attempts per identifier (username or email), and
+* all attempts per client IP,
+
+and answered with 429 plus Retry-After when either is over its limit.
+Attempts that pass go through ``hashing``, a bounded executor with
+LOGIN_HASH_CONCURRENCY slots per process. When no slot frees up within
+LOGIN_HASH_WAIT_SECONDS the attempt is shed with 429 instead of queueing
+behind the others. Outcomes are counted in ``login_attempts_total``.
+"""
+
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.core.cache import cache
+from rest_framework import exceptions
+from rest_framework.authentication import BasicAuthentication
+
+from backend.metrics import Counter
+
+from . import tenancy
+
+ATTEMPTS = Counter(
+    "login_attempts_total",
+    "Password login attempts by channel (login, basic) and outcome (succeeded, failed, throttled, shed).",
+    ("channel", "outcome"),
+)
+
+
+class LoginThrottled(Exception):
+    def __init__(self, wait):
+        super().__init__(wait)
+        self.wait = wait
+
+
+class Overloaded(Exception):
+    """No hashing slot became free in time."""
+
+
+class SlidingWindow:
+    """
+    Approximate sliding-window counter built from two fixed windows:
+    ``previous * (1 - elapsed) + current``. Only add/incr/get_many are used,
+    which the Redis cache does atomically.
+    """
+
+    def __init__(self, scope, limit_setting):
+        self.scope = scope
+        self.limit_setting = limit_setting
+
+    @property
+    def limit(self):
+        return getattr(settings, self.limit_setting)
+
+    def keys(self, ident, now):
+        slot = int(now // settings.LOGIN_THROTTLE_WINDOW)
+        digest = hashlib.sha256(ident.encode()).hexdigest()[:32]
+        return f"throttle:{self.scope}:{digest}:{slot}", f"throttle:{self.scope}:{digest}:{slot - 1}"
+
+    def retry_after(self, current, previous, elapsed):
+        """Seconds until the window is under its limit again (0: not blocked)."""
+        limit, window = self.limit, settings.LOGIN_THROTTLE_WINDOW
+        if previous * (1 - elapsed) + current < limit:
+            return 0
+        if current >= limit:
+            # Wait for the next window, then for this one's weight to decay
+            return int(window * ((1 - elapsed) + (1 - limit / current))) + 1
+        return int(window * ((1 - (limit - current) / previous) - elapsed)) + 1
+
+    def hit(self, ident):
+        key = self.keys(ident, time.time())[0]
+        timeout = 2 * settings.LOGIN_THROTTLE_WINDOW
+        if cache.add(key, 1, timeout):
+            return
+        try:
+            cache.incr(key)
+        except ValueError:  # expired between add and incr
+            cache.set(key, 1, timeout)
+
+
+IDENTIFIER_FAILURES = SlidingWindow("login-id", "LOGIN_THROTTLE_IDENTIFIER_LIMIT")
+IP_ATTEMPTS = SlidingWindow("login-ip", "LOGIN_THROTTLE_IP_LIMIT")
+
+
+def throttle_wait(checks):
+    """Longest Retry-After over ``(window, ident)`` pairs, with one cache read."""
+    now = time.time()
+    elapsed = (now % settings.LOGIN_THROTTLE_WINDOW) / settings.LOGIN_THROTTLE_WINDOW
+    keyed = [(window, window.keys(ident, now)) for window, ident in checks]
+    counts = cache.get_many([key for _, keys in keyed for key in keys])
+    return max(
+        window.retry_after(counts.get(current, 0), counts.get(previous, 0), elapsed)
+        for window, (current, previous) in keyed
+    )
+
+
+class HashingExecutor:
+    """
+    Runs password checks with at most LOGIN_HASH_CONCURRENCY in flight per
+    process. The check runs in the calling thread once it holds a slot, so
+    the user lookup keeps the request's database connection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._size = None
+        self._slots = None
+
+    def slots(self):
+        size = settings.LOGIN_HASH_CONCURRENCY
+        if size != self._size:
+            with self._lock:
+                if size != self._size:
+                    self._slots, self._size = threading.BoundedSemaphore(size), size
+        return self._slots
+
+    def run(self, fn, *args, **kwargs):
+        slots = self.slots()
+        if not slots.acquire(timeout=settings.LOGIN_HASH_WAIT_SECONDS):
+            raise Overloaded()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            slots.release()
+
+
+hashing = HashingExecutor()
+
+
+def client_ip(request):
+    if settings.LOGIN_THROTTLE_TRUST_FORWARDED:
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def authenticate_throttled(request, identifier, channel, **credentials):
+    """
+    ``authenticate(request, **credentials)`` behind the throttles and the
+    hashing executor. Raises LoginThrottled (with the seconds to wait)
+    instead of hashing when the caller is over a limit or the server is busy.
+    """
+    identifier = (identifier or "").strip().lower()
+    ip = client_ip(request)
+    wait = throttle_wait([(IP_ATTEMPTS, ip), (IDENTIFIER_FAILURES, identifier)])
+    if wait:
+        ATTEMPTS.inc(channel, "throttled")
+        raise LoginThrottled(wait)
+
+    IP_ATTEMPTS.hit(ip)
+    try:
+        user = hashing.run(authenticate, request, **credentials)
+    except Overloaded:
+        ATTEMPTS.inc(channel, "shed")
+        raise LoginThrottled(1)
+    if user is None:
+        IDENTIFIER_FAILURES.hit(identifier)
+        ATTEMPTS.inc(channel, "failed")
+    else:
+        ATTEMPTS.inc(channel, "succeeded")
+    return user
+
+
+class ThrottledBasicAuthentication(BasicAuthentication):
+    """
+    HTTP Basic auth through the login throttles; over the limit is a 429.
+    The user is only known here, after TenantMiddleware, so this also scopes
+    the request to the user's organization.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            tenancy.activate(result[0])
+        return result
+
+    def authenticate_credentials(self, userid, password, request=None):
+        from .models import User
+
+        try:
+            user = authenticate_throttled(
+                request, userid, "basic", **{User.USERNAME_FIELD: userid, "password": password}
+            )
+        except LoginThrottled as e:
+            raise exceptions.Throttled(wait=e.wait)
+        if user is None:
+            raise exceptions.AuthenticationFailed("Invalid username/password.")
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed("User inactive or deleted.")
+        return (user, None)
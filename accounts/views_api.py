@@ -1,4 +1,8 @@
-from django.http import JsonResponse
+import hashlib
+import hmac
+import os
+
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import ensure_csrf_cookie
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -6,11 +10,33 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from rest_framework.decorators import api_view, permission_classes
-from django.db.models import Q
-
-from .models import User
-from .serializers import UserSerializer, AdminUserUpdateSerializer, EmployeeSelfProfileSerializer
+from django.db import transaction
+from django.db.models import Count, Q, Min
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.conf import settings
+from django.utils import timezone
+from datetime import date, timedelta
+
+from backend.instrumentation import section
+from backend.renderers import FastJSONRenderer
+
+from . import attendance, celebrations, dashboard, jobs, snapshot, tenancy
+from .archive import RestoreConflict, archive_employee, restore_employee
+from .models import ArchivedEmployee, DailyAttendance, Department, EmployeeProfile, Job, User, UserChange
+from .changes import batch_user_changes
+from .signals import deleting_users
+from .events import event_stream
+from .serializers import (
+    ArchivedEmployeeDetailSerializer,
+    ArchivedEmployeeSerializer,
+    DepartmentSerializer,
+    UserSerializer,
+    AdminUserUpdateSerializer,
+    EmployeeSelfProfileSerializer,
+    VersionConflict,
+)
 
 
 @ensure_csrf_cookie
@@ -29,13 +55,34 @@ def whoami(request):
                 "username": user.username,
                 "email": getattr(user, "email", ""),
                 "role": getattr(user, "role", None),
-                "avatar": getattr(user, "avatar_url", "") or getattr(user, "avatar", "") or "",
+                "avatar": user.avatar.url if getattr(user, "avatar", None) else "",
             },
             status=status.HTTP_200_OK,
         )
     return Response({"username": None}, status=status.HTTP_200_OK)
 
 
+def expected_version_from(request):
+    """Parse an optimistic-concurrency version from an If-Match header."""
+    header = request.headers.get("If-Match", "").strip()
+    if header.startswith("W/"):
+        header = header[2:]
+    header = header.strip('"')
+    return int(header) if header.isdigit() else None
+
+
+def version_conflict_response(user, request):
+    """409 carrying the record as it is now, so the client can merge."""
+    current = User.objects.select_related("profile", "profile__department").get(pk=user.pk)
+    return Response(
+        {
+            "detail": "This record was changed by someone else. Review the current values and retry.",
+            "current": UserSerializer(current, context={"request": request}).data,
+        },
+        status=status.HTTP_409_CONFLICT,
+    )
+
+
 class PermissionHelpers:
     @staticmethod
     def is_admin_user(user):
@@ -68,7 +115,467 @@ class AdminUsersListView(APIView):
             .order_by("-date_joined")
         )
         serializer = UserSerializer(qs, many=True, context={"request": request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        with section("ser"):
+            data = serializer.data
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class AdminUserChangesView(APIView):
+    """
+    GET ?since=<cursor>: users changed after the cursor, tombstones for users
+    deleted (or no longer listed), and the cursor to send next time. Without
+    ``since`` (or when the log no longer reaches back that far) the full list
+    is returned with ``reset: true``.
+
+    Log rows younger than USER_CHANGES_SETTLE_SECONDS are returned but not
+    passed by the new cursor: sequence values are allocated before commit, so
+    a slower transaction can still land below them. Such rows are simply sent
+    again on the next poll.
+    """
+    permission_classes = [IsAuthenticated]
+    page_size = 5000
+
+    def get(self, request, *args, **kwargs):
+        if not PermissionHelpers.is_admin_user(request.user):
+            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+        since = request.query_params.get("since", "")
+        if not since.isdigit():
+            return self.full_snapshot(request)
+        since = int(since)
+
+        rows = list(
+            UserChange.objects.filter(id__gt=since)
+            .order_by("id")
+            .values_list("id", "user_id", "created_at")[: self.page_size + 1]
+        )
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if rows and rows[0][0] > since + 1 and self.log_pruned_after(since):
+            return self.full_snapshot(request)
+
+        settled_before = timezone.now() - timedelta(seconds=settings.USER_CHANGES_SETTLE_SECONDS)
+        cursor = since
+        for change_id, _, created_at in rows:
+            if created_at > settled_before:
+                break
+            cursor = change_id
+
+        changed_ids = {user_id for _, user_id, _ in rows}
+        users = list(self.listed_users().filter(pk__in=changed_ids))
+        with section("ser"):
+            data = UserSerializer(users, many=True, context={"request": request}).data
+        return Response(
+            {
+                "cursor": str(cursor),
+                "reset": False,
+                "has_more": has_more,
+                "users": data,
+                "deleted": sorted(changed_ids - {u.pk for u in users}),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @staticmethod
+    def listed_users():
+        # Same population as AdminUsersListView
+        return User.objects.filter(role__in=["Admin", "Employee"]).select_related("profile", "profile__department")
+
+    @staticmethod
+    def log_pruned_after(since):
+        # Ids are shared by every organization's log, so a gap in one
+        # tenant's rows is no sign of pruning; only the global minimum is.
+        oldest = UserChange._base_manager.aggregate(oldest=Min("id"))["oldest"]
+        return oldest is not None and oldest > since + 1
+
+    def full_snapshot(self, request):
+        settled_before = timezone.now() - timedelta(seconds=settings.USER_CHANGES_SETTLE_SECONDS)
+        cursor = (
+            UserChange.objects.filter(created_at__lte=settled_before)
+            .order_by("-id")
+            .values_list("id", flat=True)
+            .first()
+        ) or 0
+        qs = self.listed_users().order_by("-date_joined")
+        with section("ser"):
+            data = UserSerializer(qs, many=True, context={"request": request}).data
+        return Response(
+            {"cursor": str(cursor), "reset": True, "has_more": False, "users": data, "deleted": []},
+            status=status.HTTP_200_OK,
+        )
+
+
+class OrgChartView(APIView):
+    """
+    GET ?root=<user id>[&depth=N]: the reporting subtree under ``root`` as a
+    flat depth-first list (each node carries its manager's id, direct report
+    count and total headcount) plus the root's management chain. Without
+    ``root`` admins get the whole organisation and everyone else their own
+    subtree. Non-admins may only view subtrees they are part of the chain of.
+    """
+    permission_classes = [IsAuthenticated]
+    node_fields = (
+        "user_id",
+        "manager_id",
+        "org_depth",
+        "org_path",
+        "user__first_name",
+        "user__last_name",
+        "user__username",
+        "position",
+        "department__name",
+    )
+
+    def get(self, request, *args, **kwargs):
+        user = request.user
+        is_admin = PermissionHelpers.is_admin_user(user)
+        root = request.query_params.get("root", "")
+        depth = request.query_params.get("depth", "")
+
+        nodes = EmployeeProfile.objects.all()
+        chain = []
+        if root or not is_admin:
+            root_id = int(root) if root.isdigit() else user.pk
+            root_path, root_depth = (
+                EmployeeProfile.objects.filter(user_id=root_id).values_list("org_path", "org_depth").first()
+                or (None, None)
+            )
+            if root_path is None:
+                return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+            if not is_admin and str(user.pk) not in root_path.split("/"):
+                return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+            nodes = nodes.filter(org_path__startswith=root_path)
+            chain_ids = [int(part) for part in root_path.split("/")[:-2]]
+            if chain_ids:
+                chain = list(
+                    EmployeeProfile.objects.filter(user_id__in=chain_ids)
+                    .order_by("org_depth")
+                    .values_list(*self.node_fields)
+                )
+        else:
+            root_id, root_depth = None, 0
+        if depth.isdigit():
+            nodes = nodes.filter(org_depth__lte=root_depth + int(depth))
+
+        rows = list(nodes.order_by("org_path").values_list(*self.node_fields))
+        with section("ser"):
+            data = {
+                "root": root_id,
+                "chain": [self.node(row) for row in chain],
+                "nodes": self.with_rollups([self.node(row) for row in rows], rows),
+            }
+        return Response(data, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def node(row):
+        user_id, manager_id, depth, _, first, last, username, position, department = row
+        return {
+            "id": user_id,
+            "manager": manager_id,
+            "depth": depth,
+            "name": f"{first} {last}".strip() or username,
+            "position": position or "",
+            "department": department or "",
+        }
+
+    @staticmethod
+    def with_rollups(nodes, rows):
+        """Direct reports and subtree headcount for every node in the result."""
+        index = {node["id"]: node for node in nodes}
+        for node in nodes:
+            node["reports"] = 0
+            node["headcount"] = 1
+        for node, row in zip(nodes, rows):
+            manager = index.get(node["manager"])
+            if manager is not None:
+                manager["reports"] += 1
+            for part in row[3].split("/")[:-2]:
+                ancestor = index.get(int(part))
+                if ancestor is not None:
+                    ancestor["headcount"] += 1
+        return nodes
+
+
+def device_authorized(request):
+    """Badge readers authenticate with a bearer token from ATTENDANCE_DEVICE_TOKENS."""
+    header = request.headers.get("Authorization", "")
+    if not header.startswith("Bearer "):
+        return False
+    token = header[len("Bearer "):].strip().encode()
+    return any(hmac.compare_digest(token, known.encode()) for known in settings.ATTENDANCE_DEVICE_TOKENS)
+
+
+class AttendanceClockView(APIView):
+    """
+    POST {"events": [{"user": 42, "at": "2025-01-06T08:01:12+03:00",
+    "direction": "in", "device": "gate-1"}, ...]} from a badge reader (or an
+    admin session). Valid events are buffered for bulk writing and the
+    response is 202 with per-index errors for the rest; 503 means the
+    buffer is full and the batch should be resent.
+    """
+    parser_classes = [JSONParser]
+
+    def post(self, request, *args, **kwargs):
+        if not (device_authorized(request) or PermissionHelpers.is_admin_user(request.user)):
+            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+        items = request.data.get("events") if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({"detail": "Provide a list of events"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.ATTENDANCE_MAX_BATCH:
+            return Response(
+                {"detail": f"At most {settings.ATTENDANCE_MAX_BATCH} events per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        events, errors = attendance.parse_events(items)
+        events = attendance.drop_other_tenants(events, errors, len(items))
+        if errors:
+            attendance.EVENTS.inc("rejected", amount=len(errors))
+        if events:
+            if not settings.ATTENDANCE_BUFFERED:
+                attendance.write_events(events)
+            elif not attendance.buffer.add(events):
+                attendance.EVENTS.inc("shed", amount=len(events))
+                response = Response(
+                    {"detail": "Attendance ingest is backed up; retry shortly."},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                )
+                response["Retry-After"] = "5"
+                return response
+            attendance.EVENTS.inc("accepted", amount=len(events))
+        return Response({"accepted": len(events), "rejected": errors}, status=status.HTTP_202_ACCEPTED)
+
+
+class AttendanceDailyView(APIView):
+    """
+    GET ?from=YYYY-MM-DD&to=YYYY-MM-DD[&user=<id>]: daily worked-time
+    summaries (default: the last 7 days). Employees only see their own.
+    """
+    permission_classes = [IsAuthenticated]
+    max_days = 62
+
+    def get(self, request, *args, **kwargs):
+        user = request.user
+        today = timezone.localdate()
+        try:
+            end = date.fromisoformat(request.query_params.get("to") or today.isoformat())
+            start = date.fromisoformat(request.query_params.get("from") or (end - timedelta(days=6)).isoformat())
+        except ValueError:
+            return Response({"detail": "Dates must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+        if end < start or (end - start).days >= self.max_days:
+            return Response(
+                {"detail": f"Choose a range of 1 to {self.max_days} days"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        qs = tenancy.scoped(DailyAttendance.objects.filter(date__range=(start, end)), "user__organization")
+        user_param = request.query_params.get("user", "")
+        if PermissionHelpers.is_admin_user(user):
+            if user_param.isdigit():
+                qs = qs.filter(user_id=int(user_param))
+        elif user_param and user_param != str(user.pk):
+            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+        else:
+            qs = qs.filter(user_id=user.pk)
+
+        days = list(
+            qs.order_by("date", "user_id").values(
+                "user_id", "date", "worked_seconds", "first_in", "last_out", "open_since", "events"
+            )
+        )
+        return Response({"from": start, "to": end, "days": days}, status=status.HTTP_200_OK)
+
+
+class CelebrationsView(APIView):
+    """
+    GET ?from=YYYY-MM-DD&days=N[&department=<id>]: birthdays and work
+    anniversaries in the window (default: the 7 days from today).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        if not PermissionHelpers.is_employee_user(request.user):
+            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+        params = request.query_params
+        try:
+            start = date.fromisoformat(params["from"]) if params.get("from") else timezone.localdate()
+            days = int(params.get("days", 7))
+            department = int(params["department"]) if params.get("department") else None
+        except ValueError:
+            return Response({"detail": "Invalid from, days or department"}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= days <= celebrations.MAX_DAYS:
+            return Response(
+                {"detail": f"days must be between 1 and {celebrations.MAX_DAYS}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        data = celebrations.upcoming(start, days, department)
+        return Response(
+            {"from": start, "to": start + timedelta(days=days - 1), **data},
+            status=status.HTTP_200_OK,
+        )
+
+
+class WorkforceAnalyticsView(APIView):
+    """
+    GET [?department=<id>]: headcount, department/role/gender/status mix
+    and tenure and age bands, computed from the columnar snapshot
+    (accounts/snapshot.py) without querying the user tables. Answers 202
+    with the building job until the first snapshot exists.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        if not PermissionHelpers.is_admin_user(request.user):
+            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            department = int(request.query_params["department"]) if request.query_params.get("department") else None
+        except ValueError:
+            return Response({"detail": "Invalid department"}, status=status.HTTP_400_BAD_REQUEST)
+
+        current = snapshot.current()
+        if current is None:
+            return job_accepted(request, snapshot.schedule_rebuild(request.user, force=True))
+        if current.age_seconds() > settings.WORKFORCE_SNAPSHOT_MAX_AGE:
+            snapshot.schedule_rebuild(request.user)
+        return Response(snapshot.summary(current, timezone.localdate(), department), status=status.HTTP_200_OK)
+
+
+class AdminDashboardView(APIView):
+    """
+    GET: headcount by department and role, new hires per month and profile
+    completeness, read from the counters that the signals keep current
+    (accounts/dashboard.py) rather than counted on every view. Answers 202
+    with the reconciliation job until the counters have been computed once.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        if not PermissionHelpers.is_admin_user(request.user):
+            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+        counters = dashboard.load()
+        reconciled_at = dashboard.reconciled_at(counters)
+        if reconciled_at is None:
+            return job_accepted(request, dashboard.schedule_reconcile(request.user, force=True))
+        if (timezone.now() - reconciled_at).total_seconds() > settings.DASHBOARD_RECONCILE_INTERVAL:
+            dashboard.schedule_reconcile(request.user)
+        return Response(dashboard.figures(counters, timezone.localdate()), status=status.HTTP_200_OK)
+
+
+def job_payload(request, job):
+    links = {"self": request.build_absolute_uri(reverse("api_job_status", args=[job.pk]))}
+    if job.status == Job.Status.SUCCEEDED and isinstance(job.result, dict):
+        if job.result.get("file"):
+            links["result"] = request.build_absolute_uri(reverse("api_job_download", args=[job.pk]))
+        elif job.result.get("url"):
+            links["result"] = request.build_absolute_uri(job.result["url"])
+    total = job.progress_total
+    return {
+        "id": job.pk,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": {
+            "done": job.progress_done,
+            "total": total,
+            "percent": round(100 * job.progress_done / total, 1) if total else None,
+            "message": job.progress_message,
+        },
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "result": job.result,
+        "error": job.error.strip().splitlines()[-1] if job.error else "",
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "links": links,
+    }
+
+
+def job_accepted(request, job):
+    """202 pointing at the job's status URL (already finished under JOBS_EAGER)."""
+    if settings.JOBS_EAGER:
+        job.refresh_from_db()
+    payload = job_payload(request, job)
+    response = Response({"job": payload}, status=status.HTTP_202_ACCEPTED)
+    response["Location"] = payload["links"]["self"]
+    return response
+
+
+def visible_jobs(request):
+    """Jobs the user may see: their own, or all of their organization's for admins."""
+    qs = tenancy.scoped(Job.objects.all())
+    if not PermissionHelpers.is_admin_user(request.user):
+        qs = qs.filter(created_by=request.user)
+    return qs
+
+
+class JobStatusView(APIView):
+    """GET: status, progress and result links of a job started by the user (admins see all)."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        job = get_object_or_404(visible_jobs(request), pk=pk)
+        response = Response(job_payload(request, job), status=status.HTTP_200_OK)
+        if not job.finished:
+            patch_cache_control(response, no_store=True)
+        return response
+
+
+class JobDownloadView(APIView):
+    """
+    GET: the file a finished job wrote (a CSV export), for the user who
+    started the job (or a superuser) until it is EXPORTS_MAX_AGE old.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        qs = visible_jobs(request)
+        if not request.user.is_superuser:
+            qs = qs.filter(created_by=request.user)
+        job = get_object_or_404(qs, pk=pk, status=Job.Status.SUCCEEDED)
+        name = job.result.get("file") if isinstance(job.result, dict) else None
+        if not name:
+            raise Http404("This job has no file")
+        expired = job.finished_at is None or (
+            timezone.now() - job.finished_at > timedelta(seconds=settings.EXPORTS_MAX_AGE)
+        )
+        path = os.path.join(str(settings.EXPORTS_DIR), os.path.basename(name))
+        if expired or not os.path.isfile(path):
+            return Response({"detail": "This export has expired; start a new one"}, status=status.HTTP_410_GONE)
+        response = FileResponse(open(path, "rb"), as_attachment=True, filename=f"users-{job.pk}.csv",
+                                content_type="text/csv")
+        patch_cache_control(response, private=True, no_store=True)
+        return response
+
+
+class AdminUsersExportView(APIView):
+    """POST: start a CSV export of the user directory; poll the returned job for the file."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        if not PermissionHelpers.is_admin_user(request.user):
+            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+        return job_accepted(request, jobs.enqueue("users.export", user=request.user))
+
+
+async def directory_events(request):
+    """
+    Server-sent event stream of directory changes for admin consoles. Serve
+    through backend/asgi.py; each open connection is an idle coroutine.
+    """
+    user = await request.auser()
+    if not PermissionHelpers.is_admin_user(user):
+        return JsonResponse({"detail": "Forbidden"}, status=403)
+    response = StreamingHttpResponse(
+        event_stream(settings.EVENTS_HEARTBEAT_SECONDS, tenancy.request_tenant(user)),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
 
 
 class AdminUserDeleteView(APIView):
@@ -92,15 +599,26 @@ def AdminUserUpdateView(request, pk):
     if not PermissionHelpers.is_admin_user(request.user):
         return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
 
-    user = get_object_or_404(User, pk=pk)
-    serializer = AdminUserUpdateSerializer(user, data=request.data, partial=True, context={"request": request})
+    # Load the profile alongside the user so the serializer can diff and
+    # save it without a second lookup.
+    user = get_object_or_404(User.objects.select_related("profile", "profile__department"), pk=pk)
+    serializer = AdminUserUpdateSerializer(
+        user,
+        data=request.data,
+        partial=True,
+        context={"request": request, "expected_version": expected_version_from(request)},
+    )
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    updated_user = serializer.save()
+    try:
+        updated_user = serializer.save()
+    except VersionConflict:
+        return version_conflict_response(user, request)
 
     # Use the unified serializer so the response mirrors list data
-    serialized = UserSerializer(updated_user, context={"request": request}).data
+    with section("ser"):
+        serialized = UserSerializer(updated_user, context={"request": request}).data
     return Response(serialized, status=status.HTTP_200_OK)
 
 
@@ -114,10 +632,123 @@ def AdminUsersBulkDeleteView(request):
     if not isinstance(ids, list):
         return Response({"detail": "Provide a list of user IDs"}, status=status.HTTP_400_BAD_REQUEST)
 
+    if len(ids) > settings.JOBS_BULK_DELETE_THRESHOLD:
+        try:
+            ids = sorted({int(pk) for pk in ids})
+        except (TypeError, ValueError):
+            return Response({"detail": "Provide a list of user IDs"}, status=status.HTTP_400_BAD_REQUEST)
+        return job_accepted(request, jobs.enqueue("users.bulk_delete", {"ids": ids}, user=request.user))
+
     users = User.objects.filter(id__in=ids)
-    deleted_count = users.count()
-    users.delete()
-    return Response({"deleted": deleted_count}, status=status.HTTP_200_OK)
+    with transaction.atomic(), batch_user_changes():
+        pks = list(users.values_list("pk", flat=True))
+        with deleting_users(pks):
+            users.delete()
+    return Response({"deleted": len(pks)}, status=status.HTTP_200_OK)
+
+
+class AdminUserArchiveView(APIView):
+    """
+    POST {termination_date?, reason?}: terminate an employee, moving them
+    out of the live tables into the archive. The date defaults to the
+    profile's end_date, else today.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk, *args, **kwargs):
+        if not PermissionHelpers.is_admin_user(request.user):
+            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+        user = get_object_or_404(User, pk=pk)
+        if user.pk == request.user.pk:
+            return Response({"detail": "Cannot archive yourself"}, status=status.HTTP_400_BAD_REQUEST)
+        termination_date = request.data.get("termination_date") or None
+        if termination_date is not None:
+            try:
+                termination_date = date.fromisoformat(str(termination_date))
+            except ValueError:
+                return Response({"detail": "termination_date must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+
+        record = archive_employee(
+            user,
+            termination_date=termination_date,
+            reason=str(request.data.get("reason") or ""),
+            archived_by=request.user,
+        )
+        return Response(ArchivedEmployeeSerializer(record).data, status=status.HTTP_201_CREATED)
+
+
+class ArchivedEmployeesView(APIView):
+    """
+    GET ?q=&department=&from=&to=&limit=&offset=: search former employees.
+    ``q`` matches names, username, email and payroll number; from/to bound
+    the termination date.
+    """
+    permission_classes = [IsAuthenticated]
+    max_limit = 200
+
+    def get(self, request, *args, **kwargs):
+        if not PermissionHelpers.is_admin_user(request.user):
+            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+        params = request.query_params
+        qs = ArchivedEmployee.objects.all()
+        q = params.get("q", "").strip()
+        if q:
+            match = (
+                Q(username__icontains=q) | Q(email__icontains=q) | Q(first_name__icontains=q)
+                | Q(last_name__icontains=q) | Q(payroll_number__iexact=q)
+            )
+            if q.isdigit():
+                match |= Q(pk=int(q))
+            qs = qs.filter(match)
+        if params.get("department"):
+            qs = qs.filter(department_name__iexact=params["department"])
+        try:
+            if params.get("from"):
+                qs = qs.filter(termination_date__gte=date.fromisoformat(params["from"]))
+            if params.get("to"):
+                qs = qs.filter(termination_date__lte=date.fromisoformat(params["to"]))
+            limit = min(int(params.get("limit", 50)), self.max_limit)
+            offset = int(params.get("offset", 0))
+        except ValueError:
+            return Response({"detail": "Invalid date or paging parameter"}, status=status.HTTP_400_BAD_REQUEST)
+
+        page = qs.order_by("-termination_date", "-pk")[max(offset, 0):max(offset, 0) + max(limit, 1)]
+        return Response(
+            {"count": qs.count(), "results": ArchivedEmployeeSerializer(page, many=True).data},
+            status=status.HTTP_200_OK,
+        )
+
+
+class ArchivedEmployeeDetailView(APIView):
+    """GET: one archived employee, including the full snapshot of their records."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        if not PermissionHelpers.is_admin_user(request.user):
+            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+        record = get_object_or_404(ArchivedEmployee, pk=pk)
+        return Response(ArchivedEmployeeDetailSerializer(record).data, status=status.HTTP_200_OK)
+
+
+class ArchivedEmployeeRestoreView(APIView):
+    """POST: bring an archived employee back under their original id (rehire, mistaken termination)."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk, *args, **kwargs):
+        if not PermissionHelpers.is_admin_user(request.user):
+            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+        record = get_object_or_404(ArchivedEmployee, pk=pk)
+        try:
+            user = restore_employee(record)
+        except RestoreConflict:
+            return Response(
+                {"detail": f"The username {record.username!r} is taken by a live account"},
+                status=status.HTTP_409_CONFLICT,
+            )
+        user = User.objects.select_related("profile", "profile__department").get(pk=user.pk)
+        return Response(UserSerializer(user, context={"request": request}).data, status=status.HTTP_201_CREATED)
 
 
 class EmployeeSelfProfileView(APIView):
@@ -128,7 +759,8 @@ class EmployeeSelfProfileView(APIView):
         if not PermissionHelpers.is_employee_user(request.user):
             return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
 
-        data = UserSerializer(request.user, context={"request": request}).data
+        with section("ser"):
+            data = UserSerializer(request.user, context={"request": request}).data
         return Response(data, status=status.HTTP_200_OK)
 
     def patch(self, request, *args, **kwargs):
@@ -139,24 +771,100 @@ class EmployeeSelfProfileView(APIView):
             request.user,
             data=request.data,
             partial=True,
-            context={"request": request},
+            context={"request": request, "expected_version": expected_version_from(request)},
         )
 
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        updated_user = serializer.save()
-        data = UserSerializer(updated_user, context={"request": request}).data
+        try:
+            updated_user = serializer.save()
+        except VersionConflict:
+            return version_conflict_response(request.user, request)
+        with section("ser"):
+            data = UserSerializer(updated_user, context={"request": request}).data
         return Response(data, status=status.HTTP_200_OK)
 
 
+def employee_dashboard(user):
+    return {
+        "greeting": f"Hello {user.get_full_name() or user.username}",
+        "stats": {"notifications": 0, "tasks": 0},
+    }
+
+
+def admin_dashboard(user, departments):
+    counters = dashboard.load()
+    if dashboard.reconciled_at(counters) is not None:
+        roles = dashboard.role_headcount(counters)
+        counts = {
+            "admins": roles[User.Roles.ADMIN],
+            "employees": roles[User.Roles.EMPLOYEE],
+            "clients": roles[User.Roles.CLIENT],
+        }
+    else:
+        # The counters have not been computed yet
+        counts = User.objects.filter(is_active=True).aggregate(
+            admins=Count("pk", filter=Q(role="Admin")),
+            employees=Count("pk", filter=Q(role="Employee")),
+            clients=Count("pk", filter=Q(role="Client")),
+        )
+    return {
+        "greeting": f"Hello {user.get_full_name() or user.username}",
+        "stats": {**counts, "departments": len(departments)},
+    }
+
+
 class EmployeeDashboardView(APIView):
     """Minimal placeholder for /api/dashboard/employee/."""
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        payload = {
-            "greeting": f"Hello {request.user.get_full_name() or request.user.username}",
-            "stats": {"notifications": 0, "tasks": 0},
-        }
-        return Response(payload, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(employee_dashboard(request.user), status=status.HTTP_200_OK)
+
+
+@ensure_csrf_cookie
+@api_view(["GET"])
+def bootstrap(request):
+    """
+    Everything the SPA needs at startup in one round trip: identity, profile,
+    departments and the role's dashboard. Also sets the CSRF cookie, so it
+    replaces the csrf/whoami/profile/departments/dashboard waterfall.
+
+    The ETag is a hash of the body: an unchanged payload costs a 304 without
+    a body, which is what matters on high-latency links.
+    """
+    user = request.user
+    if not (user and user.is_authenticated):
+        data = {"user": None}
+    else:
+        # Authentication loaded the user; only the profile is read here
+        show_profile = PermissionHelpers.is_employee_user(user)
+        if show_profile:
+            profile = EmployeeProfile.objects.select_related("department").filter(user_id=user.pk).first()
+            User.profile.related.set_cached_value(user, profile)
+        departments = list(Department.objects.order_by("name"))
+        if PermissionHelpers.is_admin_user(user):
+            role_dashboard = admin_dashboard(user, departments)
+        else:
+            role_dashboard = employee_dashboard(user)
+        with section("ser"):
+            data = {
+                "user": {
+                    "username": user.username,
+                    "email": user.email,
+                    "role": user.role,
+                    "avatar": user.avatar.url if user.avatar else "",
+                    "organization": user.organization_id,
+                },
+                "profile": UserSerializer(user, context={"request": request}).data if show_profile else None,
+                "departments": DepartmentSerializer(departments, many=True).data,
+                "dashboard": role_dashboard,
+            }
+
+    content = FastJSONRenderer().render(data)
+    response = HttpResponse(content, content_type="application/json")
+    response["ETag"] = f'"{hashlib.md5(content, usedforsecurity=False).hexdigest()}"'
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ["Cookie"])
+    return get_conditional_response(request, etag=response["ETag"], response=response)
\ No newline at end of file
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+
+
+class ThresholdGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that only compresses buffered responses of at least
+    ``REST_FRAMEWORK["COMPRESS_MIN_SIZE"]`` bytes. Small payloads are not worth
+    the CPU, and streaming responses (file downloads, event streams) are left
+    alone so they are not buffered.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        options = getattr(settings, "REST_FRAMEWORK", {})
+        self.enabled = options.get("COMPRESS_RESPONSES", True)
+        self.min_size = options.get("COMPRESS_MIN_SIZE", 1024)
+
+    def process_response(self, request, response):
+        if not self.enabled or response.streaming or len(response.content) < self.min_size:
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,133 @@
+"""
+Read-replica routing.
+
+Writes, migrations and anything inside a transaction always use ``default``.
+Reads use a replica only while replica reads are switched on for the current
+request or block:
+
+* ``ReplicaRoutingMiddleware`` switches them on for safe (GET/HEAD) requests
+  to the URL names in ``settings.READ_REPLICA_ROUTES`` (lists, search,
+  reports, exports).
+* ``replica_reads()`` does the same for management commands and scripts.
+
+One replica is picked when replica reads are switched on and serves every
+read until they are switched off again, so a request never combines rows
+read from replicas with different lag.
+
+After a session writes (a successful POST/PUT/PATCH/DELETE) the middleware
+sets a short-lived cookie that pins that client to the primary for
+``REPLICA_PIN_SECONDS``, so users read their own writes despite replica lag.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# The replica serving reads for the current request or block (None: primary)
+_replica = ContextVar("read_replica", default=None)
+
+# Auth state must never lag behind the login that created it.
+PRIMARY_ONLY_APPS = frozenset({"sessions"})
+
+UNSAFE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith("replica")]
+
+
+def pick_replica():
+    replicas = replica_aliases()
+    return random.choice(replicas) if replicas else None
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    token = _replica.set(pick_replica() if enabled else None)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replica = _replica.get()
+        if replica is None:
+            return DEFAULT_DB_ALIAS
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """Place after AuthenticationMiddleware."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.routes = frozenset(getattr(settings, "READ_REPLICA_ROUTES", ()))
+        self.pin_cookie = getattr(settings, "REPLICA_PIN_COOKIE", "db_pin")
+        self.pin_seconds = getattr(settings, "REPLICA_PIN_SECONDS", 10)
+        self.enabled = bool(replica_aliases())
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = _replica.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica.reset(token)
+        return self.pin_after_write(request, response)
+
+    async def __acall__(self, request):
+        token = _replica.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _replica.reset(token)
+        return self.pin_after_write(request, response)
+
+    def pin_after_write(self, request, response):
+        if self.enabled and request.method in UNSAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                self.pin_cookie,
+                "1",
+                max_age=self.pin_seconds,
+                httponly=True,
+                samesite="Lax",
+                secure=settings.SESSION_COOKIE_SECURE,
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            self.enabled
+            and request.method in ("GET", "HEAD")
+            and request.resolver_match.view_name in self.routes
+            and self.pin_cookie not in request.COOKIES
+        ):
+            _replica.set(pick_replica())
+        return None
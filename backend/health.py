@@ -0,0 +1,96 @@
+"""
+Liveness and readiness probes for load balancers and orchestrators.
+
+``HealthCheckMiddleware`` goes first in MIDDLEWARE and answers the probe
+paths before anything else runs: no session, CSRF, auth, host validation or
+request metrics, so a probe every few seconds costs next to nothing.
+
+* ``HEALTH_LIVENESS_PATH`` (``/healthz``): the process is serving requests.
+* ``HEALTH_READINESS_PATH`` (``/readyz``): the default database answers
+  ``SELECT 1``. The result is cached per process for
+  ``HEALTH_CACHE_SECONDS``, so a burst of probes makes one round trip and a
+  database outage is not multiplied by the number of probers.
+
+Both answer 200 with ``{"status": "ok"}``; readiness answers 503 with the
+error when the database is unreachable. Probes reach the access log only at
+their ACCESS_LOG_SAMPLE_RATES rate (failures always).
+"""
+
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import JsonResponse
+
+from backend.logs import log_request
+
+_lock = threading.Lock()
+_checked = {"at": None, "error": None}
+
+
+def database_error():
+    """None when the default database answers, else the error text."""
+    try:
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    except Exception as e:
+        return f"{type(e).__name__}: {e}".strip()
+    return None
+
+
+def readiness_error():
+    """``database_error()``, cached for HEALTH_CACHE_SECONDS."""
+    ttl = settings.HEALTH_CACHE_SECONDS
+    with _lock:
+        now = time.monotonic()
+        if _checked["at"] is None or now - _checked["at"] >= ttl:
+            _checked["error"], _checked["at"] = database_error(), now
+        return _checked["error"]
+
+
+def probe_response(error):
+    if error:
+        return JsonResponse({"status": "unavailable", "error": error}, status=503)
+    return JsonResponse({"status": "ok"})
+
+
+class HealthCheckMiddleware:
+    """Place first in MIDDLEWARE."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.liveness_path = settings.HEALTH_LIVENESS_PATH
+        self.readiness_path = settings.HEALTH_READINESS_PATH
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def probed(self, request, started, error):
+        response = probe_response(error)
+        route = "healthz" if request.path == self.liveness_path else "readyz"
+        log_request(request, route, response.status_code, time.perf_counter() - started)
+        return response
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        if request.path == self.liveness_path:
+            return self.probed(request, started, None)
+        if request.path == self.readiness_path:
+            return self.probed(request, started, readiness_error())
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        if request.path == self.liveness_path:
+            return self.probed(request, started, None)
+        if request.path == self.readiness_path:
+            return self.probed(request, started, await sync_to_async(readiness_error)())
+        return await self.get_response(request)
@@ -0,0 +1,208 @@
+"""
+Per-request SQL and timing instrumentation.
+
+``RequestInstrumentationMiddleware`` counts queries and database time on every
+connection, times the view and any ``section()`` blocks (serialization), adds a
+``Server-Timing`` header, logs slow requests with their most repeated SQL,
+writes the access log (backend.logs) and enforces the per-URL-name query
+budgets in ``settings.QUERY_BUDGETS``.
+"""
+
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from backend import metrics as request_metrics
+from backend.logs import log_request
+
+logger = logging.getLogger("backend.requests")
+
+_current = ContextVar("request_metrics", default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestMetrics:
+    __slots__ = ("started", "view_started", "queries", "db_time", "sections", "statements")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.sections = defaultdict(float)
+        self.statements = Counter()
+
+    def record_query(self, sql, duration):
+        self.queries += 1
+        self.db_time += duration
+        self.statements[sql] += 1
+
+    def repeated_sql(self, limit=5):
+        return [(sql, n) for sql, n in self.statements.most_common(limit) if n > 1]
+
+
+def current_metrics():
+    """The metrics of the request being served on this thread/task, if any."""
+    return _current.get()
+
+
+@contextmanager
+def section(name):
+    """Time a block (e.g. ``section("ser")`` around ``serializer.data``)."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.sections[name] += time.perf_counter() - start
+
+
+class _QueryRecorder:
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.metrics.record_query(sql, time.perf_counter() - start)
+
+
+@contextmanager
+def record_queries(metrics):
+    """Feed every query on every configured database into ``metrics``."""
+    recorder = _QueryRecorder(metrics)
+    with ExitStack() as stack:
+        for alias in settings.DATABASES:
+            stack.enter_context(connections[alias].execute_wrapper(recorder))
+        yield
+
+
+def route_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    return match.view_name
+
+
+def check_query_budget(name, queries, statements=None):
+    """Warn, or raise when ``QUERY_BUDGETS_STRICT`` is set, if over budget."""
+    budget = getattr(settings, "QUERY_BUDGETS", {}).get(name)
+    if budget is None or queries <= budget:
+        return
+    message = f"{name} ran {queries} queries (budget {budget})"
+    if statements:
+        message += "; most repeated: " + "; ".join(f"{n}x {sql}" for sql, n in statements)
+    if getattr(settings, "QUERY_BUDGETS_STRICT", False):
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+@contextmanager
+def assert_max_queries(limit, label="block"):
+    """
+    Test helper: fail if the wrapped block runs more than ``limit`` queries.
+
+        with assert_max_queries(4, "admin user patch"):
+            client.patch(...)
+    """
+    metrics = RequestMetrics()
+    with record_queries(metrics):
+        yield metrics
+    if metrics.queries > limit:
+        detail = "; ".join(f"{n}x {sql}" for sql, n in metrics.statements.most_common(5))
+        raise QueryBudgetExceeded(f"{label} ran {metrics.queries} queries (limit {limit}): {detail}")
+
+
+def server_timing(metrics, total):
+    parts = [f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"']
+    for name, duration in metrics.sections.items():
+        parts.append(f"{name};dur={duration * 1000:.1f}")
+    if metrics.view_started is not None:
+        parts.append(f"view;dur={(time.perf_counter() - metrics.view_started) * 1000:.1f}")
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class RequestInstrumentationMiddleware:
+    """Keep this first in MIDDLEWARE so ``total`` covers the whole stack."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "SLOW_REQUEST_MS", 500)
+        self.server_timing = getattr(settings, "SERVER_TIMING_ENABLED", True)
+        # Under ASGI stay async so long-lived async views (event streams)
+        # don't each tie up a thread.
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with record_queries(metrics):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with record_queries(metrics):
+                response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        total = time.perf_counter() - metrics.started
+        if self.server_timing:
+            response["Server-Timing"] = server_timing(metrics, total)
+
+        name = route_name(request)
+        request_metrics.observe_request(
+            name, request.method, response.status_code, total, metrics.queries, metrics.db_time
+        )
+        if total * 1000 >= self.slow_ms:
+            logger.warning(
+                "Slow request %s %s (%s): %.0f ms, %d queries, %.0f ms db; repeated SQL: %s",
+                request.method,
+                request.path,
+                name,
+                total * 1000,
+                metrics.queries,
+                metrics.db_time * 1000,
+                metrics.repeated_sql() or "none",
+            )
+        log_request(request, name, response.status_code, total, metrics.queries, metrics.db_time, self.slow_ms)
+        if name is not None:
+            check_query_budget(name, metrics.queries, metrics.repeated_sql())
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.view_started = time.perf_counter()
+        return None
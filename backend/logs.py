@@ -0,0 +1,179 @@
+"""
+Structured logging that never blocks a request on the log destination.
+
+``BackgroundHandler`` (the root handler in settings.LOGGING) only puts each
+record on an in-memory queue. A listener thread formats the records as JSON
+lines (``JsonFormatter``) and writes them to stderr or LOG_FILE, so a slow
+disk or pipe delays the listener rather than request threads. When the
+queue is full the record is dropped and counted in
+``log_records_dropped_total``. The listener starts with the first record in
+each process, so gunicorn workers forked from a preloaded master get their
+own thread. Pending records are flushed when logging shuts down.
+
+``log_request()`` writes the access log ("backend.access"): one record per
+request with the route name, status, latency, query count, user id and
+role. Routes listed in ACCESS_LOG_SAMPLE_RATES (whoami, the health probes)
+are sampled at their rate, and every other route at ACCESS_LOG_SAMPLE_RATE.
+Server errors and requests slower than SLOW_REQUEST_MS are always logged.
+Writes (POST, PUT, PATCH, DELETE) by signed-in users also go to the audit
+log ("backend.audit"), which is never sampled.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import weakref
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+
+from django.conf import settings
+
+from backend.metrics import Counter
+
+ACCESS = logging.getLogger("backend.access")
+AUDIT = logging.getLogger("backend.audit")
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "TRACE"})
+
+DROPPED = Counter("log_records_dropped_total", "Log records dropped because the log queue was full.")
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_handlers = weakref.WeakSet()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, extra fields, traceback."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class BackgroundHandler(QueueHandler):
+    """
+    Queue records for a per-process listener thread that writes them to
+    ``filename`` (reopened if rotated away) or stderr.
+    """
+
+    def __init__(self, filename=None, capacity=10000):
+        super().__init__(queue.Queue(capacity))
+        self.filename = filename or None
+        self.capacity = capacity
+        self.dropped = 0
+        self.listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        _handlers.add(self)
+
+    def _target(self):
+        if self.filename:
+            target = WatchedFileHandler(self.filename, encoding="utf-8")
+        else:
+            target = logging.StreamHandler(sys.stderr)
+        target.setFormatter(JsonFormatter())
+        return target
+
+    def _start(self):
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self.queue = queue.Queue(self.capacity)
+            self.listener = QueueListener(self.queue, self._target(), respect_handler_level=False)
+            self.listener.start()
+            self._pid = os.getpid()
+
+    def _forked(self):
+        # The listener thread did not survive the fork; the next record starts one
+        self._start_lock = threading.Lock()
+        self.listener, self._pid = None, None
+
+    def prepare(self, record):
+        # Resolve the message and traceback now (arguments may change once we
+        # return) but leave the formatting to the listener thread.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            DROPPED.inc()
+
+    def close(self):
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+            self.listener.handlers[0].close()
+            self.listener = None
+        super().close()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: [handler._forked() for handler in list(_handlers)])
+
+
+def request_user(request):
+    """(user id, role) of the signed-in user, without loading a user nobody asked for."""
+    user = getattr(request, "user", None)
+    wrapped = getattr(user, "_wrapped", user)
+    if wrapped is None or wrapped.__class__ is object or not getattr(wrapped, "is_authenticated", False):
+        return None, None
+    return wrapped.pk, getattr(wrapped, "role", None)
+
+
+def sample_rate(route):
+    return settings.ACCESS_LOG_SAMPLE_RATES.get(route, settings.ACCESS_LOG_SAMPLE_RATE)
+
+
+def log_request(request, route, status, duration, queries=0, db_time=0.0, slow_ms=None):
+    """Write the access (and, for writes, audit) record of a finished request."""
+    slow = duration * 1000 >= (settings.SLOW_REQUEST_MS if slow_ms is None else slow_ms)
+    user_id, role = request_user(request)
+    audit = request.method not in SAFE_METHODS and user_id is not None
+    rate = 1.0 if status >= 500 or slow else sample_rate(route)
+    sampled = rate >= 1.0 or (rate > 0 and random.random() < rate)
+    if not (sampled or audit):
+        return
+    fields = {
+        "method": request.method,
+        "path": request.path,
+        "route": route,
+        "status": status,
+        "duration_ms": round(duration * 1000, 1),
+        "queries": queries,
+        "db_ms": round(db_time * 1000, 1),
+        "user_id": user_id,
+        "role": role,
+    }
+    if sampled:
+        level = logging.ERROR if status >= 500 else logging.WARNING if slow else logging.INFO
+        ACCESS.log(level, "%s %s %s", request.method, request.path, status,
+                   extra={**fields, "slow": slow, "sample_rate": rate})
+    if audit:
+        AUDIT.info("%s %s %s by user %s", request.method, request.path, status, user_id,
+                   extra={**fields, "view_kwargs": getattr(getattr(request, "resolver_match", None), "kwargs", None)})
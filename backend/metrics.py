@@ -0,0 +1,357 @@
+"""
+Low-overhead in-process metrics with Prometheus text exposition.
+
+Every thread records into its own shard (a plain dict), so the hot path takes
+no locks. With ``METRICS_DIR`` set, each worker process periodically writes a
+snapshot of its shards to ``METRICS_DIR/metrics-<pid>-<token>.json`` and the
+``/metrics/`` endpoint sums all of them, so any worker can answer for the whole
+deployment. The random token keeps a worker that reuses a dead worker's pid
+from overwriting its file. Files of workers that have exited are folded into
+``metrics-retired.json`` by the surviving workers' flush loops, so their
+totals keep counting and the aggregated counters never go backwards. Clear
+``METRICS_DIR`` on deploy, as with prometheus_client's multiprocess mode.
+"""
+
+import atexit
+import glob
+import hmac
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, fine for a dev server
+    fcntl = None
+
+from django.conf import settings
+from django.http import HttpResponse
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+_registry = {}
+_shards = []
+_shards_lock = threading.Lock()
+_local = threading.local()
+_flusher_pid = None
+# This process's snapshot file name, regenerated after a fork
+_process = {"pid": None, "name": None}
+RETIRED = "metrics-retired.json"
+
+
+def _shard():
+    try:
+        return _local.shard
+    except AttributeError:
+        shard = _local.shard = {}
+        with _shards_lock:
+            _shards.append(shard)
+        if _metrics_dir():
+            _ensure_flusher()
+        return shard
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry[name] = self
+
+    def inc(self, *labels, amount=1):
+        key = (self.name, labels)
+        shard = _shard()
+        cell = shard.get(key)
+        if cell is None:
+            cell = shard[key] = [0]
+        cell[0] += amount
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        _registry[name] = self
+
+    def observe(self, value, *labels):
+        key = (self.name, labels)
+        shard = _shard()
+        cell = shard.get(key)
+        if cell is None:
+            # one slot per bucket plus +Inf, then sum and count
+            cell = shard[key] = [0] * (len(self.buckets) + 3)
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route, method and status class.",
+    ("route", "method", "status"),
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route.",
+    ("route",),
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries per request by route.",
+    ("route",),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in the database per request by route.",
+    ("route",),
+)
+
+
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+
+def observe_request(route, method, status_code, duration, queries, db_time):
+    """Record one finished request; called by RequestInstrumentationMiddleware."""
+    route = route or "unmatched"
+    if method not in HTTP_METHODS:
+        method = "other"
+    REQUESTS.inc(route, method, f"{status_code // 100}xx")
+    REQUEST_LATENCY.observe(duration, route)
+    REQUEST_QUERIES.observe(queries, route)
+    REQUEST_DB_TIME.observe(db_time, route)
+
+
+def local_snapshot():
+    """Merge this process's thread shards into {(name, labels): cell}."""
+    merged = {}
+    with _shards_lock:
+        shards = list(_shards)
+    for shard in shards:
+        for key, cell in list(shard.items()):
+            total = merged.get(key)
+            if total is None:
+                merged[key] = list(cell)
+            else:
+                for i, value in enumerate(cell):
+                    total[i] += value
+    return merged
+
+
+def _metrics_dir():
+    return getattr(settings, "METRICS_DIR", None)
+
+
+def _snapshot_path(directory):
+    """This process's snapshot file: pid plus a token unique to this process."""
+    pid = os.getpid()
+    if _process["pid"] != pid:
+        _process.update(pid=pid, name=f"metrics-{pid}-{uuid.uuid4().hex[:12]}.json")
+    return os.path.join(directory, _process["name"])
+
+
+def _worker_files(directory):
+    return glob.glob(os.path.join(directory, "metrics-*-*.json"))
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def _locked(directory, exclusive):
+    """Serialize retiring against collecting, so no total is counted twice or missed."""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(directory, "metrics.lock"), "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _read_rows(path):
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return []
+
+
+def _merge_rows(merged, rows):
+    for name, labels, cell in rows:
+        key = (name, tuple(labels))
+        total = merged.get(key)
+        if total is None:
+            merged[key] = cell
+        elif len(total) == len(cell):
+            for i, value in enumerate(cell):
+                total[i] += value
+    return merged
+
+
+def _write_rows(path, rows):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(rows, fh)
+    os.replace(tmp, path)
+
+
+def retire_dead(directory=None):
+    """
+    Fold the snapshots of exited workers into RETIRED and remove them. A file
+    with this process's pid but another token belongs to a dead predecessor.
+    """
+    directory = directory or _metrics_dir()
+    if not directory or not os.path.isdir(directory):
+        return 0
+    own = _snapshot_path(directory)
+    with _locked(directory, exclusive=True):
+        dead = []
+        for path in _worker_files(directory):
+            pid = os.path.basename(path).split("-")[1]
+            if path != own and pid.isdigit() and (int(pid) == os.getpid() or not _pid_alive(int(pid))):
+                dead.append(path)
+        if not dead:
+            return 0
+        retired_path = os.path.join(directory, RETIRED)
+        merged = _merge_rows({}, _read_rows(retired_path))
+        for path in dead:
+            _merge_rows(merged, _read_rows(path))
+        _write_rows(retired_path, [[name, list(labels), cell] for (name, labels), cell in merged.items()])
+        for path in dead:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    return len(dead)
+
+
+def flush():
+    """Write this process's snapshot for other workers to aggregate."""
+    directory = _metrics_dir()
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    rows = [[name, list(labels), cell] for (name, labels), cell in local_snapshot().items()]
+    _write_rows(_snapshot_path(directory), rows)
+
+
+def _flush_loop(interval):
+    try:
+        retire_dead()
+    except OSError:
+        pass
+    while True:
+        time.sleep(interval)
+        try:
+            flush()
+            retire_dead()
+        except OSError:
+            pass
+
+
+def _ensure_flusher():
+    global _flusher_pid
+    pid = os.getpid()
+    if _flusher_pid == pid:
+        return
+    _flusher_pid = pid
+    interval = getattr(settings, "METRICS_FLUSH_INTERVAL", 5)
+    threading.Thread(target=_flush_loop, args=(interval,), name="metrics-flush", daemon=True).start()
+    atexit.register(flush)
+
+
+def collect():
+    """Aggregate this process's live data with the snapshots of all others."""
+    merged = local_snapshot()
+    directory = _metrics_dir()
+    if not directory:
+        return merged
+    own = _snapshot_path(directory)
+    if not os.path.isdir(directory):
+        return merged
+    with _locked(directory, exclusive=False):
+        for path in _worker_files(directory):
+            if path != own:
+                _merge_rows(merged, _read_rows(path))
+        _merge_rows(merged, _read_rows(os.path.join(directory, RETIRED)))
+    return merged
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render(data=None):
+    """Prometheus text exposition format (version 0.0.4)."""
+    data = collect() if data is None else data
+    by_metric = {}
+    for (name, labels), cell in data.items():
+        by_metric.setdefault(name, []).append((labels, cell))
+
+    lines = []
+    for name, metric in _registry.items():
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for labels, cell in sorted(by_metric.get(name, ())):
+            if metric.kind == "counter":
+                lines.append(f"{name}{_labels(metric.labelnames, labels)} {_number(cell[0])}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric.buckets + ("+Inf",), cell):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{name}_bucket{_labels(metric.labelnames, labels, le)} {_number(cumulative)}")
+            lines.append(f"{name}_sum{_labels(metric.labelnames, labels)} {_number(cell[-2])}")
+            lines.append(f"{name}_count{_labels(metric.labelnames, labels)} {_number(cell[-1])}")
+    return "\n".join(lines) + "\n"
+
+
+def _authorized(request):
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token and hmac.compare_digest(
+        request.headers.get("Authorization", "").encode(), f"Bearer {token}".encode()
+    ):
+        return True
+    user = getattr(request, "user", None)
+    return bool(user and user.is_authenticated and (user.is_staff or user.is_superuser))
+
+
+def metrics_view(request):
+    """Admin-only (staff session or ``METRICS_TOKEN`` bearer) scrape endpoint."""
+    if not _authorized(request):
+        return HttpResponse("Forbidden", status=403, content_type="text/plain")
+    return HttpResponse(render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,74 @@
+"""
+Faster JSON rendering for large API payloads.
+
+``FastJSONRenderer`` uses orjson when it is installed and produces the same
+bytes as DRF's ``JSONRenderer`` with the default UNICODE_JSON/COMPACT_JSON
+settings: dates, datetimes, decimals and lazy strings are handed back to DRF's
+encoder so their formatting is unchanged. Anything orjson cannot represent
+(pretty-printing, ASCII-only output, out-of-range integers) falls back to the
+stock renderer. So does data holding NaN or infinity, which orjson would
+write as ``null``: the stock renderer raises on it under STRICT_JSON (the
+default) and writes ``NaN``/``Infinity`` otherwise.
+"""
+
+import math
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def has_non_finite(data, isfinite=math.isfinite):
+    """True if ``data`` (nested dicts, lists and tuples) holds a NaN or infinite float."""
+    stack = [data]
+    push, pop = stack.append, stack.pop
+    while stack:
+        container = pop()
+        for value in container.values() if isinstance(container, dict) else container:
+            # Exact type checks first: this walk runs on every response
+            kind = type(value)
+            if kind is float:
+                if not isfinite(value):
+                    return True
+            elif kind is dict or kind is list:
+                push(value)
+            elif kind is str or kind is int or kind is bool or value is None:
+                continue
+            elif isinstance(value, (dict, list, tuple)):
+                push(value)
+            elif isinstance(value, float) and not isfinite(value):
+                return True
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    def __init__(self):
+        self._default = self.encoder_class().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+            or (isinstance(data, (dict, list, tuple)) and has_non_finite(data))
+            or (isinstance(data, float) and not math.isfinite(data))
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self._default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except (orjson.JSONEncodeError, TypeError):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Match JSONRenderer: escape U+2028/U+2029 so output is valid JavaScript.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
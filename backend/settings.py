@@ -1,6 +1,8 @@
 from pathlib import Path
 import os
 
+from corsheaders.defaults import default_headers
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.environ.get(
@@ -24,12 +26,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "backend.health.HealthCheckMiddleware",
+    "backend.instrumentation.RequestInstrumentationMiddleware",
+    "backend.compression.ThresholdGZipMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "backend.static.StaticFilesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "accounts.tenancy.TenantMiddleware",
+    "backend.db_router.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -61,9 +69,66 @@ DATABASES = {
         "PASSWORD": os.environ.get("DB_PASSWORD", "secret"),
         "HOST": os.environ.get("DB_HOST", "localhost"),
         "PORT": os.environ.get("DB_PORT", "5432"),
+        # Fail fast (and fail readiness) instead of hanging on an unreachable host
+        "OPTIONS": {"connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", "5"))},
     }
 }
 
+# DB_ENGINE=sqlite runs everything (including benchmarks) without Postgres.
+if os.environ.get("DB_ENGINE", "postgresql") == "sqlite":
+    DATABASES["default"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ.get("SQLITE_PATH", str(BASE_DIR / "db.sqlite3")),
+    }
+
+# Read replicas: comma-separated HOST[:PORT] list (database file paths with
+# DB_ENGINE=sqlite), exposed as aliases replica1, replica2, ... Reads are only
+# sent there for the routes in READ_REPLICA_ROUTES; see backend/db_router.py.
+# Locally, DB_ENGINE=sqlite DB_READ_REPLICAS=db.sqlite3 exercises the routing
+# with two aliases on one file.
+for _n, _replica in enumerate(filter(None, os.environ.get("DB_READ_REPLICAS", "").split(",")), 1):
+    _config = dict(DATABASES["default"], TEST={"MIRROR": "default"})
+    if _config["ENGINE"].endswith("sqlite3"):
+        _config["NAME"] = _replica.strip()
+    else:
+        _host, _, _port = _replica.strip().partition(":")
+        _config.update(HOST=_host, PORT=_port or _config["PORT"])
+    DATABASES[f"replica{_n}"] = _config
+
+DATABASE_ROUTERS = ["backend.db_router.ReadReplicaRouter"]
+
+# URL names whose GET requests may read from a replica
+READ_REPLICA_ROUTES = [
+    "api_admin_users",
+    "api_admin_user_changes",
+    "api_org_chart",
+    "api_attendance_daily",
+    "api_archived_employees",
+    "api_celebrations",
+]
+# After a write, pin the client to the primary for this long (read-your-writes)
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", "10"))
+
+# Probe endpoints answered by backend.health.HealthCheckMiddleware ahead of
+# the rest of the stack; readiness caches its database check this long
+HEALTH_LIVENESS_PATH = os.environ.get("HEALTH_LIVENESS_PATH", "/healthz")
+HEALTH_READINESS_PATH = os.environ.get("HEALTH_READINESS_PATH", "/readyz")
+HEALTH_CACHE_SECONDS = float(os.environ.get("HEALTH_CACHE_SECONDS", "5"))
+
+# Shared cache, used for login throttle counters so every worker process
+# sees the same counts. CACHE_URL picks the store:
+#   redis://host:6379/0    Redis (requires the redis package)
+#   db://table_name        a database table (run "manage.py createcachetable")
+#   locmem://              per-process memory (default; single-process only)
+CACHE_URL = os.environ.get("CACHE_URL", "locmem://")
+_scheme, _, _location = CACHE_URL.partition("://")
+if _scheme in ("redis", "rediss"):
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": CACHE_URL}}
+elif _scheme == "db":
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": _location or "cache"}}
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": _location}}
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -78,6 +143,17 @@ USE_TZ = True
 
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
+# collectstatic writes content-hashed copies plus .gz/.br variants
+# (backend/static.py); backend.static.StaticFilesMiddleware serves them
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "backend.static.CompressedManifestStaticFilesStorage"},
+}
+# Built frontend ("npm run build", then "manage.py compress_assets"), served
+# at the site root with index.html for client-side routes
+FRONTEND_DIST = Path(os.environ.get("FRONTEND_DIST", BASE_DIR / "dist"))
+# Cache lifetime of static files without a content hash in their name
+STATIC_MAX_AGE = int(os.environ.get("STATIC_MAX_AGE", "60"))
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
@@ -86,12 +162,18 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "accounts.User"
 
+# Organization (slug) that users and departments created outside any tenant
+# join, such as signups and createsuperuser (accounts/tenancy.py)
+DEFAULT_ORGANIZATION = os.environ.get("DEFAULT_ORGANIZATION", "default")
+
 # CORS configuration for frontend integration
 CORS_ALLOW_ALL_ORIGINS = False
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
 ]
 CORS_ALLOW_CREDENTIALS = True
+# Signup retries carry an Idempotency-Key header (accounts/idempotency.py)
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
 
 # CSRF trusted origins for frontend integration
 CSRF_TRUSTED_ORIGINS = [
@@ -108,12 +190,201 @@ SESSION_COOKIE_SECURE = False
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.BasicAuthentication",
+        "accounts.throttling.ThrottledBasicAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
+    # orjson-backed when available; output is byte-identical to JSONRenderer
+    "DEFAULT_RENDERER_CLASSES": [
+        "backend.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    # Gzip responses of at least COMPRESS_MIN_SIZE bytes (backend/compression.py)
+    "COMPRESS_RESPONSES": os.environ.get("COMPRESS_RESPONSES", "1") == "1",
+    "COMPRESS_MIN_SIZE": int(os.environ.get("COMPRESS_MIN_SIZE", "1024")),
+}
+
+# Delta sync (/api/admin/users/changes/): how long a change-log row must age
+# before a cursor moves past it, covering transactions that commit out of order.
+USER_CHANGES_SETTLE_SECONDS = int(os.environ.get("USER_CHANGES_SETTLE_SECONDS", "5"))
+
+# Server-sent directory events (/api/admin/events/, accounts/events.py).
+# EVENTS_PG_NOTIFY relays events between worker processes via LISTEN/NOTIFY.
+EVENTS_HEARTBEAT_SECONDS = int(os.environ.get("EVENTS_HEARTBEAT_SECONDS", "20"))
+EVENTS_PG_NOTIFY = os.environ.get(
+    "EVENTS_PG_NOTIFY", "1" if DATABASES["default"]["ENGINE"].endswith("postgresql") else "0"
+) == "1"
+
+# Request instrumentation (backend/instrumentation.py)
+SERVER_TIMING_ENABLED = os.environ.get("SERVER_TIMING_ENABLED", "1") == "1"
+SLOW_REQUEST_MS = int(os.environ.get("SLOW_REQUEST_MS", "500"))
+# Maximum queries per URL name, including session and user lookups.
+# Exceeding a budget logs a warning, or raises when QUERY_BUDGETS_STRICT is set.
+# (SQLite also counts the BEGIN/COMMIT of a user + profile edit; a manager
+# change adds two locking reads and the subtree UPDATE; deleting a user also
+# clears Job.created_by, deletes their notifications and reads and moves
+# their dashboard counters; a stale analytics snapshot looks up and queues
+# its rebuild; an admin session's clock batch checks its users belong to the
+# organization.)
+QUERY_BUDGETS = {
+    "whoami": 2,
+    "api_admin_users": 3,
+    "api_admin_user_update": 10,
+    "api_admin_user_changes": 4,
+    "api_admin_user_delete": 19,
+    "api_admin_users_bulk_delete": 20,
+    "api_employee_profile": 7,
+    "api_dashboard_employee": 2,
+    "api_bootstrap": 5,
+    "api_org_chart": 5,
+    "api_attendance_clock": 3,
+    "api_attendance_daily": 3,
+    "api_job_status": 3,
+    "api_admin_users_export": 3,
+    "api_admin_user_archive": 20,
+    "api_archived_employees": 4,
+    "api_archived_employee": 3,
+    "api_archived_employee_restore": 25,
+    "api_celebrations": 4,
+    "api_workforce_analytics": 4,
+    "api_admin_dashboard": 4,
 }
+QUERY_BUDGETS_STRICT = os.environ.get("QUERY_BUDGETS_STRICT", "0") == "1"
+
+# Logging (backend/logs.py): JSON lines on stderr, or LOG_FILE, written by a
+# background thread from an in-memory queue of LOG_QUEUE_SIZE records (full:
+# records are dropped and counted). Every request goes to the
+# "backend.access" log, sampled at ACCESS_LOG_SAMPLE_RATES[route name] or
+# ACCESS_LOG_SAMPLE_RATE ("route=rate,..."); server errors and requests over
+# SLOW_REQUEST_MS are always logged. Writes by signed-in users also go to
+# "backend.audit", unsampled.
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_FILE = os.environ.get("LOG_FILE", "")
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+ACCESS_LOG_SAMPLE_RATE = float(os.environ.get("ACCESS_LOG_SAMPLE_RATE", "1.0"))
+ACCESS_LOG_SAMPLE_RATES = {
+    route.strip(): float(rate)
+    for route, _, rate in (
+        item.partition("=")
+        for item in os.environ.get("ACCESS_LOG_SAMPLE_RATES", "whoami=0.01,healthz=0,readyz=0,metrics=0").split(",")
+        if item.strip()
+    )
+}
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "background": {
+            "class": "backend.logs.BackgroundHandler",
+            "filename": LOG_FILE,
+            "capacity": LOG_QUEUE_SIZE,
+        },
+    },
+    "root": {"handlers": ["background"], "level": LOG_LEVEL},
+    "loggers": {
+        # Replace Django's console/mail_admins handlers; records reach the root
+        "django": {"handlers": [], "level": LOG_LEVEL, "propagate": True},
+    },
+}
+
+# Attendance ingest (accounts/attendance.py). Badge readers send
+# "Authorization: Bearer <token>" with one of ATTENDANCE_DEVICE_TOKENS.
+# Events are buffered per process and written every ATTENDANCE_FLUSH_INTERVAL
+# seconds or ATTENDANCE_FLUSH_SIZE events; ATTENDANCE_BUFFERED=0 writes
+# synchronously instead. Beyond ATTENDANCE_MAX_BUFFER queued events the
+# endpoint answers 503 so readers back off and resend.
+ATTENDANCE_DEVICE_TOKENS = [t for t in os.environ.get("ATTENDANCE_DEVICE_TOKENS", "").split(",") if t]
+ATTENDANCE_BUFFERED = os.environ.get("ATTENDANCE_BUFFERED", "1") == "1"
+ATTENDANCE_FLUSH_INTERVAL = float(os.environ.get("ATTENDANCE_FLUSH_INTERVAL", "1.0"))
+ATTENDANCE_FLUSH_SIZE = int(os.environ.get("ATTENDANCE_FLUSH_SIZE", "5000"))
+ATTENDANCE_MAX_BUFFER = int(os.environ.get("ATTENDANCE_MAX_BUFFER", "200000"))
+ATTENDANCE_MAX_BATCH = int(os.environ.get("ATTENDANCE_MAX_BATCH", "5000"))
+
+# Background jobs (accounts/jobs.py), run by "manage.py run_jobs". JOBS_EAGER
+# runs each job in the enqueuing process right after commit instead (tests,
+# single-process setups). A worker must report progress within
+# JOBS_LEASE_SECONDS or its job is handed to another worker.
+JOBS_EAGER = os.environ.get("JOBS_EAGER", "0") == "1"
+JOBS_POLL_INTERVAL = float(os.environ.get("JOBS_POLL_INTERVAL", "1.0"))
+JOBS_LEASE_SECONDS = int(os.environ.get("JOBS_LEASE_SECONDS", "300"))
+JOBS_PROGRESS_INTERVAL = float(os.environ.get("JOBS_PROGRESS_INTERVAL", "1.0"))
+JOBS_MAX_ATTEMPTS = int(os.environ.get("JOBS_MAX_ATTEMPTS", "3"))
+JOBS_RETRY_BACKOFF = int(os.environ.get("JOBS_RETRY_BACKOFF", "30"))
+# Bulk deletes of more users than this run as a job (202 + status URL)
+JOBS_BULK_DELETE_THRESHOLD = int(os.environ.get("JOBS_BULK_DELETE_THRESHOLD", "500"))
+# CSV exports hold personal data: written outside MEDIA_ROOT, downloaded
+# only through /api/jobs/<id>/download/ by whoever may see the job, and
+# deleted once older than EXPORTS_MAX_AGE seconds.
+EXPORTS_DIR = Path(os.environ.get("EXPORTS_DIR", BASE_DIR / "var" / "exports"))
+EXPORTS_MAX_AGE = int(os.environ.get("EXPORTS_MAX_AGE", str(24 * 3600)))
+
+# Workforce analytics snapshot (accounts/snapshot.py): memory-mapped NumPy
+# columns shared by all workers; a reader finding it older than
+# WORKFORCE_SNAPSHOT_MAX_AGE seconds queues a rebuild job. Every web and job
+# process must see the same directory.
+WORKFORCE_SNAPSHOT_DIR = Path(os.environ.get("WORKFORCE_SNAPSHOT_DIR", BASE_DIR / "var" / "workforce"))
+WORKFORCE_SNAPSHOT_MAX_AGE = int(os.environ.get("WORKFORCE_SNAPSHOT_MAX_AGE", "900"))
+
+# Outbound email. Without an explicit EMAIL_BACKEND, DEBUG writes messages to
+# files under EMAIL_FILE_PATH instead of talking to a mail server;
+# "django.core.mail.backends.console.EmailBackend" prints them.
+EMAIL_BACKEND = os.environ.get(
+    "EMAIL_BACKEND",
+    "django.core.mail.backends.filebased.EmailBackend" if DEBUG else "django.core.mail.backends.smtp.EmailBackend",
+)
+EMAIL_FILE_PATH = os.environ.get("EMAIL_FILE_PATH", str(BASE_DIR / "var" / "mail"))
+EMAIL_HOST = os.environ.get("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.environ.get("EMAIL_PORT", "25"))
+EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS", "0") == "1"
+EMAIL_TIMEOUT = int(os.environ.get("EMAIL_TIMEOUT", "30"))
+DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", "HR Kuber <no-reply@localhost>")
+
+# Notifications (accounts/notifications.py) are sent by the
+# "notifications.dispatch" job: NOTIFICATIONS_BATCH_SIZE rows per claim, one
+# mail connection per NOTIFICATIONS_PER_CONNECTION messages and at most
+# NOTIFICATIONS_RATE messages per second per worker (0 for no limit). Digest
+# notifications wait NOTIFICATIONS_DIGEST_DELAY seconds so that a user's
+# events in that window go out as one message.
+NOTIFICATIONS_BATCH_SIZE = int(os.environ.get("NOTIFICATIONS_BATCH_SIZE", "200"))
+NOTIFICATIONS_PER_CONNECTION = int(os.environ.get("NOTIFICATIONS_PER_CONNECTION", "100"))
+NOTIFICATIONS_RATE = float(os.environ.get("NOTIFICATIONS_RATE", "10"))
+NOTIFICATIONS_DIGEST_DELAY = int(os.environ.get("NOTIFICATIONS_DIGEST_DELAY", "900"))
+NOTIFICATIONS_MAX_ATTEMPTS = int(os.environ.get("NOTIFICATIONS_MAX_ATTEMPTS", "5"))
+NOTIFICATIONS_LEASE_SECONDS = int(os.environ.get("NOTIFICATIONS_LEASE_SECONDS", "300"))
+
+# Admin dashboard counters (accounts/dashboard.py) are maintained by signals;
+# the dashboard queues a full recount once the last one is older than
+# DASHBOARD_RECONCILE_INTERVAL seconds.
+DASHBOARD_RECONCILE_INTERVAL = int(os.environ.get("DASHBOARD_RECONCILE_INTERVAL", "3600"))
+
+# Login protection (accounts/throttling.py). Failed attempts per username
+# and all attempts per client IP are counted over a sliding window in the
+# shared cache; beyond the limit the login answers 429 without hashing.
+# Password checks run through a per-process executor of
+# LOGIN_HASH_CONCURRENCY slots; an attempt that waits longer than
+# LOGIN_HASH_WAIT_SECONDS for a slot is shed with 429.
+LOGIN_THROTTLE_WINDOW = int(os.environ.get("LOGIN_THROTTLE_WINDOW", "300"))
+LOGIN_THROTTLE_IDENTIFIER_LIMIT = int(os.environ.get("LOGIN_THROTTLE_IDENTIFIER_LIMIT", "10"))
+LOGIN_THROTTLE_IP_LIMIT = int(os.environ.get("LOGIN_THROTTLE_IP_LIMIT", "300"))
+# Honour X-Forwarded-For (set only behind a trusted reverse proxy)
+LOGIN_THROTTLE_TRUST_FORWARDED = os.environ.get("LOGIN_THROTTLE_TRUST_FORWARDED", "0") == "1"
+LOGIN_HASH_CONCURRENCY = int(os.environ.get("LOGIN_HASH_CONCURRENCY", str(os.cpu_count() or 2)))
+LOGIN_HASH_WAIT_SECONDS = float(os.environ.get("LOGIN_HASH_WAIT_SECONDS", "2.0"))
+
+# Signup avatars are resized to fit this many pixels per side by a job
+AVATAR_MAX_PIXELS = int(os.environ.get("AVATAR_MAX_PIXELS", "512"))
+
+# Idempotency-Key replays (accounts/idempotency.py) are kept this long
+IDEMPOTENCY_TTL_HOURS = int(os.environ.get("IDEMPOTENCY_TTL_HOURS", "24"))
+
+# Metrics (backend/metrics.py). Set METRICS_DIR to a directory shared by all
+# workers to aggregate across processes; METRICS_TOKEN enables bearer scrapes.
+METRICS_DIR = os.environ.get("METRICS_DIR") or None
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "5"))
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
 
 # Development convenience
 if DEBUG:
@@ -0,0 +1,265 @@
+"""
+Serving the built frontend and the collected static files from Django.
+
+``StaticFilesMiddleware`` serves two trees without a reverse proxy:
+
+* STATIC_ROOT under STATIC_URL (``collectstatic`` output), and
+* FRONTEND_DIST at the site root (``vite build`` output). An HTML navigation
+  to a path Django has no named route for gets ``index.html``, so client-side
+  routes survive a reload.
+
+Compression happens at build time: ``collectstatic`` (through
+CompressedManifestStaticFilesStorage) and ``manage.py compress_assets``
+write ``.gz`` and, when the brotli package is installed, ``.br`` siblings,
+and the middleware picks the smallest variant the client accepts. Files
+with a content hash in their name (the manifest's hashed names, Vite's
+``assets/``) are cached for a year as immutable; other files for
+STATIC_MAX_AGE seconds, and ``index.html`` is always revalidated.
+
+Files are indexed at startup (looked up per request with DEBUG). Under WSGI
+responses are FileResponses, which servers can hand to sendfile; under ASGI
+the file is streamed in chunks read off the event loop.
+"""
+
+import gzip
+import mimetypes
+import os
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.urls import Resolver404, resolve
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE = frozenset({
+    ".css", ".eot", ".html", ".ico", ".js", ".json", ".map", ".mjs",
+    ".otf", ".svg", ".ttf", ".txt", ".wasm", ".webmanifest", ".xml",
+})
+MIN_COMPRESS_SIZE = 256
+# Vite's build.assetsDir; everything in it has a content hash in its name
+FRONTEND_ASSETS_DIR = "assets/"
+IMMUTABLE = "public, max-age=31536000, immutable"
+CHUNK_SIZE = FileResponse.block_size
+
+
+def _compressors():
+    if brotli is not None:
+        yield ".br", lambda data: brotli.compress(data, quality=11)
+    yield ".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compress_file(path):
+    """Write ``path.br`` / ``path.gz`` when they save space; returns the suffixes written."""
+    written = []
+    modified = os.path.getmtime(path)
+    data = None
+    for suffix, compress in _compressors():
+        target = path + suffix
+        if os.path.exists(target) and os.path.getmtime(target) >= modified:
+            continue
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        packed = compress(data)
+        if len(packed) > len(data) * 0.95:
+            if os.path.exists(target):
+                os.remove(target)
+            continue
+        with open(target + ".tmp", "wb") as f:
+            f.write(packed)
+        os.replace(target + ".tmp", target)
+        written.append(suffix)
+    return written
+
+
+def compress_tree(root):
+    """Compress every compressible file under ``root``; returns (files, variants written)."""
+    files = variants = 0
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE or os.path.getsize(path) < MIN_COMPRESS_SIZE:
+                continue
+            files += 1
+            variants += len(compress_file(path))
+    return files, variants
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that also writes compressed variants on collectstatic."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if not dry_run:
+            compress_tree(self.location)
+
+
+class StaticFile:
+    __slots__ = ("path", "name", "content_type", "immutable", "variants")
+
+    def __init__(self, path, immutable):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.immutable = immutable
+        content_type, _ = mimetypes.guess_type(path)
+        content_type = content_type or "application/octet-stream"
+        if content_type.startswith("text/") or content_type in ("application/javascript", "application/json"):
+            content_type += "; charset=utf-8"
+        self.content_type = content_type
+        self.variants = [
+            (encoding, path + suffix)
+            for encoding, suffix in (("br", ".br"), ("gzip", ".gz"))
+            if os.path.isfile(path + suffix)
+        ]
+
+    def select(self, accepted):
+        """(Content-Encoding or None, path) of the best variant the client accepts."""
+        for encoding, path in self.variants:
+            if encoding in accepted or "*" in accepted:
+                return encoding, path
+        return None, self.path
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def backend_route(path):
+    """Whether Django has a named URL for ``path`` (with or without the appended slash)."""
+    candidates = [path] if path.endswith("/") else [path, path + "/"]
+    for candidate in candidates:
+        try:
+            if resolve(candidate).url_name is not None:
+                return True
+        except Resolver404:
+            pass
+    return False
+
+
+async def read_chunks(path):
+    with open(path, "rb") as f:
+        while chunk := await sync_to_async(f.read, thread_sensitive=False)(CHUNK_SIZE):
+            yield chunk
+
+
+class StaticFilesMiddleware:
+    """Place right after SecurityMiddleware."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.max_age = settings.STATIC_MAX_AGE
+        hashed = set(getattr(staticfiles_storage, "hashed_files", {}).values())
+        self.roots = []
+        if settings.STATIC_URL.startswith("/") and os.path.isdir(settings.STATIC_ROOT):
+            self.roots.append((settings.STATIC_URL, str(settings.STATIC_ROOT), hashed.__contains__))
+        if os.path.isdir(settings.FRONTEND_DIST):
+            self.roots.append(("/", str(settings.FRONTEND_DIST), lambda name: name.startswith(FRONTEND_ASSETS_DIR)))
+        self.files = None if settings.DEBUG else self.scan()
+        self.index = self.lookup("/index.html") if os.path.isdir(settings.FRONTEND_DIST) else None
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def scan(self):
+        files = {}
+        for prefix, root, immutable in self.roots:
+            for directory, _, names in os.walk(root):
+                for name in names:
+                    path = os.path.join(directory, name)
+                    relative = os.path.relpath(path, root).replace(os.sep, "/")
+                    files.setdefault(prefix + relative, StaticFile(path, immutable(relative)))
+        return files
+
+    def lookup(self, url_path):
+        if self.files is not None:
+            return self.files.get(url_path)
+        for prefix, root, immutable in self.roots:
+            if not url_path.startswith(prefix):
+                continue
+            relative = url_path[len(prefix):]
+            try:
+                path = safe_join(root, relative)
+            except SuspiciousFileOperation:
+                continue
+            if os.path.isfile(path):
+                return StaticFile(path, immutable(relative))
+        return None
+
+    def match(self, request):
+        """The StaticFile to answer ``request`` with, or None to let Django handle it."""
+        if request.method not in ("GET", "HEAD"):
+            return None
+        path = request.path_info
+        if path != "/":
+            found = self.lookup(path)
+            if found is not None:
+                return found
+        if self.index is None or "text/html" not in request.headers.get("Accept", ""):
+            return None
+        if path == "/" or (not backend_route(path) and "." not in path.rsplit("/", 1)[-1]):
+            return self.index
+        return None
+
+    def respond(self, request, found, streaming):
+        encoding, path = found.select(accepted_encodings(request.headers.get("Accept-Encoding", "")))
+        stat = os.stat(path)
+        etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}{"-" + encoding if encoding else ""}"'
+        response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+        if response is None:
+            if request.method == "HEAD":
+                response = HttpResponse(content_type=found.content_type)
+            elif streaming:
+                response = StreamingHttpResponse(read_chunks(path), content_type=found.content_type)
+            else:
+                response = FileResponse(open(path, "rb"), content_type=found.content_type, filename=found.name)
+            response["Content-Length"] = str(stat.st_size)
+            if encoding:
+                response["Content-Encoding"] = encoding
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(stat.st_mtime)
+        if found is self.index:
+            response["Cache-Control"] = "no-cache"
+        elif found.immutable:
+            response["Cache-Control"] = IMMUTABLE
+        else:
+            response["Cache-Control"] = f"public, max-age={self.max_age}"
+        if found.variants:
+            response["Vary"] = "Accept-Encoding"
+        return response
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        found = self.match(request)
+        if found is not None:
+            return self.respond(request, found, streaming=False)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        found = self.match(request)
+        if found is not None:
+            return self.respond(request, found, streaming=True)
+        return await self.get_response(request)
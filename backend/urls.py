@@ -4,31 +4,34 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.http import JsonResponse
 
-# Prefer importing API views from accounts.views_api (lighter deps, intended for API endpoints).
-# Ensure accounts/views_api.py exists and exports: csrf_view, whoami,
-# AdminUsersListView, AdminUserDeleteView, AdminUserUpdateView, AdminUsersBulkDeleteView, EmployeeDashboardView (optional).
-try:
-    from accounts.views_api import (
-        csrf_view,
-        whoami,
-        AdminUsersListView,
-        AdminUserDeleteView,
-        AdminUserUpdateView,
-        AdminUsersBulkDeleteView,
-        EmployeeDashboardView,
-        EmployeeSelfProfileView,
-    )
-except Exception:
-    # Fallback to importing from accounts.views if you placed views there.
-    from accounts.views import (
-        csrf_view,
-        whoami,
-        AdminUsersListView,
-        AdminUserDeleteView,
-        AdminUserUpdateView,
-        AdminUsersBulkDeleteView,
-        EmployeeDashboardView,
-    )  # noqa: E402
+from backend.metrics import metrics_view
+
+from accounts.views_api import (
+    csrf_view,
+    whoami,
+    bootstrap,
+    AdminUsersListView,
+    AdminUserChangesView,
+    OrgChartView,
+    AttendanceClockView,
+    AttendanceDailyView,
+    CelebrationsView,
+    WorkforceAnalyticsView,
+    AdminDashboardView,
+    JobDownloadView,
+    JobStatusView,
+    AdminUsersExportView,
+    AdminUserArchiveView,
+    ArchivedEmployeesView,
+    ArchivedEmployeeDetailView,
+    ArchivedEmployeeRestoreView,
+    AdminUserDeleteView,
+    directory_events,
+    AdminUserUpdateView,
+    AdminUsersBulkDeleteView,
+    EmployeeDashboardView,
+    EmployeeSelfProfileView,
+)
 
 def health_check(request):
     return JsonResponse({"status": "ok"})
@@ -36,6 +39,7 @@ def health_check(request):
 urlpatterns = [
     path("", health_check, name="health"),
     path("admin/", admin.site.urls),
+    path("metrics/", metrics_view, name="metrics"),
 
     # Auth endpoints (register/login etc.)
     path("api/auth/", include("accounts.urls", namespace="accounts")),
@@ -43,12 +47,46 @@ urlpatterns = [
     # Small API helpers used by the frontend
     path("api/auth/csrf/", csrf_view, name="csrf"),
     path("api/auth/whoami/", whoami, name="whoami"),
+    path("api/bootstrap/", bootstrap, name="api_bootstrap"),
 
     # Admin user management endpoints
     path("api/admin/users/", AdminUsersListView.as_view(), name="api_admin_users"),
+    path("api/admin/users/changes/", AdminUserChangesView.as_view(), name="api_admin_user_changes"),
+    path("api/admin/events/", directory_events, name="api_admin_events"),
     path("api/admin/users/<int:pk>/", AdminUserUpdateView, name="api_admin_user_update"),  # function-based
     path("api/admin/users/<int:pk>/delete/", AdminUserDeleteView.as_view(), name="api_admin_user_delete"),
     path("api/admin/users/bulk-delete/", AdminUsersBulkDeleteView, name="api_admin_users_bulk_delete"),  # function-based
+    path("api/admin/users/export/", AdminUsersExportView.as_view(), name="api_admin_users_export"),
+    path("api/admin/users/<int:pk>/archive/", AdminUserArchiveView.as_view(), name="api_admin_user_archive"),
+
+    # Former employees
+    path("api/admin/archive/", ArchivedEmployeesView.as_view(), name="api_archived_employees"),
+    path("api/admin/archive/<int:pk>/", ArchivedEmployeeDetailView.as_view(), name="api_archived_employee"),
+    path(
+        "api/admin/archive/<int:pk>/restore/",
+        ArchivedEmployeeRestoreView.as_view(),
+        name="api_archived_employee_restore",
+    ),
+
+    # Background job status
+    path("api/jobs/<int:pk>/", JobStatusView.as_view(), name="api_job_status"),
+    path("api/jobs/<int:pk>/download/", JobDownloadView.as_view(), name="api_job_download"),
+
+    # Reporting hierarchy
+    path("api/org-chart/", OrgChartView.as_view(), name="api_org_chart"),
+
+    # Time and attendance
+    path("api/attendance/clock/", AttendanceClockView.as_view(), name="api_attendance_clock"),
+    path("api/attendance/daily/", AttendanceDailyView.as_view(), name="api_attendance_daily"),
+
+    # Birthdays and work anniversaries
+    path("api/celebrations/", CelebrationsView.as_view(), name="api_celebrations"),
+
+    # Workforce analytics from the columnar snapshot
+    path("api/admin/analytics/workforce/", WorkforceAnalyticsView.as_view(), name="api_workforce_analytics"),
+
+    # Admin dashboard figures from the incrementally maintained counters
+    path("api/admin/dashboard/", AdminDashboardView.as_view(), name="api_admin_dashboard"),
 
     # Employee self-service profile management
     path("api/employee/profile/", EmployeeSelfProfileView.as_view(), name="api_employee_profile"),
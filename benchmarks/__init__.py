@@ -0,0 +1,7 @@
+"""
+In-process benchmarks for the HR backend.
+
+Each module can be run directly, e.g. ``python -m benchmarks.profile_patch``.
+They build a throwaway test database from the configured settings, so they
+never touch real data.
+"""
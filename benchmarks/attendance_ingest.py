@@ -0,0 +1,111 @@
+"""
+Attendance ingest throughput: badge batches accepted per second by the API
+and events per second written by the bulk flush (including the daily
+summary refresh).
+
+Usage: python -m benchmarks.attendance_ingest [--users N] [--events N] [--batch N] [--out FILE]
+The flush runs inline here (the background interval is pushed out) so the
+two stages are measured separately; on PostgreSQL the flush uses COPY.
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from datetime import timedelta
+
+from benchmarks.harness import emit, setup_django, test_database
+
+TOKEN = "bench-device-token"
+
+
+def shift_change_events(user_ids, count, start, rng):
+    """Clock-ins then clock-outs around two shift changes, like a busy gate."""
+    events = []
+    for i in range(count):
+        user_id = user_ids[i % len(user_ids)]
+        lap = i // len(user_ids)
+        direction = "in" if lap % 2 == 0 else "out"
+        at = start + timedelta(hours=9 * lap, seconds=rng.randint(0, 900))
+        events.append({"user": user_id, "at": at.isoformat(), "direction": direction, "device": f"gate-{i % 8}"})
+    return events
+
+
+def run(users=5000, events=50000, batch=500):
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.urls import reverse
+    from django.utils import timezone
+
+    from accounts import attendance
+    from accounts.models import ClockEvent, DailyAttendance
+
+    User = get_user_model()
+    call_command("generate_workforce", users=users, avatars=0, span=0, verbosity=0, stdout=open(os.devnull, "w"))
+    user_ids = list(User.objects.values_list("pk", flat=True))
+    rng = random.Random(7)
+    start = timezone.now().replace(hour=6, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    payload = shift_change_events(user_ids, events, start, rng)
+    bodies = [json.dumps({"events": payload[i:i + batch]}) for i in range(0, len(payload), batch)]
+
+    client = Client(HTTP_AUTHORIZATION=f"Bearer {TOKEN}")
+    with override_settings(
+        ATTENDANCE_DEVICE_TOKENS=[TOKEN],
+        ATTENDANCE_FLUSH_INTERVAL=3600,
+        ATTENDANCE_FLUSH_SIZE=10 ** 9,
+        ATTENDANCE_MAX_BUFFER=10 ** 9,
+    ):
+        began = time.perf_counter()
+        for body in bodies:
+            response = client.post(reverse("api_attendance_clock"), body, content_type="application/json")
+            assert response.status_code == 202, response.content
+        ingest = time.perf_counter() - began
+
+        pending = attendance.buffer.pending()
+        began = time.perf_counter()
+        written = attendance.buffer.flush()
+        flush = time.perf_counter() - began
+
+        # Re-sending a batch is idempotent
+        client.post(reverse("api_attendance_clock"), bodies[0], content_type="application/json")
+        attendance.buffer.flush()
+
+    return {
+        "benchmark": "attendance_ingest",
+        "database": connection.vendor,
+        "users": len(user_ids),
+        "requests": len(bodies),
+        "batch": batch,
+        "buffered": pending,
+        "stored": ClockEvent.objects.count(),
+        "daily_rows": DailyAttendance.objects.count(),
+        "ingest": {
+            "seconds": round(ingest, 3),
+            "events_per_second": round(events / ingest),
+            "requests_per_second": round(len(bodies) / ingest, 1),
+        },
+        "flush": {
+            "seconds": round(flush, 3),
+            "events_per_second": round(written / flush) if flush else None,
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--out")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        emit(run(args.users, args.events, args.batch), args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Upcoming birthdays and anniversaries over a generated workforce.
+
+Usage: python -m benchmarks.celebrations [--users N] [--days N] [--repeat N] [--out FILE]
+Times /api/celebrations/ for a window starting today and one that crosses
+New Year, and records the database's plan for the birthday range query so
+a regression to a full scan shows up.
+"""
+
+import argparse
+import os
+from datetime import date
+
+from benchmarks.harness import emit, setup_django, summarize, test_database, timed
+
+
+def query_plan(qs):
+    from django.db import connection
+
+    sql, params = qs.query.sql_with_params()
+    prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        return [" ".join(str(part) for part in row) for row in cursor.fetchall()]
+
+
+def run(users=100000, days=7, repeat=20):
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.test import Client
+    from django.urls import reverse
+    from django.utils import timezone
+
+    from accounts.celebrations import mmdd_ranges
+    from accounts.models import EmployeeProfile
+    from backend.instrumentation import RequestMetrics, record_queries
+
+    User = get_user_model()
+    call_command("generate_workforce", users=users, avatars=0, span=0, verbosity=0, stdout=open(os.devnull, "w"))
+    admin = User.objects.create_user("bench-admin", "bench-admin@example.com", "pw", role="Admin")
+    client = Client()
+    client.force_login(admin)
+
+    today = timezone.localdate()
+    results = {}
+    for name, start in (("from_today", today), ("new_year", date(today.year, 12, 28))):
+        params = {"from": start.isoformat(), "days": days}
+
+        def fetch():
+            response = client.get(reverse("api_celebrations"), params)
+            assert response.status_code == 200, response.status_code
+            return response.json()
+
+        metrics = RequestMetrics()
+        with record_queries(metrics):
+            data = fetch()
+        samples = timed(lambda i: fetch(), repeat)
+        results[name] = {
+            "queries": metrics.queries,
+            "birthdays": len(data["birthdays"]),
+            "anniversaries": len(data["anniversaries"]),
+            **summarize(samples),
+        }
+
+    _, low, high = mmdd_ranges(today, days)[0]
+    return {
+        "benchmark": "celebrations",
+        "profiles": EmployeeProfile.objects.count(),
+        "days": days,
+        "results": results,
+        "birthday_plan": query_plan(EmployeeProfile.objects.filter(birth_mmdd__range=(low, high))),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        emit(run(args.users, args.days, args.repeat), args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Per-request cost of metrics recording and the cost of a scrape.
+
+Usage: python -m benchmarks.metrics_overhead [--iterations N] [--out FILE]
+"""
+
+import argparse
+import time
+
+from benchmarks.harness import emit, setup_django
+
+ROUTES = ("whoami", "api_admin_users", "api_admin_user_update", "api_employee_profile")
+
+
+def run(iterations=100000):
+    from backend import metrics
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        metrics.observe_request(ROUTES[i % len(ROUTES)], "GET", 200, 0.012, 3, 0.002)
+    per_request = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    text = metrics.render()
+    render_time = time.perf_counter() - start
+
+    return {
+        "benchmark": "metrics_overhead",
+        "iterations": iterations,
+        "observe_request_us": round(per_request * 1e6, 3),
+        "render_ms": round(render_time * 1000, 3),
+        "exposition_bytes": len(text),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument("--out")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    emit(run(args.iterations), args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Reporting-hierarchy queries over a generated organisation.
+
+Usage: python -m benchmarks.org_chart [--users N] [--span N] [--repeat N] [--out FILE]
+Times the org-chart endpoint for the whole tree, the subtree, ancestor-chain
+and span-of-control queries (one query each) and moving a large subtree.
+"""
+
+import argparse
+import os
+
+from benchmarks.harness import emit, setup_django, summarize, test_database, timed
+
+
+def run(users=10000, span=8, repeat=5):
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import transaction
+    from django.test import Client
+    from django.urls import reverse
+
+    from accounts.models import EmployeeProfile
+    from backend.instrumentation import RequestMetrics, record_queries
+
+    User = get_user_model()
+    call_command("generate_workforce", users=users, span=span, avatars=0, verbosity=0, stdout=open(os.devnull, "w"))
+    admin = User.objects.create_user("bench-admin", "bench-admin@example.com", "pw", role="Admin")
+    client = Client()
+    client.force_login(admin)
+
+    profiles = EmployeeProfile.objects.filter(user__username__startswith="synthetic").order_by("pk")
+    root = profiles.filter(manager__isnull=True).first()
+    deepest = profiles.order_by("-org_depth", "pk").first()
+    middle, sibling = profiles.filter(org_depth=1)[:2]
+
+    def org_chart():
+        response = client.get(reverse("api_org_chart"), {"root": root.user_id})
+        assert response.status_code == 200, response.status_code
+        return len(response.json()["nodes"])
+
+    def move_subtree():
+        # Move a first-level manager's subtree under a sibling and back.
+        with transaction.atomic():
+            middle.set_manager(sibling.user_id)
+            middle.set_manager(root.user_id)
+            transaction.set_rollback(True)
+
+    results = {}
+    for name, fn in (
+        ("org_chart_endpoint", org_chart),
+        ("subtree", lambda: len(list(root.subtree().values_list("user_id", flat=True)))),
+        ("ancestor_chain", lambda: len(list(deepest.ancestors().values_list("user_id", flat=True)))),
+        ("span_of_control", lambda: root.subtree(include_self=False).count()),
+        ("move_subtree", move_subtree),
+    ):
+        metrics = RequestMetrics()
+        with record_queries(metrics):
+            fn()
+        samples = timed(lambda i: fn(), repeat)
+        results[name] = {"queries": metrics.queries, **summarize(samples)}
+
+    return {
+        "benchmark": "org_chart",
+        "profiles": profiles.count(),
+        "max_depth": deepest.org_depth,
+        "moved_subtree": middle.subtree().count(),
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--span", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        emit(run(args.users, args.span, args.repeat), args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Query count and latency of a typical single-field admin PATCH.
+
+Usage: python -m benchmarks.profile_patch [--iterations N] [--out FILE]
+"""
+
+import argparse
+import json
+
+from benchmarks.harness import count_queries, emit, setup_django, summarize, test_database, timed
+
+
+def run(iterations=200):
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+
+    from accounts.models import Department, EmployeeProfile
+
+    User = get_user_model()
+    admin = User.objects.create_user("bench-admin", "admin@bench.local", "x", role="Admin", is_staff=True)
+    employee = User.objects.create_user("bench-employee", "employee@bench.local", "x", role="Employee")
+    department = Department.objects.create(name="Engineering")
+    EmployeeProfile.objects.filter(user=employee).update(department=department, position="Engineer")
+
+    client = Client()
+    client.force_login(admin)
+    url = f"/api/admin/users/{employee.pk}/"
+
+    def patch(body):
+        response = client.patch(url, data=json.dumps(body), content_type="application/json")
+        assert response.status_code == 200, response.content
+        return response
+
+    def patch_phone(i):
+        patch({"phone": f"+2547000{i:05d}"})
+
+    patch_phone(-1)  # warm up URL resolution, serializers and the session
+
+    with count_queries() as changed:
+        patch({"phone": "+254700099999"})
+    with count_queries() as unchanged:
+        patch({"phone": "+254700099999"})
+
+    return {
+        "benchmark": "profile_patch",
+        "queries": {
+            "single_field_change": len(changed),
+            "no_op": len(unchanged),
+        },
+        "sql": {
+            "single_field_change": [q["sql"] for q in changed.captured_queries],
+        },
+        "latency": summarize(timed(patch_phone, iterations)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--out")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        emit(run(args.iterations), args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Check every endpoint listed in settings.QUERY_BUDGETS against its budget.
+
+Usage: python -m benchmarks.query_budgets [--out FILE]
+Exits with status 1 when any endpoint runs more queries than allowed.
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks.harness import count_queries, emit, setup_django, test_database
+
+
+def seed(employees=5):
+    from django.contrib.auth import get_user_model
+
+    from accounts import dashboard
+    from accounts.models import Department, EmployeeProfile
+
+    User = get_user_model()
+    admin = User.objects.create_user("budget-admin", "admin@budget.local", "x", role="Admin", is_staff=True)
+    departments = [Department.objects.create(name=f"Department {i}") for i in range(3)]
+    staff = []
+    for i in range(employees):
+        user = User.objects.create_user(f"budget-{i}", f"e{i}@budget.local", "x", role="Employee")
+        EmployeeProfile.objects.filter(user=user).update(department=departments[i % 3], position="Analyst")
+        staff.append(user)
+    # The department/position updates above bypass the counter signals
+    dashboard.reconcile()
+    return admin, staff
+
+
+def run():
+    from django.conf import settings
+    from django.test import Client
+    from django.urls import reverse
+
+    admin, staff = seed()
+    client = Client()
+    client.force_login(admin)
+    employee_client = Client()
+    employee_client.force_login(staff[0])
+
+    def patch(c, url, body):
+        return c.patch(url, data=json.dumps(body), content_type="application/json")
+
+    calls = [
+        ("whoami", lambda: client.get(reverse("whoami"))),
+        ("api_bootstrap", lambda: client.get(reverse("api_bootstrap"))),
+        ("api_bootstrap", lambda: employee_client.get(reverse("api_bootstrap"))),
+        ("api_admin_users", lambda: client.get(reverse("api_admin_users"))),
+        ("api_admin_user_update", lambda: patch(
+            client, reverse("api_admin_user_update", args=[staff[1].pk]), {"position": "Lead"})),
+        ("api_employee_profile", lambda: employee_client.get(reverse("api_employee_profile"))),
+        ("api_employee_profile", lambda: patch(
+            employee_client, reverse("api_employee_profile"), {"phone": "+254700000000"})),
+        ("api_dashboard_employee", lambda: employee_client.get(reverse("api_dashboard_employee"))),
+        ("api_admin_dashboard", lambda: client.get(reverse("api_admin_dashboard"))),
+        ("api_admin_user_delete", lambda: client.delete(reverse("api_admin_user_delete", args=[staff[2].pk]))),
+        ("api_admin_users_bulk_delete", lambda: client.post(
+            reverse("api_admin_users_bulk_delete"),
+            data=json.dumps({"ids": [staff[3].pk, staff[4].pk]}),
+            content_type="application/json",
+        )),
+    ]
+
+    results = []
+    for name, call in calls:
+        with count_queries() as ctx:
+            response = call()
+        budget = settings.QUERY_BUDGETS.get(name)
+        results.append({
+            "endpoint": name,
+            "status": response.status_code,
+            "queries": len(ctx),
+            "budget": budget,
+            "ok": budget is None or len(ctx) <= budget,
+        })
+    return {"benchmark": "query_budgets", "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        result = run()
+    emit(result, args.out)
+    if not all(r["ok"] for r in result["results"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
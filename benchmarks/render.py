@@ -0,0 +1,92 @@
+"""
+Render time and response size of the admin user list at 10k rows.
+
+Usage: python -m benchmarks.render [--users N] [--repeat N] [--out FILE]
+Compares DRF's JSONRenderer with FastJSONRenderer and reports raw and
+gzipped sizes; ``identical_output`` confirms both renderers agree byte for byte
+and ``same_non_finite_handling`` that both reject NaN and infinity.
+"""
+
+import argparse
+import gzip
+import os
+import time
+
+from benchmarks.harness import emit, setup_django, test_database
+
+
+def best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def outcome(render, data):
+    try:
+        return render(data)
+    except ValueError as exc:
+        return f"ValueError: {exc}"
+
+
+def same_non_finite_handling(stock, fast):
+    samples = [{"value": float("nan")}, [1, {"nested": float("inf")}], {"value": -float("inf")}]
+    return all(outcome(stock.render, sample) == outcome(fast.render, sample) for sample in samples)
+
+
+def run(users=10000, repeat=5):
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.test import RequestFactory
+    from rest_framework.renderers import JSONRenderer
+
+    from accounts.serializers import UserSerializer
+    from backend.renderers import FastJSONRenderer, orjson
+
+    User = get_user_model()
+    call_command("generate_workforce", users=users, verbosity=0, stdout=open(os.devnull, "w"))
+
+    request = RequestFactory().get("/api/admin/users/")
+    qs = User.objects.select_related("profile", "profile__department").order_by("-date_joined")
+    data = UserSerializer(qs, many=True, context={"request": request}).data
+
+    stock_time, stock = best_of(lambda: JSONRenderer().render(data), repeat)
+    fast_time, fast = best_of(lambda: FastJSONRenderer().render(data), repeat)
+    gzip_time, compressed = best_of(lambda: gzip.compress(fast, compresslevel=6), repeat)
+
+    return {
+        "benchmark": "render",
+        "rows": len(data),
+        "orjson": orjson is not None,
+        "identical_output": stock == fast,
+        "same_non_finite_handling": same_non_finite_handling(JSONRenderer(), FastJSONRenderer()),
+        "render_ms": {
+            "json_renderer": round(stock_time * 1000, 2),
+            "fast_json_renderer": round(fast_time * 1000, 2),
+            "gzip": round(gzip_time * 1000, 2),
+        },
+        "bytes": {
+            "raw": len(fast),
+            "gzip": len(compressed),
+            "ratio": round(len(compressed) / len(fast), 3),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        emit(run(args.users, args.repeat), args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Signup throughput: accounts created per second through /api/auth/register/.
+
+Usage: python -m benchmarks.signup [--signups N] [--fast-hash] [--out FILE]
+Measures plain signups, signups with an avatar upload (processing is
+queued, so only the stash and the job insert are timed) and Idempotency-Key
+replays. The configured password hasher dominates a real signup;
+--fast-hash swaps in MD5 to isolate the request and database path.
+"""
+
+import argparse
+import io
+import time
+
+from benchmarks.harness import emit, setup_django, test_database
+
+
+def avatar_bytes():
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (1600, 1200), (52, 152, 219)).save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def run(signups=200, fast_hash=False):
+    from django.core.files.storage import default_storage
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    from accounts.models import Job
+    from backend.instrumentation import RequestMetrics, record_queries
+
+    client = Client()
+    url = reverse("accounts:register")
+    image = avatar_bytes()
+
+    def form(name, with_avatar=False):
+        data = {
+            "username": name,
+            "email": f"{name}@example.com",
+            "password": "Bench-pass-123",
+            "confirm_password": "Bench-pass-123",
+            "role": "Employee",
+        }
+        if with_avatar:
+            data["avatar"] = SimpleUploadedFile("avatar.jpg", image, content_type="image/jpeg")
+        return data
+
+    def scenario(prefix, with_avatar=False, key=None):
+        headers = {"HTTP_IDEMPOTENCY_KEY": key} if key else {}
+        metrics = RequestMetrics()
+        with record_queries(metrics):
+            response = client.post(url, form(f"{prefix}first", with_avatar), **headers)
+        assert response.status_code == 201, response.content
+        began = time.perf_counter()
+        for i in range(signups):
+            name = f"{prefix}first" if key else f"{prefix}{i:06d}"
+            response = client.post(url, form(name, with_avatar), **headers)
+            assert response.status_code == 201, response.content
+        elapsed = time.perf_counter() - began
+        return {
+            "queries_per_signup": metrics.queries,
+            "seconds": round(elapsed, 3),
+            "signups_per_second": round(signups / elapsed, 1),
+        }
+
+    overrides = {"PASSWORD_HASHERS": ["django.contrib.auth.hashers.MD5PasswordHasher"]} if fast_hash else {}
+    with override_settings(**overrides):
+        results = {
+            "plain": scenario("plain"),
+            "with_avatar": scenario("avatar", with_avatar=True),
+            "idempotent_replay": scenario("replay", key="bench-key"),
+        }
+
+    # Drop the stashed uploads; the queued processing jobs are not run here
+    for path in Job.objects.filter(kind="users.process_avatar").values_list("args__path", flat=True):
+        default_storage.delete(path)
+
+    return {
+        "benchmark": "signup",
+        "signups": signups,
+        "hasher": "md5" if fast_hash else "configured",
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--signups", type=int, default=200)
+    parser.add_argument("--fast-hash", action="store_true")
+    parser.add_argument("--out")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        emit(run(args.signups, args.fast_hash), args.out)
+
+
+if __name__ == "__main__":
+    main()
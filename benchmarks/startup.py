@@ -0,0 +1,126 @@
+"""
+Cold-start time and import profile of the web and command entry points.
+
+Usage: python -m benchmarks.startup [--repeat N] [--top N] [--out FILE]
+Starts fresh interpreters (bytecode and OS caches stay warm) for:
+
+* web: what a gunicorn master does before it forks, i.e. load
+  backend.asgi:application and the URLconf;
+* command: ``manage.py run_jobs --once`` against an empty queue, i.e. a job
+  worker or cron command up to its first poll.
+
+Each entry point is checked against BUDGETS: a median wall-clock time and
+modules it must not import (they are loaded on first use instead). Exits
+with status 1 when a budget is exceeded. The command entry point runs on a
+throwaway SQLite database so no server is needed.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.harness import BASE_DIR, emit, summarize
+
+WEB = (
+    "from backend.asgi import application\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+ENTRY_POINTS = {
+    "web": ["-c", WEB],
+    "command": ["manage.py", "run_jobs", "--once"],
+}
+
+BUDGETS = {
+    "web": {"median_ms": 1500, "forbidden": ["PIL", "numpy"]},
+    "command": {
+        "median_ms": 1000,
+        "forbidden": ["PIL", "numpy", "rest_framework.serializers", "accounts.serializers", "accounts.views_api"],
+    },
+}
+
+
+def start(args, env, importtime=False):
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + args
+    began = time.perf_counter()
+    completed = subprocess.run(command, cwd=BASE_DIR, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - began
+    if completed.returncode:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{completed.stderr[-2000:]}")
+    return elapsed, completed.stderr
+
+
+def import_profile(stderr, top):
+    """Parse ``-X importtime`` output into totals and the slowest modules."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+
+    def ranked(rows, key):
+        return [
+            {"module": name, "self_ms": round(own / 1000, 1), "cumulative_ms": round(total / 1000, 1)}
+            for name, own, total, _ in sorted(rows, key=key, reverse=True)[:top]
+        ]
+
+    return {
+        "modules": len(modules),
+        "import_ms": round(sum(m[1] for m in modules) / 1000, 1),
+        "slowest_self": ranked(modules, key=lambda m: m[1]),
+        # Top-level imports: what the entry point itself pulled in
+        "slowest_roots": ranked([m for m in modules if m[3] == 0], key=lambda m: m[2]),
+        "names": {m[0] for m in modules},
+    }
+
+
+def run(repeat=5, top=15):
+    with tempfile.TemporaryDirectory() as scratch:
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE="backend.settings",
+            DB_ENGINE="sqlite",
+            SQLITE_PATH=os.path.join(scratch, "startup.sqlite3"),
+            METRICS_DIR="",
+        )
+        start(["manage.py", "migrate", "--verbosity", "0"], env)
+
+        results = {}
+        for name, args in ENTRY_POINTS.items():
+            samples = [start(args, env)[0] for _ in range(repeat)]
+            profile = import_profile(start(args, env, importtime=True)[1], top)
+            names = profile.pop("names")
+            budget = BUDGETS[name]
+            timing = summarize(samples)
+            loaded = sorted(m for m in budget["forbidden"] if m in names)
+            results[name] = {
+                "wall": timing,
+                **profile,
+                "budget_ms": budget["median_ms"],
+                "forbidden_loaded": loaded,
+                "ok": timing["p50_ms"] <= budget["median_ms"] and not loaded,
+            }
+    return {"benchmark": "startup", "repeat": repeat, "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--out")
+    args = parser.parse_args(argv)
+
+    result = run(args.repeat, args.top)
+    emit(result, args.out)
+    if not all(r["ok"] for r in result["results"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+End-to-end benchmark suite over a synthetic workforce.
+
+Usage:
+    DB_ENGINE=sqlite python -m benchmarks [--users N] [--iterations N]
+        [--out FILE] [--compare PREVIOUS.json]
+
+Runs in-process against a throwaway test database (SQLite or Postgres,
+whatever the settings select) and writes JSON results to
+benchmarks/results/ by default so runs can be compared over time.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.harness import BASE_DIR, count_queries, emit, setup_django, summarize, test_database
+
+RESULTS_DIR = BASE_DIR / "benchmarks" / "results"
+
+
+def scenario(client_call, iterations):
+    """Run ``client_call(i)`` repeatedly; report latency, throughput and queries."""
+    with count_queries() as ctx:
+        client_call(0)
+    queries = len(ctx)
+
+    samples = []
+    started = time.perf_counter()
+    for i in range(1, iterations + 1):
+        t0 = time.perf_counter()
+        response = client_call(i)
+        samples.append(time.perf_counter() - t0)
+        assert response.status_code < 400, (response.status_code, response.content[:200])
+    elapsed = time.perf_counter() - started
+    return {
+        "queries_per_request": queries,
+        "throughput_rps": round(iterations / elapsed, 1) if elapsed else None,
+        "latency": summarize(samples),
+    }
+
+
+def run(users=1000, iterations=100, password="password"):
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+
+    User = get_user_model()
+
+    started = time.perf_counter()
+    call_command("generate_workforce", users=users, password=password, verbosity=0, stdout=open(os.devnull, "w"))
+    generate_seconds = time.perf_counter() - started
+
+    admin = User.objects.filter(role=User.Roles.ADMIN).order_by("pk").first()
+    employees = list(
+        User.objects.filter(role=User.Roles.EMPLOYEE).order_by("pk").values_list("pk", "username")[: iterations + 1]
+    )
+    admin_client = Client()
+    admin_client.force_login(admin)
+
+    def login(i):
+        # A client address per login keeps the run under the per-IP login throttle
+        return Client(REMOTE_ADDR=f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}").post(
+            reverse("accounts:login"),
+            data=json.dumps({"username": employees[i % len(employees)][1], "password": password}),
+            content_type="application/json",
+        )
+
+    def whoami(i):
+        return admin_client.get(reverse("whoami"))
+
+    def admin_list(i):
+        return admin_client.get(reverse("api_admin_users"))
+
+    def profile_patch(i):
+        pk = employees[i % len(employees)][0]
+        return admin_client.patch(
+            reverse("api_admin_user_update", args=[pk]),
+            data=json.dumps({"phone": f"+2547{i:08d}"}),
+            content_type="application/json",
+        )
+
+    deletable = list(
+        User.objects.filter(role=User.Roles.CLIENT).order_by("-pk").values_list("pk", flat=True)
+    )
+    batch = max(1, len(deletable) // (iterations + 1))
+
+    def bulk_delete(i):
+        ids = deletable[i * batch:(i + 1) * batch]
+        return admin_client.post(
+            reverse("api_admin_users_bulk_delete"),
+            data=json.dumps({"ids": ids}),
+            content_type="application/json",
+        )
+
+    list_iterations = max(1, min(iterations, 20000 // max(users, 1)))
+    return {
+        "benchmark": "suite",
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "users": users,
+            "iterations": iterations,
+        },
+        "generate_workforce": {
+            "seconds": round(generate_seconds, 3),
+            "users_per_second": round(users / generate_seconds, 1) if generate_seconds else None,
+        },
+        "scenarios": {
+            "login": scenario(login, min(iterations, 20)),
+            "whoami": scenario(whoami, iterations),
+            "admin_list": scenario(admin_list, list_iterations),
+            "profile_patch": scenario(profile_patch, iterations),
+            "bulk_delete": dict(scenario(bulk_delete, iterations), ids_per_request=batch),
+        },
+    }
+
+
+def compare(current, previous):
+    """Relative change of mean latency and query counts per scenario."""
+    rows = {}
+    for name, now in current["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        old_mean = before["latency"].get("mean_ms")
+        new_mean = now["latency"].get("mean_ms")
+        rows[name] = {
+            "mean_ms": [old_mean, new_mean],
+            "mean_change_pct": round((new_mean - old_mean) / old_mean * 100, 1) if old_mean else None,
+            "queries": [before["queries_per_request"], now["queries_per_request"]],
+        }
+    return rows
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end benchmark suite over a synthetic workforce.")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--out", help="Result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier result file to diff against")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        result = run(args.users, args.iterations)
+    if args.compare:
+        result["compare"] = compare(result, json.loads(Path(args.compare).read_text()))
+
+    out = args.out
+    if not out:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        out = RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    emit(result, out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Check that an organization's admin cannot reach another organization's users.
+
+Usage: python -m benchmarks.tenant_isolation [--out FILE]
+Signs in as one organization's admin through each authentication channel
+(session and HTTP Basic), lists and edits users and posts buffered clock
+events, and exits with status 1 when anything from the other organization
+comes back or is written.
+"""
+
+import argparse
+import base64
+import json
+import sys
+
+from benchmarks.harness import emit, setup_django, test_database
+
+PASSWORD = "isolation-password"
+
+
+def seed():
+    from django.contrib.auth import get_user_model
+
+    from accounts import tenancy
+    from accounts.models import Organization
+
+    User = get_user_model()
+    users = {}
+    for slug in ("isolation-a", "isolation-b"):
+        organization = Organization.objects.create(name=slug.replace("-", " ").title(), slug=slug)
+        with tenancy.tenant(organization.pk):
+            admin = User.objects.create_user(
+                f"{slug}-admin", f"admin@{slug}.local", PASSWORD, role="Admin", is_staff=True
+            )
+            employee = User.objects.create_user(f"{slug}-employee", f"employee@{slug}.local", PASSWORD, role="Employee")
+        users[slug] = (admin, employee)
+    return users["isolation-a"], users["isolation-b"]
+
+
+def run():
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    from accounts import attendance
+    from accounts.models import ClockEvent
+
+    (admin, employee), (other_admin, other_employee) = seed()
+    foreign = {other_admin.username, other_employee.username}
+
+    session = Client()
+    session.force_login(admin)
+    credentials = base64.b64encode(f"{admin.username}:{PASSWORD}".encode()).decode()
+    basic = Client(HTTP_AUTHORIZATION=f"Basic {credentials}")
+
+    results = []
+    for hour, (channel, client) in enumerate((("session", session), ("basic", basic)), start=8):
+        response = client.get(reverse("api_admin_users"))
+        listed = {row["username"] for row in response.json()} if response.status_code == 200 else set()
+        results.append({
+            "channel": channel,
+            "check": "list",
+            "status": response.status_code,
+            "leaked": sorted(listed & foreign),
+            "ok": response.status_code == 200 and admin.username in listed and not listed & foreign,
+        })
+
+        response = client.patch(
+            reverse("api_admin_user_update", args=[other_employee.pk]),
+            data=json.dumps({"position": "Leaked"}),
+            content_type="application/json",
+        )
+        results.append({
+            "channel": channel,
+            "check": "update",
+            "status": response.status_code,
+            "ok": response.status_code == 404,
+        })
+
+        # Buffered events are written by the flusher thread, outside the
+        # request's tenant
+        events = [
+            {"user": user.pk, "at": f"2025-01-06T{hour:02}:00:00+00:00", "direction": "in", "device": channel}
+            for user in (other_employee, employee)
+        ]
+        with override_settings(ATTENDANCE_BUFFERED=True):
+            response = client.post(
+                reverse("api_attendance_clock"), data=json.dumps({"events": events}), content_type="application/json"
+            )
+            attendance.buffer.flush()
+        body = response.json()
+        written = set(ClockEvent.objects.filter(device=channel).values_list("user_id", flat=True))
+        results.append({
+            "channel": channel,
+            "check": "clock",
+            "status": response.status_code,
+            "rejected": [error["index"] for error in body.get("rejected", [])],
+            "ok": response.status_code == 202 and body["accepted"] == 1 and written == {employee.pk},
+        })
+    return {"benchmark": "tenant_isolation", "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        result = run()
+    emit(result, args.out)
+    if not all(r["ok"] for r in result["results"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
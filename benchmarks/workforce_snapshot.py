@@ -0,0 +1,107 @@
+"""
+Workforce analytics from the columnar snapshot versus ad-hoc queries.
+
+Usage: python -m benchmarks.workforce_snapshot [--users N] [--repeat N] [--out FILE]
+Builds the snapshot over a generated workforce, then times the dashboard
+aggregation on the memory-mapped arrays against the same figures computed
+with ORM aggregates (plus the date columns pulled for banding), and the
+full /api/admin/analytics/workforce/ request.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.harness import emit, setup_django, summarize, test_database, timed
+
+
+def orm_summary(today):
+    """The dashboard figures the way a view without the snapshot would get them."""
+    from django.db.models import Count
+
+    from accounts.models import EmployeeProfile
+
+    profiles = EmployeeProfile.objects.filter(user__is_active=True)
+    result = {
+        "headcount": profiles.count(),
+        "departments": list(profiles.values("department_id").annotate(n=Count("pk"))),
+        "roles": list(profiles.values("user__role").annotate(n=Count("pk"))),
+        "genders": list(profiles.values("gender").annotate(n=Count("pk"))),
+        "employment_status": list(profiles.values("employment_status").annotate(n=Count("pk"))),
+    }
+    tenure, ages = {}, {}
+    for hired, born in profiles.values_list("hire_date", "date_of_birth").iterator(chunk_size=5000):
+        if hired:
+            years = int((today - hired).days // 365.25)
+            tenure[years] = tenure.get(years, 0) + 1
+        if born:
+            years = int((today - born).days // 365.25) // 10
+            ages[years] = ages.get(years, 0) + 1
+    result.update(tenure=tenure, ages=ages)
+    return result
+
+
+def run(users=100000, repeat=20):
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.test import Client, override_settings
+    from django.urls import reverse
+    from django.utils import timezone
+
+    from accounts import snapshot, tenancy
+    from backend.instrumentation import RequestMetrics, record_queries
+
+    User = get_user_model()
+    call_command("generate_workforce", users=users, avatars=0, span=0, verbosity=0, stdout=open(os.devnull, "w"))
+    admin = User.objects.create_user("bench-admin", "bench-admin@example.com", "pw", role="Admin")
+    today = timezone.localdate()
+
+    # The admin's requests read their organization's snapshot
+    with (
+        tempfile.TemporaryDirectory() as root,
+        override_settings(WORKFORCE_SNAPSHOT_DIR=root),
+        tenancy.tenant(admin.organization_id),
+    ):
+        began = time.perf_counter()
+        built = snapshot.build()
+        build_seconds = time.perf_counter() - began
+        current = snapshot.current()
+
+        client = Client()
+        client.force_login(admin)
+        url = reverse("api_workforce_analytics")
+        metrics = RequestMetrics()
+        with record_queries(metrics):
+            assert client.get(url).status_code == 200
+
+        results = {
+            "snapshot_summary": summarize(timed(lambda i: snapshot.summary(current, today), repeat)),
+            "orm_summary": summarize(timed(lambda i: orm_summary(today), max(1, repeat // 4))),
+            "endpoint": {"queries": metrics.queries, **summarize(timed(lambda i: client.get(url), repeat))},
+        }
+        size = sum(os.path.getsize(os.path.join(current.path, name)) for name in os.listdir(current.path))
+
+    return {
+        "benchmark": "workforce_snapshot",
+        "rows": built["rows"],
+        "build_seconds": round(build_seconds, 3),
+        "snapshot_bytes": size,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    with test_database():
+        emit(run(args.users, args.repeat), args.out)
+
+
+if __name__ == "__main__":
+    main()
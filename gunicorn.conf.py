@@ -0,0 +1,60 @@
+"""
+Production server: ``gunicorn -c gunicorn.conf.py``.
+
+Gunicorn preforks WEB_CONCURRENCY workers from a master that has already
+imported Django, the URLconf and every view (preload_app), so workers share
+that memory copy-on-write and start serving immediately. Workers are
+uvicorn's ASGI worker by default, which keeps the server-sent event streams
+(directory_events) as idle coroutines; for plain WSGI set
+GUNICORN_APP=backend.wsgi:application and GUNICORN_WORKER_CLASS=gthread.
+
+Each worker is recycled after GUNICORN_MAX_REQUESTS (+ jitter) requests to
+bound slow leaks. Restarts:
+
+* ``kill -TERM <master>``: stop accepting, finish in-flight requests for up
+  to GUNICORN_GRACEFUL_TIMEOUT seconds, exit.
+* ``kill -HUP <master>``: replace the workers gracefully. With preload_app
+  new workers fork from the already-loaded master, so HUP does not pick up
+  new code; deploy with ``kill -USR2 <master>`` (start a new master beside
+  the old one) followed by ``kill -QUIT <old master>``.
+"""
+
+import gc
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+wsgi_app = os.environ.get("GUNICORN_APP", "backend.asgi:application")
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "uvicorn_worker.UvicornWorker")
+workers = int(os.environ.get("WEB_CONCURRENCY", str(2 * (os.cpu_count() or 1) + 1)))
+# Only used by the gthread worker class
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+
+preload_app = True
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+forwarded_allow_ips = os.environ.get("GUNICORN_FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+def when_ready(server):
+    """Finish loading in the master so workers fork with everything imported."""
+    from django.db import connections
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+    # Sockets must not be shared across processes
+    connections.close_all()
+    # Objects that exist now are never collected; keeping the collector off
+    # them stops it from touching (and so copying) the shared pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from django.db import connections
+
+    connections.close_all()
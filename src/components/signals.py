@@ -1,8 +0,0 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
-from .models import User, EmployeeProfile
-
-@receiver(post_save, sender=User)
-def create_employee_profile(sender, instance, created, **kwargs):
-    if instance.role in ['Admin', 'Employee']:
-        EmployeeProfile.objects.get_or_create(user=instance)
\ No newline at end of file
@@ -3,6 +3,7 @@ import { useNavigate } from 'react-router-dom';
 import { FaEye, FaEdit, FaTrash, FaSearch, FaPrint } from 'react-icons/fa';
 import Sidebar from '../components/Sidebar';
 import Topbar from '../components/Topbar';
+import { takeBootstrap } from '../utils/bootstrap';
 
 const API_BASE = import.meta.env.VITE_API_BASE_URL || '';
 
@@ -45,6 +46,8 @@ export default function AdminUsers() {
 
   const viewPrintRef = useRef(null);
   const didFetch = useRef(false);
+  const syncCursor = useRef(null);
+  const syncRef = useRef(null);
   const navigate = useNavigate();
   const userName = localStorage.getItem('username') || 'Admin';
   const avatarFromStorage = localStorage.getItem('avatarUrl') || '/default-avatar.png';
@@ -63,6 +66,32 @@ export default function AdminUsers() {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
+  // Live updates: the server pushes compact change events; coalesce bursts
+  // (e.g. a bulk delete) into a single delta sync.
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return undefined;
+    const source = new EventSource(buildUrl('/api/admin/events/'), { withCredentials: true });
+    let timer = null;
+    const schedule = () => {
+      if (timer) return;
+      timer = setTimeout(() => {
+        timer = null;
+        syncRef.current();
+      }, 300);
+    };
+    ['user.created', 'user.updated', 'user.deleted', 'resync'].forEach((type) =>
+      source.addEventListener(type, schedule)
+    );
+    source.addEventListener('department.created', () => fetchDepartments());
+    source.addEventListener('department.updated', () => fetchDepartments());
+    source.addEventListener('department.deleted', () => fetchDepartments());
+    return () => {
+      clearTimeout(timer);
+      source.close();
+    };
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, []);
+
   useEffect(() => {
     const q = query.trim().toLowerCase();
     if (!q) {
@@ -88,7 +117,9 @@ export default function AdminUsers() {
     setLoading(true);
     setErrorMsg('');
     try {
-      const url = buildUrl('/api/admin/users/');
+      // The changes endpoint without a cursor returns the full list plus a
+      // cursor; later refreshes only fetch what changed (see syncUsers).
+      const url = buildUrl('/api/admin/users/changes/');
       const res = await fetch(url, {
         method: 'GET',
         credentials: 'include',
@@ -117,12 +148,13 @@ export default function AdminUsers() {
         data = txt;
       }
 
-      const list = Array.isArray(data) ? data : data?.results ?? [];
+      const list = Array.isArray(data) ? data : data?.users ?? data?.results ?? [];
       if (!Array.isArray(list)) {
         console.warn('Unexpected users response shape — using empty list.', data);
         setUsers([]);
         setFiltered([]);
       } else {
+        syncCursor.current = data?.cursor ?? null;
         setUsers(list);
         setFiltered(list);
       }
@@ -136,15 +168,62 @@ export default function AdminUsers() {
     }
   };
 
+  const syncUsers = async () => {
+    if (syncCursor.current === null) return fetchUsers();
+    try {
+      let more = true;
+      while (more) {
+        const url = buildUrl(`/api/admin/users/changes/?since=${encodeURIComponent(syncCursor.current)}`);
+        // eslint-disable-next-line no-await-in-loop
+        const res = await fetch(url, {
+          method: 'GET',
+          credentials: 'include',
+          headers: { Accept: 'application/json', 'X-Requested-With': 'XMLHttpRequest' },
+        });
+        if (!res.ok) return fetchUsers();
+        // eslint-disable-next-line no-await-in-loop
+        const data = await res.json();
+        if (data.reset) {
+          syncCursor.current = data.cursor;
+          setUsers(data.users);
+          return;
+        }
+        const changed = new Map(data.users.map((u) => [u.id, u]));
+        const removed = new Set(data.deleted);
+        setUsers((prev) => {
+          const kept = prev
+            .filter((u) => !removed.has(u.id))
+            .map((u) => {
+              const next = changed.get(u.id);
+              if (!next) return u;
+              changed.delete(u.id);
+              return next;
+            });
+          return [...changed.values(), ...kept];
+        });
+        syncCursor.current = data.cursor;
+        more = data.has_more;
+      }
+    } catch (err) {
+      console.error('Sync users error', err);
+      setErrorMsg('Network error while refreshing users');
+    }
+  };
+
+  syncRef.current = syncUsers;
+
   const fetchDepartments = async () => {
     try {
-      const res = await fetch(buildUrl('/api/departments/'), {
-        credentials: 'include',
-        headers: { Accept: 'application/json', 'X-Requested-With': 'XMLHttpRequest' },
-      });
-      if (!res.ok) return;
-      const data = await res.json();
-      const list = Array.isArray(data) ? data : data?.results || [];
+      let list = takeBootstrap('departments', { keep: true });
+      if (!list) {
+        const res = await fetch(buildUrl('/api/departments/'), {
+          credentials: 'include',
+          headers: { Accept: 'application/json', 'X-Requested-With': 'XMLHttpRequest' },
+        });
+        if (!res.ok) return;
+        const data = await res.json();
+        list = Array.isArray(data) ? data : data?.results || [];
+      }
       setDepartments(list);
       const map = {};
       list.forEach((d) => {
@@ -274,6 +353,7 @@ export default function AdminUsers() {
           ? user.department
           : user.profile?.department ?? departmentsMap[user.department] ?? '',
       updated_on: new Date().toISOString(),
+      version: user.version ?? user.profile?.version ?? null,
       position: user.position || user.profile?.position || '',
       hire_date: user.hire_date || user.profile?.hire_date || '',
     });
@@ -319,6 +399,7 @@ export default function AdminUsers() {
         hire_date: formattedHire,
         updated_on: editUser.updated_on || new Date().toISOString(),
       };
+      if (editUser.version) body.version = editUser.version;
 
       const res = await fetch(url, {
         method: 'PATCH',
@@ -337,6 +418,15 @@ export default function AdminUsers() {
         setUsers((prev) => prev.map((u) => (u.id === editUser.id ? { ...u, ...updated } : u)));
         setFiltered((prev) => prev.map((u) => (u.id === editUser.id ? { ...u, ...updated } : u)));
         closeEdit();
+      } else if (res.status === 409) {
+        const conflict = await res.json().catch(() => null);
+        const current = conflict?.current;
+        if (current) {
+          setUsers((prev) => prev.map((u) => (u.id === editUser.id ? { ...u, ...current } : u)));
+          setFiltered((prev) => prev.map((u) => (u.id === editUser.id ? { ...u, ...current } : u)));
+          setEditUser((prev) => (prev ? { ...prev, version: current.version } : prev));
+        }
+        alert('This user was changed by someone else. The latest values were loaded; review and save again.');
       } else {
         const text = await res.text();
         console.error('Edit save failed', res.status, text);
@@ -432,7 +522,7 @@ ${content}
                     <FaSearch />
                   </div>
                 </div>
-                <button onClick={fetchUsers} className="px-3 py-2 bg-primary text-white rounded">Refresh</button>
+                <button onClick={syncUsers} className="px-3 py-2 bg-primary text-white rounded">Refresh</button>
                 <button onClick={handleBulkDelete} className="px-3 py-2 bg-red-600 text-white rounded">Delete Selected</button>
               </div>
             </header>
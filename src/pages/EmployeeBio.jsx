@@ -1,6 +1,7 @@
 import { useEffect, useRef, useState } from 'react';
 import Sidebar from '../components/Sidebar';
 import Topbar from '../components/Topbar';
+import { takeBootstrap } from '../utils/bootstrap';
 
 const API_BASE = import.meta.env.VITE_API_BASE_URL || '';
 
@@ -90,21 +91,24 @@ export default function EmployeeBio() {
     setLoading(true);
     setError('');
     try {
-      const res = await fetch(buildUrl('/api/employee/profile/'), {
-        method: 'GET',
-        credentials: 'include',
-        headers: {
-          Accept: 'application/json',
-          'X-Requested-With': 'XMLHttpRequest',
-        },
-      });
+      let data = takeBootstrap('profile');
+      if (!data) {
+        const res = await fetch(buildUrl('/api/employee/profile/'), {
+          method: 'GET',
+          credentials: 'include',
+          headers: {
+            Accept: 'application/json',
+            'X-Requested-With': 'XMLHttpRequest',
+          },
+        });
+
+        if (!res.ok) {
+          const text = await res.text();
+          throw new Error(text || `Failed to load profile (${res.status})`);
+        }
 
-      if (!res.ok) {
-        const text = await res.text();
-        throw new Error(text || `Failed to load profile (${res.status})`);
+        data = await res.json();
       }
-
-      const data = await res.json();
       setForm({
         first_name: data.first_name || '',
         last_name: data.last_name || '',
@@ -146,6 +150,11 @@ export default function EmployeeBio() {
   };
 
   const fetchDepartments = async () => {
+    const cached = takeBootstrap('departments', { keep: true });
+    if (cached) {
+      setDepartments(cached);
+      return;
+    }
     try {
       const res = await fetch(buildUrl('/api/departments/'), {
         method: 'GET',
@@ -3,6 +3,7 @@ import Sidebar from '../components/Sidebar';
 import Topbar from '../components/Topbar';
 import DashboardCard from '../components/DashboardCard';
 import LeavePieChart from '../components/LeavePieChart';
+import { takeBootstrap } from '../utils/bootstrap';
 
 export default function EmployeeDashboard() {
   const [sidebarOpen, setSidebarOpen] = useState(true);
@@ -23,21 +24,29 @@ export default function EmployeeDashboard() {
   useEffect(() => {
     const token = localStorage.getItem('token');
 
+    const showStats = (data) => {
+      setStats({
+        totalLeaves: data.total_leaves,
+        approvedLeaves: data.approved,
+        pendingLeaves: data.pending,
+        rejectedLeaves: data.rejected,
+      });
+      setLeaveRequests(data.recent_requests || []);
+    };
+
     const fetchStats = async () => {
+      const cached = takeBootstrap('dashboard');
+      if (cached) {
+        showStats(cached);
+        return;
+      }
       try {
         const res = await fetch('/api/dashboard/employee', {
           headers: { Authorization: `Bearer ${token}` },
         });
         const contentType = res.headers.get('content-type');
         if (res.ok && contentType?.includes('application/json')) {
-          const data = await res.json();
-          setStats({
-            totalLeaves: data.total_leaves,
-            approvedLeaves: data.approved,
-            pendingLeaves: data.pending,
-            rejectedLeaves: data.rejected,
-          });
-          setLeaveRequests(data.recent_requests || []);
+          showStats(await res.json());
         } else {
           console.error('Invalid employee stats response:', await res.text());
         }
@@ -2,6 +2,7 @@ import { useEffect, useState, useRef } from 'react';
 import { FaPrint, FaDownload } from 'react-icons/fa';
 import Sidebar from '../components/Sidebar';
 import Topbar from '../components/Topbar';
+import { takeBootstrap } from '../utils/bootstrap';
 
 const API_BASE = import.meta.env.VITE_API_BASE_URL || '';
 
@@ -202,20 +203,23 @@ export default function EmployeePayslip() {
     setError('');
     try {
       // First, get the employee's profile to get their ID
-      const profileRes = await fetch(buildUrl('/api/employee/profile/'), {
-        method: 'GET',
-        credentials: 'include',
-        headers: {
-          Accept: 'application/json',
-          'X-Requested-With': 'XMLHttpRequest',
-        },
-      });
+      let profileData = takeBootstrap('profile');
+      if (!profileData) {
+        const profileRes = await fetch(buildUrl('/api/employee/profile/'), {
+          method: 'GET',
+          credentials: 'include',
+          headers: {
+            Accept: 'application/json',
+            'X-Requested-With': 'XMLHttpRequest',
+          },
+        });
 
-      if (!profileRes.ok) {
-        throw new Error('Failed to load employee profile');
-      }
+        if (!profileRes.ok) {
+          throw new Error('Failed to load employee profile');
+        }
 
-      const profileData = await profileRes.json();
+        profileData = await profileRes.json();
+      }
       const employeeId = profileData.id;
 
       const baseValues = {
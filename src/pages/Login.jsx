@@ -3,6 +3,7 @@ import { useNavigate, Link } from 'react-router-dom';
 import PasswordInput from '../components/PasswordInput';
 import SocialLogin from '../components/SocialLogin';
 import DarkModeToggle from '../components/DarkModeToggle';
+import { saveBootstrap } from '../utils/bootstrap';
 
 const API_BASE = import.meta.env.VITE_API_BASE_URL || '';
 
@@ -24,11 +25,11 @@ export default function Login() {
   const [loading, setLoading] = useState(false);
   const navigate = useNavigate();
 
-  // Ensure CSRF cookie is present at app start
+  // Ensure CSRF cookie is present at app start (bootstrap sets it too)
   useEffect(() => {
     (async () => {
       try {
-        await fetch(buildUrl('/api/auth/csrf/'), {
+        await fetch(buildUrl('/api/bootstrap/'), {
           method: 'GET',
           credentials: 'include',
           headers: { 'X-Requested-With': 'XMLHttpRequest' },
@@ -71,18 +72,21 @@ export default function Login() {
         return;
       }
 
-      // Confirm session with whoami
+      // Confirm session and load startup data (identity, profile,
+      // departments, dashboard) in one round trip
       let whoami = null;
       try {
-        const who = await fetch(buildUrl('/api/auth/whoami/'), {
+        const boot = await fetch(buildUrl('/api/bootstrap/'), {
           method: 'GET',
           credentials: 'include',
           headers: { 'X-Requested-With': 'XMLHttpRequest' },
         });
-        whoami = await who.json().catch(() => null);
-        console.log('whoami:', whoami);
+        const bootData = await boot.json().catch(() => null);
+        whoami = bootData?.user || null;
+        // Read once by the first screens instead of fetching again (utils/bootstrap.js)
+        if (bootData) saveBootstrap(bootData);
       } catch (err) {
-        console.warn('whoami check failed:', err);
+        console.warn('bootstrap failed:', err);
       }
 
       const finalRole = (whoami?.role || data.role || role || '').toString();
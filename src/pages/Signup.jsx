@@ -1,4 +1,4 @@
-import { useState } from 'react';
+import { useRef, useState } from 'react';
 import { useNavigate, Link } from 'react-router-dom';
 import { Listbox } from '@headlessui/react';
 import { ToastContainer, toast } from 'react-toastify';
@@ -18,10 +18,20 @@ export default function Signup() {
   const [showPassword, setShowPassword] = useState(false);
   const [showConfirm, setShowConfirm] = useState(false);
   const [loading, setLoading] = useState(false);
+  // Reused when a submission is retried after a network error, so the
+  // server answers the retry instead of creating the account twice.
+  const idempotencyKey = useRef(null);
   const navigate = useNavigate();
 
-  const handleChange = (e) =>
+  const handleChange = (e) => {
+    idempotencyKey.current = null;
     setForm({ ...form, [e.target.name]: e.target.value });
+  };
+
+  const handleAvatarChange = (e) => {
+    idempotencyKey.current = null;
+    setAvatar(e.target.files[0]);
+  };
 
   const handleSubmit = async (e) => {
     e.preventDefault();
@@ -40,10 +50,13 @@ export default function Signup() {
       formData.append('role', form.role);
       if (avatar) formData.append('avatar', avatar);
 
+      idempotencyKey.current = idempotencyKey.current || crypto.randomUUID();
       const res = await fetch(`${import.meta.env.VITE_API_BASE_URL}/api/auth/register/`, {
         method: 'POST',
+        headers: { 'Idempotency-Key': idempotencyKey.current },
         body: formData,
       });
+      if (res.status < 500) idempotencyKey.current = null;
 
       const data = await res.json();
       console.log('Signup response:', data);
@@ -130,7 +143,7 @@ export default function Signup() {
           <input
             type="file"
             accept="image/*"
-            onChange={(e) => setAvatar(e.target.files[0])}
+            onChange={handleAvatarChange}
             className="mt-2 text-sm text-white/80"
           />
         </div>
@@ -209,7 +222,7 @@ export default function Signup() {
           <label className="block mb-2 text-sm font-medium text-white dark:text-white">
             Select Role
           </label>
-          <Listbox value={form.role} onChange={(val) => setForm({ ...form, role: val })}>
+          <Listbox value={form.role} onChange={(val) => handleChange({ target: { name: 'role', value: val } })}>
             {({ open }) => (
               <>
                 <Listbox.Button className="w-full px-4 py-2 rounded bg-white text-gray-800 dark:bg-gray-700 dark:text-white border border-white/30 dark:border-white/20 focus:outline-none focus:ring-2 focus:ring-purple-300 flex items-center justify-between">
@@ -0,0 +1,30 @@
+// src/utils/bootstrap.js
+// The /api/bootstrap/ payload fetched at login (identity, profile,
+// departments, dashboard), kept for the first screens that need it so they
+// skip their own startup requests. Each part is handed out once, so later
+// visits fetch fresh data and never hide edits made in between; pass
+// { keep: true } for data that has no endpoint of its own (departments).
+
+const KEY = 'bootstrap';
+
+export function saveBootstrap(data) {
+  try {
+    sessionStorage.setItem(KEY, JSON.stringify(data));
+  } catch (err) {
+    console.warn('SessionStorage write failed:', err);
+  }
+}
+
+export function takeBootstrap(part, { keep = false } = {}) {
+  try {
+    const stored = JSON.parse(sessionStorage.getItem(KEY) || 'null');
+    if (!stored || stored[part] == null) return null;
+    const value = stored[part];
+    if (keep) return value;
+    delete stored[part];
+    sessionStorage.setItem(KEY, JSON.stringify(stored));
+    return value;
+  } catch (err) {
+    return null;
+  }
+}